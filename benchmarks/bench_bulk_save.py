@@ -0,0 +1,70 @@
+"""Запись результатов анализа: save_analysis по одному против save_analyses_bulk.
+
+Запуск из корня репозитория (базы создаются во временном каталоге):
+
+    python benchmarks/bench_bulk_save.py --count 5000 --batch-size 500
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.competency_analyzer import CompetencyAnalyzer  # noqa: E402
+from src.data.database import Database  # noqa: E402
+
+EXTRACTED_INFO = {
+    'education': [{'degree': 'master', 'institution': 'МФТИ', 'speciality': 'Прикладная математика',
+                   'start_date': '2012-09-01', 'end_date': '2014-06-30'}],
+    'experience': [{'company': 'Яндекс', 'position': 'Data Scientist', 'start_date': '2015-01-01',
+                    'end_date': '2020-01-01', 'description': 'Построение моделей машинного обучения'}],
+    'skills': {'required': ['python', 'sql', 'pandas'], 'additional': ['docker'], 'certifications': []},
+    'languages': [{'language': 'english', 'level': 'fluent'}]
+}
+WORDS = ['аналитика', 'данных', 'машинное', 'обучение', 'разработка', 'отчетность', 'модели', 'прогнозирование']
+
+
+def open_database(directory):
+    config_path = os.path.join(directory, 'config.yaml')
+    with open(config_path, 'w') as f:
+        f.write(f"database:\n  type: sqlite\n  path: \"{os.path.join(directory, 'bench.db')}\"\n")
+    return Database(config_path)
+
+
+def generate(count, result, seed):
+    rng = random.Random(seed)
+    return [{
+        'extracted_info': EXTRACTED_INFO, 'analysis_result': result, 'scoring_version': 'bench',
+        'filename': f'{index}.pdf', 'content': ' '.join(rng.choice(WORDS) + str(rng.randint(0, 999)) for _ in range(300))
+    } for index in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    items = generate(args.count, CompetencyAnalyzer().analyze_candidate(EXTRACTED_INFO), args.seed)
+    for label, save in (('save_analysis', lambda db: [db.save_analysis(**item) for item in items]),
+                        ('save_analyses_bulk', lambda db: db.save_analyses_bulk(items, batch_size=args.batch_size))):
+        directory = tempfile.mkdtemp()
+        try:
+            db = open_database(directory)
+            start = time.perf_counter()
+            ids = save(db)
+            elapsed = time.perf_counter() - start
+            saved = sum(1 for resume_id in ids if resume_id is not None)
+            print(f"{label:<20} {elapsed:8.2f} s  {saved / elapsed:9.0f} rows/s  saved {saved}/{len(items)}")
+            db.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Сравнение backend'ов извлечения (fake, local, remote) на одном наборе резюме.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_llm_backends.py --backends fake
+    python benchmarks/bench_llm_backends.py --backends fake local --local-url http://127.0.0.1:8080/v1
+    OPENAI_API_KEY=... python benchmarks/bench_llm_backends.py --backends remote --count 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.llm_backends import create_backend  # noqa: E402
+from src.analysis.resume_parser import ResumeParser  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'resume_hh.txt')
+
+
+def measure(name, config, texts, args):
+    cache_dir = tempfile.mkdtemp()
+    try:
+        parser = ResumeParser(
+            backend=create_backend(config, api_key=os.getenv('OPENAI_API_KEY')),
+            cache_dir=cache_dir,
+            local_first=False,
+            max_concurrency=args.concurrency
+        )
+        start = time.perf_counter()
+        results = parser.parse_many(texts)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(cache_dir)
+    parsed = sum(1 for result in results if result.get('experience'))
+    print(f"{name:<8} {elapsed:8.2f} s  {elapsed / len(texts) * 1000:9.1f} ms/resume  parsed {parsed}/{len(texts)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', default=['fake'], choices=['fake', 'local', 'remote'])
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--local-url', default=None)
+    parser.add_argument('--local-model', default=None)
+    parser.add_argument('--remote-model', default=None)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding='utf-8') as f:
+        template = f.read()
+    # Разные тексты, чтобы не попадать в кэш
+    texts = [f"{template}\nРезюме №{index}" for index in range(args.count)]
+
+    configs = {
+        'fake': {'backend': 'fake'},
+        'local': {'backend': 'local', 'base_url': args.local_url, 'model': args.local_model},
+        'remote': {'backend': 'remote', 'model': args.remote_model}
+    }
+    for name in args.backends:
+        config = {key: value for key, value in configs[name].items() if value is not None}
+        measure(name, config, texts, args)
+
+
+if __name__ == '__main__':
+    main()
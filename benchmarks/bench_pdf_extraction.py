@@ -0,0 +1,90 @@
+"""Сравнение backend'ов извлечения текста PDF на сгенерированных документах.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_pdf_extraction.py --documents 10 --pages 40
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import fitz
+import PyPDF2
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.pdf_text import extract_pdf_text, shutdown_pool  # noqa: E402
+
+LINES = [
+    'Experience: Senior Data Scientist at Yandex, 2018-2023',
+    'Built recommendation models in Python, PyTorch and Spark',
+    'Education: Moscow Institute of Physics and Technology, master',
+    'Skills: SQL, Airflow, Docker, Kubernetes, A/B testing',
+    'Languages: English (fluent), German (basic)',
+    'Led a team of 6 engineers, reduced latency by 40%'
+]
+
+
+def generate(directory, documents, pages, seed):
+    rng = random.Random(seed)
+    paths = []
+    for index in range(documents):
+        document = fitz.open()
+        for _ in range(pages):
+            page = document.new_page()
+            text = '\n'.join(rng.choice(LINES) for _ in range(45))
+            page.insert_textbox(fitz.Rect(40, 40, 560, 800), text, fontsize=9)
+        path = os.path.join(directory, f'resume_{index}.pdf')
+        document.save(path)
+        document.close()
+        paths.append(path)
+    return paths
+
+
+def legacy_pypdf2(path):
+    """Прежняя реализация FileParser: конкатенация строк в цикле"""
+    text = ""
+    with open(path, 'rb') as file:
+        for page in PyPDF2.PdfReader(file).pages:
+            text += page.extract_text() + "\n"
+    return text.strip()
+
+
+def measure(label, func, paths):
+    start = time.perf_counter()
+    chars = sum(len(func(path)) for path in paths)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed * 1000:9.1f} ms  {elapsed / len(paths) * 1000:8.1f} ms/doc  {chars} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = generate(directory, args.documents, args.pages, args.seed)
+        print(f"{args.documents} documents x {args.pages} pages")
+
+        measure('legacy PyPDF2', legacy_pypdf2, paths)
+        measure('pypdf2 backend', lambda path: extract_pdf_text(path, backend='pypdf2', workers=1), paths)
+        measure('pypdf2 backend, parallel',
+                lambda path: extract_pdf_text(path, backend='pypdf2', workers=args.workers), paths)
+        measure('pymupdf backend', lambda path: extract_pdf_text(path, backend='pymupdf', workers=1), paths)
+        measure('pymupdf backend, parallel',
+                lambda path: extract_pdf_text(path, backend='pymupdf', workers=args.workers), paths)
+    finally:
+        shutdown_pool()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
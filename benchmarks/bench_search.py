@@ -0,0 +1,109 @@
+"""Поиск кандидатов: Database.search по resume_skills и FTS5 против ILIKE по JSON навыков.
+
+Запуск из корня репозитория (база создается во временном каталоге):
+
+    python benchmarks/bench_search.py --count 500000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, text  # noqa: E402
+from src.data.database import Database, Resume, ResumeSkill  # noqa: E402
+
+SKILLS = ['python', 'sql', 'java', 'c++', 'docker', 'git', 'excel', 'tableau', 'pandas', 'spark',
+          'пайтон', 'mysql', 'linux', 'go', 'scala', 'hadoop', 'airflow', 'tensorflow', 'pytorch', 'kafka']
+WORDS = ['аналитика', 'данных', 'машинное', 'обучение', 'разработка', 'бэкенда', 'отчетность', 'финансы',
+         'маркетинг', 'логистика', 'исследования', 'модели', 'прогнозирование', 'визуализация', 'инфраструктура']
+# Редкий навык: LIKE по JSON приходится просматривать почти всю таблицу
+RARE_SKILL = 'rust'
+RARE_SHARE = 0.001
+QUERIES = [
+    {'skills': ['Rust']},
+    {'skills': ['Python']},
+    {'skills': ['python', 'SQL'], 'min_total_score': 70},
+    {'skills': ['scala', 'kafka', 'airflow']},
+    {'text_query': 'машинное обучение'},
+    {'skills': ['java'], 'text_query': 'логист', 'min_experience_years': 5},
+]
+
+
+def fill(db, count, seed, batch_size=10000):
+    rng = random.Random(seed)
+    canonical = {skill: db.skill_catalog.canonicalize(skill) for skill in SKILLS + [RARE_SKILL]}
+    for start in range(0, count, batch_size):
+        resumes, skills = [], []
+        for resume_id in range(start + 1, min(start + batch_size, count) + 1):
+            chosen = rng.sample(SKILLS, rng.randint(2, 6))
+            if rng.random() < RARE_SHARE:
+                chosen.append(RARE_SKILL)
+            resumes.append({
+                'id': resume_id, 'filename': f'{resume_id}.pdf',
+                'content': ' '.join(rng.choice(WORDS) for _ in range(40)),
+                'skills': json.dumps({'required': chosen, 'additional': []}),
+                'total_score': rng.randint(0, 100), 'education_score': rng.randint(0, 100),
+                'experience_years': rng.randint(0, 15)
+            })
+            names = {name for skill in chosen for name in canonical[skill]}
+            skills.extend({'resume_id': resume_id, 'skill': name} for name in names)
+        with db.session_scope() as session:
+            session.execute(insert(Resume), resumes)
+            session.execute(insert(ResumeSkill), skills)
+
+
+def legacy_search(db, skills):
+    """Прежний способ: ILIKE по сериализованному JSON навыков"""
+    condition = ' AND '.join(f'skills LIKE :skill{index}' for index in range(len(skills)))
+    params = {f'skill{index}': f'%{skill}%' for index, skill in enumerate(skills)}
+    with db.engine.connect() as connection:
+        return connection.execute(text(f'SELECT id FROM resumes WHERE {condition} ORDER BY id DESC LIMIT 50'),
+                                  params).all()
+
+
+def measure(label, func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        found = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<60} {elapsed * 1000:9.2f} ms  found {len(found)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        config_path = os.path.join(directory, 'config.yaml')
+        with open(config_path, 'w') as f:
+            f.write(f"database:\n  type: sqlite\n  path: \"{os.path.join(directory, 'bench.db')}\"\n")
+        db = Database(config_path)
+
+        start = time.perf_counter()
+        fill(db, args.count, args.seed)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+        print(f"fill {args.count} resumes {(time.perf_counter() - start):9.1f} s")
+
+        for query in QUERIES:
+            measure(f'search {query}', lambda: db.search(**query)['items'], args.repeat)
+        for skills in ([RARE_SKILL], ['python'], ['python', 'sql'], ['scala', 'kafka', 'airflow']):
+            measure(f'legacy LIKE {skills}', lambda: legacy_search(db, skills), args.repeat)
+        db.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Размер базы и задержка чтения: JSON строкой внутри JSON, нативный JSON и сжатый analysis_results.
+
+Запуск из корня репозитория (базы создаются во временном каталоге):
+
+    python benchmarks/bench_storage.py --count 2000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert  # noqa: E402
+from src.analysis.competency_analyzer import CompetencyAnalyzer  # noqa: E402
+from src.data.compression import zstandard  # noqa: E402
+from src.data.database import Database, Resume  # noqa: E402
+
+EXTRACTED_INFO = {
+    'education': [{'degree': 'master', 'institution': 'МФТИ', 'speciality': 'Прикладная математика',
+                   'start_date': '2012-09-01', 'end_date': '2014-06-30'}],
+    'experience': [{'company': 'Яндекс', 'position': 'Data Scientist', 'start_date': '2015-01-01',
+                    'end_date': '2020-01-01', 'description': 'Построение моделей машинного обучения'}],
+    'skills': {'required': ['python', 'sql', 'pandas'], 'additional': ['docker'], 'certifications': []},
+    'languages': [{'language': 'english', 'level': 'fluent'}]
+}
+WORDS = ['аналитика', 'данных', 'машинное', 'обучение', 'разработка', 'отчетность', 'модели', 'прогнозирование']
+
+
+def open_database(directory, compression):
+    config_path = os.path.join(directory, 'config.yaml')
+    with open(config_path, 'w') as f:
+        f.write(f"database:\n  type: sqlite\n  path: \"{os.path.join(directory, 'bench.db')}\"\n"
+                f"  compression: {compression}\n")
+    return Database(config_path)
+
+
+def fill(db, mode, count, result, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        content = ' '.join(rng.choice(WORDS) for _ in range(400))
+        if mode == 'double-encoded':
+            # Формат до исправления: json.dumps перед записью в JSON-колонки
+            with db.session_scope() as session:
+                session.execute(insert(Resume), [{
+                    'filename': 'resume.pdf', 'content': content,
+                    'extracted_info': json.dumps(EXTRACTED_INFO), 'analysis_results': json.dumps(result),
+                    'skills': json.dumps(EXTRACTED_INFO['skills']), 'total_score': 50, 'education_score': 50
+                }])
+        else:
+            db.save_analysis(EXTRACTED_INFO, result, filename='resume.pdf', content=content)
+
+
+def database_size(db):
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        connection.exec_driver_sql('VACUUM')
+        page_count = connection.exec_driver_sql('PRAGMA page_count').scalar()
+        page_size = connection.exec_driver_sql('PRAGMA page_size').scalar()
+    return page_count * page_size
+
+
+def measure(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    result = CompetencyAnalyzer().analyze_candidate(EXTRACTED_INFO)
+    modes = [('double-encoded', 'none'), ('native JSON', 'none'), ('zlib', 'zlib')]
+    if zstandard is not None:
+        modes.append(('zstd', 'zstd'))
+
+    print(f"{'mode':<16} {'size MB':>9} {'get_resume ms':>14} {'history ms':>11} {'history+analysis ms':>20}")
+    for label, compression in modes:
+        directory = tempfile.mkdtemp()
+        try:
+            db = open_database(directory, compression)
+            fill(db, label, args.count, result, args.seed)
+            size = database_size(db)
+            ids = list(range(1, args.count + 1))
+            rng = random.Random(args.seed)
+            resume_ms = measure(lambda: db.get_resume(rng.choice(ids)), args.repeat)
+            history_ms = measure(lambda: db.get_history(limit=50), args.repeat)
+            analysis_ms = measure(lambda: db.get_history(limit=50, fields=['id', 'analysis_results']), args.repeat)
+            print(f"{label:<16} {size / 1024 / 1024:9.2f} {resume_ms:14.3f} {history_ms:11.3f} {analysis_ms:20.3f}")
+            db.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
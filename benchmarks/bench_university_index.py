@@ -0,0 +1,79 @@
+"""Сравнение UniversityIndex с линейным поиском подстроки по universities.yaml.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_university_index.py --count 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analysis.reference_data import load_universities  # noqa: E402
+from src.analysis.university_index import UniversityIndex  # noqa: E402
+
+NOISE = [
+    'Колледж информатики и программирования',
+    'Технический лицей №2',
+    'Онлайн-школа анализа данных',
+    'Institute of Technology',
+    'Государственный институт культуры'
+]
+SUFFIXES = ['', ', факультет ВМК', ' (магистратура)', ', Москва', ' — кафедра прикладной математики']
+
+
+def linear_scan(universities, institution):
+    """Прежний алгоритм: первое полное название, входящее в строку как подстрока"""
+    institution = institution.lower()
+    for univ in universities:
+        if univ['name'].lower() in institution:
+            return univ['name']
+    return None
+
+
+def generate(universities, count, seed):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        univ = rng.choice(universities)
+        variant = rng.random()
+        if variant < 0.5:
+            base = univ['name']
+        elif variant < 0.8 and univ.get('aliases'):
+            base = rng.choice(univ['aliases'])
+        else:
+            base = rng.choice(NOISE)
+        samples.append(base + rng.choice(SUFFIXES))
+    return samples
+
+
+def measure(label, func, samples):
+    start = time.perf_counter()
+    found = sum(1 for sample in samples if func(sample) is not None)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {elapsed * 1000:9.1f} ms  {elapsed / len(samples) * 1e6:7.2f} us/lookup  matched {found}/{len(samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    universities = load_universities(args.data_dir)
+    samples = generate(universities, args.count, args.seed)
+
+    start = time.perf_counter()
+    index = UniversityIndex(universities)
+    print(f"index build          {(time.perf_counter() - start) * 1000:9.1f} ms  ({len(index)} universities)")
+
+    measure('linear scan', lambda sample: linear_scan(universities, sample), samples)
+    measure('UniversityIndex', index.resolve, samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,13 @@ import {
 import axios from 'axios';
 import AnalysisResults from './AnalysisResults';
 
+const PAGE_SIZE = 50;
+const HISTORY_FIELDS = 'id,filename,upload_date,total_score,analysis_results';
+
 function ResumeHistory() {
   const [resumes, setResumes] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
   const [selectedResume, setSelectedResume] = useState(null);
 
   const roleNames = {
@@ -22,15 +27,22 @@ function ResumeHistory() {
     'research_scientist': 'Научный сотрудник'
   };
 
+  const fetchHistory = async (cursor = null) => {
+    setLoading(true);
+    try {
+      const response = await axios.get('http://localhost:5000/api/history', {
+        params: { limit: PAGE_SIZE, fields: HISTORY_FIELDS, ...(cursor ? { cursor } : {}) }
+      });
+      setResumes((current) => (cursor ? [...current, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Ошибка при загрузке истории:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
-    const fetchHistory = async () => {
-      try {
-        const response = await axios.get('http://localhost:5000/api/history');
-        setResumes(response.data);
-      } catch (error) {
-        console.error('Ошибка при загрузке истории:', error);
-      }
-    };
     fetchHistory();
   }, []);
 
@@ -82,7 +94,7 @@ function ResumeHistory() {
                   })}
                 </TableCell>
                 <TableCell>
-                  {formatRoleMatches(resume.analysis_results.role_matches)}
+                  {formatRoleMatches(resume.analysis_results?.role_matches || {})}
                 </TableCell>
                 <TableCell>
                   <Button
@@ -99,6 +111,14 @@ function ResumeHistory() {
         </Table>
       </TableContainer>
 
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button variant="outlined" disabled={loading} onClick={() => fetchHistory(nextCursor)}>
+            Показать еще
+          </Button>
+        </Box>
+      )}
+
       <Dialog
         open={Boolean(selectedResume)}
         onClose={() => setSelectedResume(null)}
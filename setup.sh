@@ -24,6 +24,9 @@ echo "Установка Python зависимостей..."
 pip3 install --upgrade pip setuptools wheel
 pip3 install -r requirements.txt
 
+echo "Компиляция справочных данных..."
+python3 -m src.analysis.reference_data
+
 echo "Установка Node.js зависимостей..."
 cd frontend
 npm install
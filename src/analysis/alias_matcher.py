@@ -0,0 +1,79 @@
+from typing import Dict, List, Any, Optional, Set
+import re
+
+
+class AliasMatcher:
+    """Составной матчер алиасов для одной категории матрицы опыта.
+
+    Все алиасы категории компилируются в одно регулярное выражение,
+    поэтому поиск выполняется за один проход по тексту вместо
+    перебора (записи × алиасы) с проверкой ``alias in text``.
+    Семантика совпадает с поиском подстроки: запись считается найденной,
+    если хотя бы один её алиас входит в текст.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.weights = [entry.get('weight', 0) for entry in entries]
+
+        # Алиас (в нижнем регистре) -> индексы записей, которым он принадлежит
+        alias_entries: Dict[str, Set[int]] = {}
+        self._always: Set[int] = set()
+        for index, entry in enumerate(entries):
+            for alias in entry.get('aliases', []) or []:
+                alias = str(alias).lower()
+                if not alias:
+                    # Пустая строка входит в любой текст
+                    self._always.add(index)
+                    continue
+                alias_entries.setdefault(alias, set()).add(index)
+
+        # Альтернативы упорядочены по убыванию длины, поэтому в каждой позиции
+        # текста находится самый длинный алиас. Все остальные алиасы, которые
+        # совпадают в той же позиции, являются его префиксами - их записи
+        # добавляются заранее, чтобы не потерять пересекающиеся совпадения.
+        aliases = sorted(alias_entries, key=len, reverse=True)
+        self._entries_by_alias: Dict[str, frozenset] = {}
+        for alias in aliases:
+            matched = set()
+            for other, indexes in alias_entries.items():
+                if alias.startswith(other):
+                    matched.update(indexes)
+            self._entries_by_alias[alias] = frozenset(matched)
+
+        self._pattern = None
+        if aliases:
+            self._pattern = re.compile(
+                '(?=(' + '|'.join(re.escape(alias) for alias in aliases) + '))'
+            )
+
+    def match(self, text: str) -> Set[int]:
+        """Возвращает индексы всех записей, алиасы которых встречаются в тексте"""
+        found = set(self._always)
+        if not text or self._pattern is None:
+            return found
+
+        for match in self._pattern.finditer(text.lower()):
+            found.update(self._entries_by_alias[match.group(1)])
+        return found
+
+    def first_weight(self, text: str) -> Optional[float]:
+        """Вес первой (в порядке матрицы) найденной записи или None"""
+        found = self.match(text)
+        if not found:
+            return None
+        return self.weights[min(found)]
+
+    def max_weight(self, text: str) -> Optional[float]:
+        """Максимальный вес среди найденных записей или None"""
+        found = self.match(text)
+        if not found:
+            return None
+        return max(self.weights[index] for index in found)
+
+
+def build_experience_matchers(experience_matrix: Dict[str, Any]) -> Dict[str, AliasMatcher]:
+    """Строит матчеры для должностей, компаний и задач матрицы опыта"""
+    return {
+        category: AliasMatcher(experience_matrix.get(category, []) or [])
+        for category in ('positions', 'companies', 'tasks')
+    }
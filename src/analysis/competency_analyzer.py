@@ -1,5 +1,4 @@
-from typing import Dict, List, Any, Tuple
-import yaml
+from typing import Dict, List, Any, Tuple, Optional
 import numpy as np
 import logging
 import pandas as pd
@@ -7,18 +6,21 @@ from sklearn.preprocessing import StandardScaler
 from datetime import datetime
 from .input_validator import InputValidator
 from .data_validator import DataValidator
+from .reference_data import ReferenceData, ReferenceDataRegistry, get_registry
 import re
+import hashlib
+import json
 
 logger = logging.getLogger(__name__)
 
 class CompetencyAnalyzer:
-    def __init__(self):
+    def __init__(self, reference_data: Optional[ReferenceData] = None,
+                 registry: Optional[ReferenceDataRegistry] = None):
         self.logger = logging.getLogger(__name__)
-        self.competency_matrix = self._load_competency_matrix()
-        self.industry_matrix = self._load_industry_matrix()
-        self.universities = self._load_universities()
-        self.course_recommendations = self._load_course_recommendations()
-        self.experience_matrix = self._load_experience_matrix()
+        # Справочные матрицы загружаются один раз на процесс и только читаются.
+        # Явно переданный снимок фиксирован, иначе берется актуальный из реестра
+        self._reference_data = reference_data
+        self.registry = registry or (get_registry() if reference_data is None else None)
         self.roles = [
             'data_scientist', 
             'data_engineer', 
@@ -59,6 +61,14 @@ class CompetencyAnalyzer:
             }
         }
         
+        # Веса для общей оценки
+        self.overall_weights = {
+            'education': 0.25,
+            'experience': 0.35,
+            'skills': 0.25,
+            'languages': 0.15
+        }
+        
         # Веса для разных ролей
         self.role_weights = {
             'data_scientist': {
@@ -125,30 +135,51 @@ class CompetencyAnalyzer:
                 'good': 0.8,
                 'average': 0.6,
                 'unknown': 0.4
-            }
+            },
+            # Доли степени и университета в оценке записи об образовании
+            'degree_share': 0.7,
+            'university_share': 0.3
         }
         
         # Веса для опыта
         self.experience_weights = {
             'years_multiplier': 0.15,
             'relevant_experience_multiplier': 1.8,
-            'management_multiplier': 1.2
+            'management_multiplier': 1.2,
+            # Доли позиции, компании и задач в качестве места работы
+            'position_share': 0.4,
+            'company_share': 0.3,
+            'tasks_share': 0.3,
+            # Оценка позиции, компании или задач, не найденных в матрице
+            'unmatched_score': 0.5
         }
         
         # Веса для навыков
         self.skills_weights = {
-            'required_skills_weight': 1.5,
-            'additional_skills_weight': 1.0,
-            'certifications_weight': 0.8
+            'categories': {
+                'required': 1.5,
+                'additional': 1.0,
+                'certifications': 0.8
+            },
+            # Число навыков категории, дающее полный балл
+            'max_counts': {
+                'required': 10,
+                'additional': 15,
+                'certifications': 5
+            },
+            'scale': 20
         }
         
         # Веса для языков
         self.languages_weights = {
-            'native': 1.2,
-            'fluent': 1.0,
-            'advanced': 0.8,
-            'intermediate': 0.6,
-            'basic': 0.4
+            'levels': {
+                'native': 1.2,
+                'fluent': 1.0,
+                'advanced': 0.8,
+                'intermediate': 0.6,
+                'basic': 0.4
+            },
+            'scale': 25
         }
         
         # Граничные значения для проверки выбросов
@@ -175,73 +206,68 @@ class CompetencyAnalyzer:
             }
         }
 
+    @property
+    def reference_data(self) -> ReferenceData:
+        """Текущий снимок справочных данных"""
+        if self._reference_data is not None:
+            return self._reference_data
+        return self.registry.get()
+
+    @property
+    def scoring_version(self) -> str:
+        """Версия модели оценки: хэш весов и исходных справочных данных.
+
+        Меняется при любом изменении весов или YAML-матриц, поэтому по ней
+        можно найти сохраненные оценки, требующие пересчета.
+        """
+        weights = {
+            'overall': self.overall_weights,
+            'roles': self.role_weights,
+            'education': self.education_weights,
+            'experience': self.experience_weights,
+            'skills': self.skills_weights,
+            'languages': self.languages_weights
+        }
+        digest = hashlib.sha256(json.dumps(weights, sort_keys=True).encode())
+        digest.update(self.reference_data.source_hash.encode())
+        return digest.hexdigest()[:16]
+
     def analyze_candidate(self, candidate_data: Dict[str, Any]) -> Dict[str, Any]:
         """Анализ кандидата"""
         try:
             self.logger.info(f"Starting candidate analysis at {datetime.now()}")
             
+            # Весь анализ выполняется по одному снимку справочных данных,
+            # даже если во время него реестр подменит данные
+            reference = self.reference_data
+            
             # Сохраняем данные об опыте для использования в расчетах
             self.experience_data = candidate_data.get('experience', [])
             
             # Стандартизируем данные
             standardized_data = {
                 'education': self._standardize_education(candidate_data.get('education', [])),
-                'experience': self._standardize_experience(self.experience_data),
+                'experience': self._standardize_experience(self.experience_data, reference),
                 'skills': self._standardize_skills(candidate_data.get('skills', {})),
                 'languages': self._standardize_languages(candidate_data.get('languages', []))
             }
             
             # Рассчитываем оценки по категориям
             scores = {
-                'education': self._calculate_education_score(standardized_data['education']),
-                'experience': self._calculate_experience_score(standardized_data['experience']),
+                'education': self._calculate_education_score(standardized_data['education'], reference),
+                'experience': self._calculate_experience_score(standardized_data['experience'], reference),
                 'skills': self._calculate_skills_score(standardized_data['skills']),
                 'languages': self._calculate_languages_score(standardized_data['languages'])
             }
             
-            # Веса для общей оценки
-            weights = {
-                'education': 0.25,
-                'experience': 0.35,
-                'skills': 0.25,
-                'languages': 0.15
-            }
-            
             # Рассчитываем общую оценку (максимум 100)
-            overall_score = sum(score * weights[category] for category, score in scores.items())
+            overall_score = sum(score * self.overall_weights[category] for category, score in scores.items())
             overall_score = min(overall_score, 100.0)  # Ограничиваем сверху
             
             # Рассчитываем соответствие ролям
             role_scores = self._calculate_role_scores(scores)
-            best_fit_role = max(role_scores.items(), key=lambda x: x[1])
             
-            return {
-                'status': 'success',
-                'overall_score': {
-                    'value': round(overall_score, 1),
-                    'details': {
-                        category: round(score, 1)
-                        for category, score in scores.items()
-                    }
-                },
-                'role_fit': {
-                    'best_fit': {
-                        'role': best_fit_role[0],
-                        'score': round(best_fit_role[1], 1)
-                    },
-                    'all_roles': {
-                        role: round(score, 1)
-                        for role, score in role_scores.items()
-                    }
-                },
-                'details': {
-                    'education': self._get_education_details(standardized_data['education']),
-                    'experience': self._get_experience_details(standardized_data['experience']),
-                    'skills': self._get_skills_details(standardized_data['skills']),
-                    'languages': self._get_languages_details(standardized_data['languages'])
-                },
-                'recommendations': self._generate_recommendations(scores, best_fit_role[0])
-            }
+            return self._build_result(standardized_data, scores, overall_score, role_scores, reference)
             
         except Exception as e:
             self.logger.error(f"Error analyzing candidate: {str(e)}")
@@ -250,6 +276,245 @@ class CompetencyAnalyzer:
                 'message': str(e)
             }
 
+    def score_section(self, section: str, data: Any) -> float:
+        """Оценка одной категории по ее данным.
+
+        Нужна при потоковом разборе: секция оценивается, как только модель
+        закончила ее генерировать, не дожидаясь остальных.
+        """
+        reference = self.reference_data
+        if section == 'education':
+            return self._calculate_education_score(self._standardize_education(data or []), reference)
+        if section == 'experience':
+            return self._calculate_experience_score(self._standardize_experience(data or [], reference), reference)
+        if section == 'skills':
+            return self._calculate_skills_score(self._standardize_skills(data or {}))
+        if section == 'languages':
+            return self._calculate_languages_score(self._standardize_languages(data or []))
+        raise ValueError(f"Unknown section: {section}")
+
+    def analyze_candidates_batch(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Пакетный анализ кандидатов.
+
+        Стандартизация и сопоставление с матрицами выполняются по записям,
+        а все оценки считаются матрично для всего пакета: категории - по
+        массивам признаков, общая оценка и соответствие всем ролям - одним
+        умножением матрицы оценок (N x 4) на матрицу весов. Результат для
+        каждого кандидата имеет тот же формат, что и у ``analyze_candidate``.
+        """
+        reference = self.reference_data
+        categories = ['education', 'experience', 'skills', 'languages']
+        results: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+        standardized_rows = []
+        owners = []
+
+        for position, candidate_data in enumerate(candidates):
+            try:
+                standardized_rows.append({
+                    'education': self._standardize_education(candidate_data.get('education', [])),
+                    'experience': self._standardize_experience(candidate_data.get('experience', []), reference),
+                    'skills': self._standardize_skills(candidate_data.get('skills', {})),
+                    'languages': self._standardize_languages(candidate_data.get('languages', []))
+                })
+                owners.append(position)
+            except Exception as e:
+                self.logger.error(f"Error analyzing candidate {position}: {str(e)}")
+                results[position] = {
+                    'status': 'error',
+                    'message': str(e)
+                }
+
+        if standardized_rows:
+            features = self._build_feature_matrices(standardized_rows, reference)
+            scores = np.column_stack([
+                self._education_scores_vectorized(features),
+                self._experience_scores_vectorized(features),
+                self._skills_scores_vectorized(features),
+                self._languages_scores_vectorized(features)
+            ])
+
+            # Общая оценка и все роли - одно произведение матриц
+            roles, weight_matrix = self._score_weight_matrix(categories)
+            combined = np.minimum(self._weighted_scores(scores, weight_matrix), 100.0)
+            overall_scores = combined[:, 0]
+            role_matrix = combined[:, 1:]
+
+            for row, position in enumerate(owners):
+                row_scores = {category: float(scores[row, column]) for column, category in enumerate(categories)}
+                role_scores = {role: float(role_matrix[row, column]) for column, role in enumerate(roles)}
+                results[position] = self._build_result(
+                    standardized_rows[row], row_scores, float(overall_scores[row]), role_scores, reference
+                )
+
+        return results
+
+    def _score_weight_matrix(self, categories: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Матрица весов (категории x [общая оценка, роли...])"""
+        overall_weights = [self.overall_weights[category] for category in categories]
+        roles = list(self.role_weights)
+        columns = [overall_weights] + [
+            [self.role_weights[role][category] for category in categories]
+            for role in roles
+        ]
+        return roles, np.array(columns, dtype=float).T
+
+    @staticmethod
+    def _weighted_scores(scores: np.ndarray, weight_matrix: np.ndarray) -> np.ndarray:
+        """Произведение scores @ weight_matrix.
+
+        Внутреннее измерение равно числу категорий (4), поэтому произведение
+        раскладывается на сумму внешних произведений по категориям в том же
+        порядке, что и в ``analyze_candidate``. Так результаты пакетного и
+        поштучного анализа совпадают до последнего бита и одинаково
+        округляются.
+        """
+        combined = np.zeros((scores.shape[0], weight_matrix.shape[1]))
+        for category in range(weight_matrix.shape[0]):
+            combined += scores[:, category:category + 1] * weight_matrix[category]
+        return combined
+
+    def _build_feature_matrices(self, standardized_rows: List[Dict[str, Any]],
+                                reference: ReferenceData) -> Dict[str, Any]:
+        """Переводит стандартизированные данные пакета в массивы признаков"""
+        matchers = reference.experience_matchers
+        university_index = reference.university_index
+        degree_weights = self.education_weights['degree']
+        rank_weights = self.education_weights['university_rank']
+        skill_categories = list(self.skills_weights['categories'])
+        level_weights = self.languages_weights['levels']
+        unmatched = self.experience_weights['unmatched_score']
+        university_scores: Dict[str, float] = {}
+
+        edu_owner, edu_degree, edu_university = [], [], []
+        exp_owner, exp_duration, exp_position, exp_company, exp_tasks = [], [], [], [], []
+        lang_owner, lang_weight = [], []
+        skill_counts = np.zeros((len(standardized_rows), len(skill_categories)))
+
+        for row, data in enumerate(standardized_rows):
+            for edu in data['education']:
+                institution = edu.get('institution', '').strip()
+                # Одни и те же вузы повторяются в пакете - ищем каждый один раз
+                if institution not in university_scores:
+                    rank = university_index.resolve_rank(institution)
+                    university_scores[institution] = rank_weights.get(rank, 0.0) if rank is not None else 0.0
+                edu_owner.append(row)
+                edu_degree.append(degree_weights.get(edu.get('degree', '').lower(), 0.0))
+                edu_university.append(university_scores[institution])
+
+            for exp in data['experience']:
+                duration = float(exp.get('duration_years', 0))
+                if duration <= 0:
+                    continue
+                position_weight = matchers['positions'].first_weight(exp.get('position', '').lower())
+                company_weight = matchers['companies'].first_weight(exp.get('company', '').lower())
+                tasks_weight = matchers['tasks'].max_weight(exp.get('description', '').lower())
+                exp_owner.append(row)
+                exp_duration.append(duration)
+                exp_position.append(unmatched if position_weight is None else min(position_weight, 1.0))
+                exp_company.append(unmatched if company_weight is None else min(company_weight, 1.0))
+                exp_tasks.append(unmatched if tasks_weight is None else min(max(unmatched, tasks_weight), 1.0))
+
+            for column, category in enumerate(skill_categories):
+                skill_counts[row, column] = len(data['skills'].get(category, []))
+
+            for lang in data['languages']:
+                lang_owner.append(row)
+                lang_weight.append(level_weights.get(lang.get('level', '').lower(), 0.0))
+
+        return {
+            'size': len(standardized_rows),
+            'edu_owner': np.array(edu_owner, dtype=np.int64),
+            'edu_degree': np.array(edu_degree, dtype=float),
+            'edu_university': np.array(edu_university, dtype=float),
+            'exp_owner': np.array(exp_owner, dtype=np.int64),
+            'exp_duration': np.array(exp_duration, dtype=float),
+            'exp_position': np.array(exp_position, dtype=float),
+            'exp_company': np.array(exp_company, dtype=float),
+            'exp_tasks': np.array(exp_tasks, dtype=float),
+            'skill_counts': skill_counts,
+            'lang_owner': np.array(lang_owner, dtype=np.int64),
+            'lang_weight': np.array(lang_weight, dtype=float)
+        }
+
+    def _education_scores_vectorized(self, features: Dict[str, Any]) -> np.ndarray:
+        """Оценки за образование для пакета (максимум по записям кандидата)"""
+        size = features['size']
+        entry_scores = (features['edu_degree'] * self.education_weights['degree_share'] +
+                        features['edu_university'] * self.education_weights['university_share'])
+        best = np.zeros(size)
+        np.maximum.at(best, features['edu_owner'], entry_scores)
+        return np.minimum(best * 100, 100.0)
+
+    def _experience_scores_vectorized(self, features: Dict[str, Any]) -> np.ndarray:
+        """Оценки опыта для пакета"""
+        size = features['size']
+        owner = features['exp_owner']
+        duration = features['exp_duration']
+
+        total_years = np.bincount(owner, weights=duration, minlength=size)
+        base_score = np.minimum(total_years * self.experience_weights['years_multiplier'], 1.0)
+
+        experience_weight = (
+            features['exp_position'] * self.experience_weights['position_share'] +
+            features['exp_company'] * self.experience_weights['company_share'] +
+            features['exp_tasks'] * self.experience_weights['tasks_share']
+        )
+        safe_total = np.where(total_years > 0, total_years, 1.0)
+        weighted = experience_weight * (duration / safe_total[owner])
+        quality_modifier = np.minimum(np.bincount(owner, weights=weighted, minlength=size), 1.0)
+
+        final_score = base_score * quality_modifier * self.experience_weights['relevant_experience_multiplier']
+        return np.where(total_years > 0, np.minimum(final_score * 100, 100.0), 0.0)
+
+    def _skills_scores_vectorized(self, features: Dict[str, Any]) -> np.ndarray:
+        """Оценки навыков для пакета"""
+        max_counts = self.skills_weights['max_counts']
+        total_score = np.zeros(features['size'])
+        # Столбцы skill_counts идут в порядке skills_weights['categories']
+        for column, (category, weight) in enumerate(self.skills_weights['categories'].items()):
+            total_score += np.minimum(features['skill_counts'][:, column] / max_counts[category], 1.0) * weight
+        return np.minimum(total_score * self.skills_weights['scale'], 100.0)
+
+    def _languages_scores_vectorized(self, features: Dict[str, Any]) -> np.ndarray:
+        """Оценки языков для пакета"""
+        total_score = np.bincount(features['lang_owner'], weights=features['lang_weight'],
+                                  minlength=features['size'])
+        return np.minimum(total_score * self.languages_weights['scale'], 100.0)
+
+    def _build_result(self, standardized_data: Dict[str, Any], scores: Dict[str, float],
+                      overall_score: float, role_scores: Dict[str, float],
+                      reference: ReferenceData) -> Dict[str, Any]:
+        """Формирует ответ анализа по рассчитанным оценкам"""
+        best_fit_role = max(role_scores.items(), key=lambda x: x[1])
+        
+        return {
+            'status': 'success',
+            'overall_score': {
+                'value': round(overall_score, 1),
+                'details': {
+                    category: round(score, 1)
+                    for category, score in scores.items()
+                }
+            },
+            'role_fit': {
+                'best_fit': {
+                    'role': best_fit_role[0],
+                    'score': round(best_fit_role[1], 1)
+                },
+                'all_roles': {
+                    role: round(score, 1)
+                    for role, score in role_scores.items()
+                }
+            },
+            'details': {
+                'education': self._get_education_details(standardized_data['education'], reference, scores['education']),
+                'experience': self._get_experience_details(standardized_data['experience'], reference, scores['experience']),
+                'skills': self._get_skills_details(standardized_data['skills'], scores['skills']),
+                'languages': self._get_languages_details(standardized_data['languages'], scores['languages'])
+            },
+            'recommendations': self._generate_recommendations(scores, best_fit_role[0], reference)
+        }
+
     def _standardize_education(self, education_data: List[Dict]) -> List[Dict]:
         """Стандартизация данных об образовании"""
         standardized = []
@@ -293,8 +558,10 @@ class CompetencyAnalyzer:
                     })
         return standardized
 
-    def _standardize_experience(self, experience_data: List[Dict]) -> List[Dict]:
+    def _standardize_experience(self, experience_data: List[Dict],
+                                reference: Optional[ReferenceData] = None) -> List[Dict]:
         """Стандартизация данных об опыте работы."""
+        matchers = (reference or self.reference_data).experience_matchers
         if not isinstance(experience_data, list):
             return []
 
@@ -303,16 +570,6 @@ class CompetencyAnalyzer:
             if not isinstance(exp, dict):
                 continue
 
-            # Загрузка матрицы опыта
-            experience_matrix = self._load_experience_matrix()
-            if not experience_matrix:
-                experience_matrix = {
-                    'positions': [],
-                    'companies': [],
-                    'tasks': [],
-                    'industries': []
-                }
-
             # Нормализация дат
             start_date = exp.get('start_date', '')
             end_date = exp.get('end_date', '')
@@ -340,24 +597,13 @@ class CompetencyAnalyzer:
             description = exp.get('description', '').lower()
             
             # Проверка релевантности должности
-            position_relevance = 0
-            for pos in experience_matrix['positions']:
-                if any(alias.lower() in position for alias in pos['aliases']):
-                    position_relevance = pos['weight']
-                    break
+            position_relevance = matchers['positions'].first_weight(position) or 0
 
             # Проверка релевантности компании
-            company_relevance = 0
-            for comp in experience_matrix['companies']:
-                if any(alias.lower() in company for alias in comp['aliases']):
-                    company_relevance = comp['weight']
-                    break
+            company_relevance = matchers['companies'].first_weight(company) or 0
 
             # Проверка релевантности задач
-            tasks_relevance = 0
-            for task in experience_matrix['tasks']:
-                if any(alias.lower() in description for alias in task['aliases']):
-                    tasks_relevance = max(tasks_relevance, task['weight'])
+            tasks_relevance = matchers['tasks'].max_weight(description) or 0
 
             # Определение общего веса релевантности
             relevance_weight = max(position_relevance, company_relevance, tasks_relevance)
@@ -396,7 +642,7 @@ class CompetencyAnalyzer:
             return []
             
         standardized = []
-        valid_levels = {'native', 'fluent', 'advanced', 'intermediate', 'basic'}
+        valid_levels = self.languages_weights['levels']
         
         for lang in languages_data:
             if not isinstance(lang, dict):
@@ -415,11 +661,14 @@ class CompetencyAnalyzer:
             
         return standardized
 
-    def _calculate_education_score(self, education_data: List[Dict]) -> float:
+    def _calculate_education_score(self, education_data: List[Dict],
+                                   reference: Optional[ReferenceData] = None) -> float:
         """Расчет оценки за образование"""
         if not education_data:
             return 0.0
 
+        university_index = (reference or self.reference_data).university_index
+
         max_score = 0.0
         for edu in education_data:
             # Базовый балл за степень
@@ -430,24 +679,26 @@ class CompetencyAnalyzer:
             institution = edu.get('institution', '').strip()
             university_score = 0.0
             
-            # Ищем университет в списке
-            for univ in self.universities:
-                if univ['name'].lower() in institution.lower():
-                    rank = univ['rank']
-                    university_score = self.education_weights['university_rank'].get(rank, 0.0)
-                    break
+            # Ищем университет по индексу (полное название, алиасы, аббревиатуры)
+            rank = university_index.resolve_rank(institution)
+            if rank is not None:
+                university_score = self.education_weights['university_rank'].get(rank, 0.0)
             
-            # Итоговый балл (70% за степень, 30% за университет)
-            final_score = (base_score * 0.7 + university_score * 0.3)
+            # Итоговый балл из долей степени и университета
+            final_score = (base_score * self.education_weights['degree_share'] +
+                           university_score * self.education_weights['university_share'])
             max_score = max(max_score, final_score)
             
         return min(max_score * 100, 100.0)  # Нормализуем к 100 баллам
 
-    def _calculate_experience_score(self, experience_data: List[Dict]) -> float:
+    def _calculate_experience_score(self, experience_data: List[Dict],
+                                    reference: Optional[ReferenceData] = None) -> float:
         """Расчет оценки опыта работы с учетом матрицы."""
         if not experience_data:
             return 0.0
 
+        matchers = (reference or self.reference_data).experience_matchers
+
         # 1. Расчет общего стажа
         total_years = sum(float(exp.get('duration_years', 0)) for exp in experience_data if float(exp.get('duration_years', 0)) > 0)
         
@@ -459,6 +710,7 @@ class CompetencyAnalyzer:
 
         # 3. Модификаторы за качество опыта
         weighted_scores = []
+        unmatched = self.experience_weights['unmatched_score']
 
         for exp in experience_data:
             position = exp.get('position', '').lower()
@@ -470,30 +722,28 @@ class CompetencyAnalyzer:
                 continue
             
             # 3.1. Оценка позиции
-            position_score = 0.5
-            for pos in self.experience_matrix['positions']:
-                if any(alias.lower() in position for alias in pos['aliases']):
-                    position_score = min(pos['weight'], 1.0)
-                    break
+            position_score = unmatched
+            position_weight = matchers['positions'].first_weight(position)
+            if position_weight is not None:
+                position_score = min(position_weight, 1.0)
             
             # 3.2. Оценка компании
-            company_score = 0.5
-            for comp in self.experience_matrix['companies']:
-                if any(alias.lower() in company for alias in comp['aliases']):
-                    company_score = min(comp['weight'], 1.0)
-                    break
+            company_score = unmatched
+            company_weight = matchers['companies'].first_weight(company)
+            if company_weight is not None:
+                company_score = min(company_weight, 1.0)
             
             # 3.3. Оценка задач
-            tasks_score = 0.5
-            for task in self.experience_matrix['tasks']:
-                if any(alias.lower() in description for alias in task['aliases']):
-                    tasks_score = min(max(tasks_score, task['weight']), 1.0)
+            tasks_score = unmatched
+            tasks_weight = matchers['tasks'].max_weight(description)
+            if tasks_weight is not None:
+                tasks_score = min(max(tasks_score, tasks_weight), 1.0)
             
             # 3.4. Общий вес опыта
             experience_weight = (
-                position_score * 0.4 +
-                company_score * 0.3 +
-                tasks_score * 0.3
+                position_score * self.experience_weights['position_share'] +
+                company_score * self.experience_weights['company_share'] +
+                tasks_score * self.experience_weights['tasks_share']
             )
             
             # 3.5. Учитываем продолжительность
@@ -503,7 +753,7 @@ class CompetencyAnalyzer:
             weighted_scores.append(experience_weight * duration_weight)
 
         # 4. Рассчитываем итоговый модификатор
-        quality_modifier = sum(weighted_scores) if weighted_scores else 0.5
+        quality_modifier = sum(weighted_scores) if weighted_scores else unmatched
         quality_modifier = min(quality_modifier, 1.0)
 
         # 5. Финальная оценка
@@ -512,58 +762,31 @@ class CompetencyAnalyzer:
 
     def _calculate_skills_score(self, skills_data: Dict) -> float:
         """Рассчитывает оценку навыков"""
-        # Веса для разных категорий навыков
-        weights = {
-            'required': 1.5,
-            'additional': 1.0,
-            'certifications': 0.8
-        }
-        
-        # Максимальное количество навыков для каждой категории
-        max_counts = {
-            'required': 10,
-            'additional': 15,
-            'certifications': 5
-        }
-        
-        # Считаем количество навыков в каждой категории
-        counts = {
-            'required': len(skills_data.get('required', [])),
-            'additional': len(skills_data.get('additional', [])),
-            'certifications': len(skills_data.get('certifications', []))
-        }
-        
-        # Рассчитываем взвешенную сумму
+        max_counts = self.skills_weights['max_counts']
+
+        # Рассчитываем взвешенную сумму по категориям навыков
         total_score = sum(
-            min(counts[category] / max_counts[category], 1.0) * weight
-            for category, weight in weights.items()
+            min(len(skills_data.get(category, [])) / max_counts[category], 1.0) * weight
+            for category, weight in self.skills_weights['categories'].items()
         )
         
         # Нормализуем к 100 баллам
-        return min(total_score * 20, 100.0)
+        return min(total_score * self.skills_weights['scale'], 100.0)
 
     def _calculate_languages_score(self, languages_data: List[Dict]) -> float:
         """Рассчитывает оценку языковых навыков"""
         if not languages_data:
             return 0.0
 
-        # Веса для разных уровней владения языком
-        level_weights = {
-            'native': 1.2,
-            'fluent': 1.0,
-            'advanced': 0.8,
-            'intermediate': 0.6,
-            'basic': 0.4
-        }
-        
-        # Рассчитываем взвешенную сумму
+        # Рассчитываем взвешенную сумму по уровням владения языком
+        level_weights = self.languages_weights['levels']
         total_score = sum(
             level_weights.get(lang.get('level', '').lower(), 0.0)
             for lang in languages_data
         )
         
         # Нормализуем к 100 баллам
-        return min(total_score * 25, 100.0)
+        return min(total_score * self.languages_weights['scale'], 100.0)
 
     def _calculate_role_scores(self, scores: Dict[str, float]) -> Dict[str, float]:
         """Рассчитывает оценки для каждой роли на основе весов"""
@@ -583,7 +806,8 @@ class CompetencyAnalyzer:
             
         return role_scores
 
-    def _generate_recommendations(self, scores: Dict[str, float], best_fit_role: str) -> Dict[str, Any]:
+    def _generate_recommendations(self, scores: Dict[str, float], best_fit_role: str,
+                                  reference: Optional[ReferenceData] = None) -> Dict[str, Any]:
         """Генерирует рекомендации по улучшению для каждой категории"""
         recommendations = {
             'education': [],
@@ -633,7 +857,7 @@ class CompetencyAnalyzer:
         recommended_course_types = role_courses.get(best_fit_role, [])
         
         # Загружаем доступные курсы
-        available_courses = self.course_recommendations
+        available_courses = (reference or self.reference_data).course_recommendations
         
         # Добавляем конкретные курсы в рекомендации
         for course_type in recommended_course_types:
@@ -649,7 +873,9 @@ class CompetencyAnalyzer:
             
         return recommendations
 
-    def _get_education_details(self, education_data: List[Dict]) -> Dict[str, Any]:
+    def _get_education_details(self, education_data: List[Dict],
+                               reference: Optional[ReferenceData] = None,
+                               score: Optional[float] = None) -> Dict[str, Any]:
         """Возвращает детали образования"""
         if not education_data:
             return {
@@ -663,10 +889,12 @@ class CompetencyAnalyzer:
             'degrees': [edu.get('degree', '') for edu in education_data],
             'institutions': [edu.get('institution', '') for edu in education_data],
             'years': [f"{edu.get('start_date', '')} - {edu.get('end_date', '')}" for edu in education_data],
-            'score': round(self._calculate_education_score(education_data), 1)
+            'score': round(score if score is not None else self._calculate_education_score(education_data, reference), 1)
         }
 
-    def _get_experience_details(self, experience_data: List[Dict]) -> Dict[str, Any]:
+    def _get_experience_details(self, experience_data: List[Dict],
+                                reference: Optional[ReferenceData] = None,
+                                score: Optional[float] = None) -> Dict[str, Any]:
         """Возвращает детали опыта работы"""
         if not experience_data:
             return {
@@ -682,10 +910,10 @@ class CompetencyAnalyzer:
             'companies': [exp.get('company', '') for exp in experience_data],
             'years': [str(exp.get('duration_years', 0)) for exp in experience_data],
             'responsibilities': [exp.get('description', '') for exp in experience_data],
-            'score': round(self._calculate_experience_score(experience_data), 1)
+            'score': round(score if score is not None else self._calculate_experience_score(experience_data, reference), 1)
         }
 
-    def _get_skills_details(self, skills_data: Dict) -> Dict[str, Any]:
+    def _get_skills_details(self, skills_data: Dict, score: Optional[float] = None) -> Dict[str, Any]:
         """Возвращает детали навыков"""
         if not skills_data:
             return {
@@ -699,10 +927,10 @@ class CompetencyAnalyzer:
             'required_skills': skills_data.get('required', []),
             'additional_skills': skills_data.get('additional', []),
             'certifications': skills_data.get('certifications', []),
-            'score': round(self._calculate_skills_score(skills_data), 1)
+            'score': round(score if score is not None else self._calculate_skills_score(skills_data), 1)
         }
 
-    def _get_languages_details(self, languages_data: List[Dict]) -> Dict[str, Any]:
+    def _get_languages_details(self, languages_data: List[Dict], score: Optional[float] = None) -> Dict[str, Any]:
         """Возвращает детали знания языков"""
         if not languages_data:
             return {
@@ -719,77 +947,5 @@ class CompetencyAnalyzer:
                 }
                 for lang in languages_data
             ],
-            'score': round(self._calculate_languages_score(languages_data), 1)
+            'score': round(score if score is not None else self._calculate_languages_score(languages_data), 1)
         }
-
-    def _load_competency_matrix(self) -> Dict:
-        """Загружает матрицу компетенций"""
-        try:
-            with open('data/competency_matrix.yaml', 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                
-            matrix = {
-                'roles': data['roles'],
-                'competencies': {}
-            }
-            
-            # Собираем все компетенции в один словарь
-            for category in ['general', 'algorithms', 'data_management']:
-                for comp in data['competencies'][category]:
-                    matrix['competencies'][comp['name']] = {
-                        'levels': comp['levels'],
-                        'skills': comp.get('skills', [])
-                    }
-            
-            return matrix
-        except Exception as e:
-            self.logger.error(f"Error loading competency matrix: {str(e)}")
-            return {}
-
-    def _load_industry_matrix(self) -> Dict:
-        """Загружает матрицу отраслей"""
-        try:
-            with open('data/industry_matrix.yaml', 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)['industry_matrix']
-        except Exception as e:
-            self.logger.error(f"Error loading industry matrix: {str(e)}")
-            return {}
-
-    def _load_universities(self) -> List[Dict]:
-        """Загружает данные об университетах"""
-        try:
-            with open('data/universities.yaml', 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return data.get('universities', [])
-        except Exception as e:
-            self.logger.error(f"Error loading universities data: {str(e)}")
-            return []
-
-    def _load_course_recommendations(self) -> Dict:
-        """Загружает рекомендации по курсам"""
-        try:
-            with open('data/course_recommendations.yaml', 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f).get('courses', {})
-        except Exception as e:
-            self.logger.error(f"Error loading course recommendations: {str(e)}")
-            return {}
-
-    def _load_experience_matrix(self) -> Dict:
-        """Загружает матрицу опыта"""
-        try:
-            with open('data/experience_matrix.yaml', 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return data.get('experience_matrix', {
-                    'positions': [],
-                    'companies': [],
-                    'tasks': [],
-                    'industries': []
-                })
-        except Exception as e:
-            self.logger.error(f"Error loading experience matrix: {str(e)}")
-            return {
-                'positions': [],
-                'companies': [],
-                'tasks': [],
-                'industries': []
-            }
\ No newline at end of file
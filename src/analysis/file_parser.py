@@ -1,20 +1,28 @@
 import logging
 import os
-from typing import Dict, Any
-import PyPDF2
+import io
+from typing import Dict, Any, Optional, Tuple
 import docx
 from .resume_parser import ResumeParser
+from .pdf_text import BinarySource, extract_pdf_text, read_source
 
 logger = logging.getLogger(__name__)
 
 class FileParser:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, parser: ResumeParser = None, pdf_backend: str = None):
         """
         Initialize FileParser with OpenAI API key
         
         Args:
             api_key (str): OpenAI API key for ResumeParser
+            parser (ResumeParser): Ready ResumeParser to share its client and cache
+            pdf_backend (str): 'pymupdf' or 'pypdf2'; PyMuPDF is used when installed
         """
+        self.pdf_backend = pdf_backend
+        if parser is not None:
+            self.parser = parser
+            return
+
         if not api_key:
             api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
@@ -22,23 +30,16 @@ class FileParser:
             
         self.parser = ResumeParser(api_key=api_key)
 
-    def parse_file(self, file_path: str) -> Dict[str, Any]:
-        """Парсит файл резюме и возвращает структурированные данные"""
+    def parse_file(self, source: BinarySource, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Парсит файл резюме и возвращает структурированные данные
+        
+        Args:
+            source: Путь к файлу, его содержимое (bytes, memoryview) или бинарный поток
+            filename (Optional[str]): Имя файла для определения формата; для пути берется из него
+        """
         try:
-            filename = os.path.basename(file_path)
-            extension = os.path.splitext(filename)[1].lower()
-            
-            logger.info(f"Processing file: {file_path} with extension: {extension}")
-            
-            if extension == '.pdf':
-                text = self._extract_text_from_pdf(file_path)
-            elif extension == '.docx':
-                text = self._extract_text_from_docx(file_path)
-            elif extension == '.doc':
-                text = self._extract_text_from_doc(file_path)
-            else:
-                raise ValueError(f"Unsupported file format: {extension}")
-                
+            filename, text = self.extract_text(source, filename)
             return self.parser.parse_resume(text, filename)
             
         except Exception as e:
@@ -54,21 +55,41 @@ class FileParser:
                 'languages': []
             }
 
-    def _extract_text_from_pdf(self, file_path: str) -> str:
+    def extract_text(self, source: BinarySource, filename: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Извлекает текст файла резюме
+        
+        Returns:
+            Tuple[str, str]: (имя файла, текст)
+        """
+        if filename is None:
+            if not isinstance(source, (str, os.PathLike)):
+                raise ValueError("filename is required when parsing from memory")
+            filename = os.path.basename(source)
+        extension = os.path.splitext(filename)[1].lower()
+        
+        logger.info(f"Processing file: {filename} with extension: {extension}")
+        
+        if extension == '.pdf':
+            text = self._extract_text_from_pdf(source)
+        elif extension == '.docx':
+            text = self._extract_text_from_docx(source)
+        elif extension == '.doc':
+            text = self._extract_text_from_doc(source)
+        else:
+            raise ValueError(f"Unsupported file format: {extension}")
+        return filename, text
+
+    def _extract_text_from_pdf(self, source: BinarySource) -> str:
         """Извлекает текст из PDF файла"""
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            logger.info(f"PDF file has {len(pdf_reader.pages)} pages")
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-                
-        return text.strip()
+        return extract_pdf_text(source, backend=self.pdf_backend)
 
-    def _extract_text_from_docx(self, file_path: str) -> str:
+    def _extract_text_from_docx(self, source: BinarySource) -> str:
         """Извлекает текст из DOCX файла"""
-        doc = docx.Document(file_path)
+        source = read_source(source)
+        if not isinstance(source, str):
+            source = io.BytesIO(source)
+        doc = docx.Document(source)
         text = ""
         
         for paragraph in doc.paragraphs:
@@ -76,7 +97,7 @@ class FileParser:
             
         return text.strip()
 
-    def _extract_text_from_doc(self, file_path: str) -> str:
+    def _extract_text_from_doc(self, source: BinarySource) -> str:
         """Извлекает текст из DOC файла"""
         # TODO: Реализовать извлечение текста из DOC файлов
         raise NotImplementedError("Parsing DOC files is not implemented yet") 
\ No newline at end of file
@@ -0,0 +1,176 @@
+from collections import deque
+from typing import Dict, Any, Optional
+import logging
+import threading
+import time
+import httpx
+
+try:
+    import h2  # noqa: F401 - нужен httpx для HTTP/2
+except ImportError:  # pragma: no cover - HTTP/2 необязателен
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+DEFAULT_WRITE_TIMEOUT = 10.0
+DEFAULT_POOL_TIMEOUT = 10.0
+# Сколько последних запросов учитывается в перцентилях задержки
+LATENCY_WINDOW = 1000
+
+# Событие httpcore, которое означает открытие нового соединения
+CONNECT_EVENT = 'connection.connect_tcp.started'
+
+
+class HTTPMetrics:
+    """Счетчики запросов к LLM: доля переиспользованных соединений и перцентили задержки"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.counters = {'requests': 0, 'new_connections': 0, 'errors': 0}
+
+    def record(self, latency: float, new_connection: bool, error: bool = False):
+        with self._lock:
+            self.counters['requests'] += 1
+            if new_connection:
+                self.counters['new_connections'] += 1
+            if error:
+                self.counters['errors'] += 1
+            else:
+                self._latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики, доля запросов без нового соединения и перцентили задержки в миллисекундах"""
+        with self._lock:
+            stats = dict(self.counters)
+            latencies = sorted(self._latencies)
+        requests = stats['requests']
+        stats['reuse_rate'] = round(1 - stats['new_connections'] / requests, 4) if requests else 0.0
+        for name, percentile in (('p50', 50), ('p90', 90), ('p99', 99)):
+            stats[f'latency_{name}_ms'] = round(_percentile(latencies, percentile) * 1000, 1) if latencies else None
+        return stats
+
+
+def _percentile(values, percentile: float) -> float:
+    # Ближайший ранг по отсортированному списку
+    index = max(0, min(len(values) - 1, int(round(percentile / 100 * len(values))) - 1))
+    return values[index]
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """Транспорт, записывающий в метрики задержку до заголовков ответа и открытие соединений"""
+
+    def __init__(self, metrics: HTTPMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        connected = []
+        request.extensions['trace'] = lambda event, info: connected.append(True) if event == CONNECT_EVENT else None
+        started = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, bool(connected), error=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, bool(connected))
+        return response
+
+
+class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    """Асинхронный вариант InstrumentedTransport"""
+
+    def __init__(self, metrics: HTTPMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        connected = []
+
+        async def trace(event, info):
+            if event == CONNECT_EVENT:
+                connected.append(True)
+
+        request.extensions['trace'] = trace
+        started = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.metrics.record(time.perf_counter() - started, bool(connected), error=True)
+            raise
+        self.metrics.record(time.perf_counter() - started, bool(connected))
+        return response
+
+
+class SharedHTTPClient:
+    """
+    Общий HTTP-клиент для всех обращений к LLM.
+
+    Синхронный ``client`` с пулом keep-alive соединений создается один раз
+    и передается во все backend'ы. Асинхронный клиент привязан к event loop,
+    поэтому ``async_client`` создает новый с теми же настройками и общими
+    метриками; закрывать его должен вызывающий. HTTP/2 включается, только
+    если установлен пакет h2.
+
+    Args:
+        max_connections (int): Максимум одновременных соединений в пуле
+        max_keepalive_connections (int): Сколько простаивающих соединений держать открытыми
+        keepalive_expiry (float): Через сколько секунд простоя соединение закрывается
+        connect_timeout (float): Таймаут установки соединения в секундах
+        read_timeout (float): Таймаут чтения ответа в секундах
+        write_timeout (float): Таймаут отправки запроса в секундах
+        pool_timeout (float): Сколько ждать свободного соединения из пула
+        http2 (bool): Использовать HTTP/2, если он доступен
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 write_timeout: float = DEFAULT_WRITE_TIMEOUT, pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+                 http2: bool = True):
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, write=write_timeout, pool=pool_timeout)
+        self.http2 = http2 and h2 is not None
+        if http2 and h2 is None:
+            logger.info("h2 is not installed, LLM requests use HTTP/1.1")
+        self.metrics = HTTPMetrics()
+        self.client = httpx.Client(
+            timeout=self.timeout,
+            transport=InstrumentedTransport(self.metrics, limits=self.limits, http2=self.http2)
+        )
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Новый асинхронный клиент для текущего event loop"""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=InstrumentedAsyncTransport(self.metrics, limits=self.limits, http2=self.http2)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.metrics.stats()
+        stats.update(http2=self.http2, max_connections=self.limits.max_connections)
+        return stats
+
+    def close(self):
+        self.client.close()
+
+
+def create_http_client(config: Optional[Dict[str, Any]] = None) -> SharedHTTPClient:
+    """
+    Создает общий HTTP-клиент по секции ``llm`` из config.yaml.
+
+    Настройки пула берутся из ``llm.http``; таймаут чтения по умолчанию
+    равен ``llm.timeout``.
+    """
+    config = config or {}
+    options = dict(config.get('http') or {})
+    options.setdefault('read_timeout', config.get('timeout', DEFAULT_READ_TIMEOUT))
+    return SharedHTTPClient(**options)
@@ -0,0 +1,116 @@
+from typing import Dict, List, Any, Tuple
+import json
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """
+    Достает JSON-объект из ответа модели.
+
+    Модели иногда оборачивают JSON в ```json ... ``` или добавляют пояснения
+    до и после него; берется первый корректный объект в тексте.
+
+    Raises:
+        json.JSONDecodeError: Если в тексте нет корректного JSON-объекта
+    """
+    text = text or ''
+    position = text.find('{')
+    while position != -1:
+        try:
+            value, _ = _decoder.raw_decode(text, position)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+        position = text.find('{', position + 1)
+    raise json.JSONDecodeError("No JSON object found in model response", text, 0)
+
+
+class JSONSectionStream:
+    """
+    Инкрементальный разбор JSON-объекта верхнего уровня из потока токенов.
+
+    ``feed`` принимает очередной фрагмент ответа и возвращает пары
+    (ключ, значение) для полей верхнего уровня, значения которых уже
+    полностью пришли, не дожидаясь конца ответа. Текст до первой ``{``
+    (пояснения, открывающий code fence) пропускается.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._scan = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self.result: Dict[str, Any] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Добавляет фрагмент и возвращает поля, завершившиеся в нем"""
+        if self._finished or not chunk:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+        index = self._scan
+        while index < len(text):
+            char = text[index]
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = index + 1
+                index += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._complete_member(text[self._member_start:index]))
+                    self._finished = True
+                    index += 1
+                    break
+            elif char == ',' and self._depth == 1:
+                completed.extend(self._complete_member(text[self._member_start:index]))
+                self._member_start = index + 1
+            index += 1
+
+        self._scan = index
+        return completed
+
+    def _complete_member(self, member: str) -> List[Tuple[str, Any]]:
+        member = member.strip()
+        if not member:
+            return []
+        value = json.loads('{' + member + '}')
+        self.result.update(value)
+        return list(value.items())
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Возвращает собранный объект.
+
+        Raises:
+            json.JSONDecodeError: Если поток не содержал законченного JSON-объекта
+        """
+        if not self._finished:
+            raise json.JSONDecodeError("Incomplete JSON object in model response", self._text, len(self._text))
+        return self.result
@@ -0,0 +1,193 @@
+from typing import Dict, Iterator, List, Any, Callable, Optional
+import json
+import logging
+import openai
+from .local_extractor import LocalExtractor, SECTIONS, SECTION_HEADERS
+from .http_client import SharedHTTPClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REMOTE_BASE_URL = 'https://api.rockapi.ru/openai/v1'
+DEFAULT_REMOTE_MODEL = 'gpt-3.5-turbo'
+# llama.cpp server (llama-server) и другие локальные OpenAI-совместимые серверы
+DEFAULT_LOCAL_BASE_URL = 'http://127.0.0.1:8080/v1'
+DEFAULT_LOCAL_MODEL = 'local-model'
+DEFAULT_TIMEOUT = 60.0
+
+# Маркер, после которого в промпте идет текст резюме
+RESUME_MARKER = 'Текст резюме:\n'
+
+Messages = List[Dict[str, str]]
+
+
+class OpenAIBackend:
+    """
+    Backend для OpenAI-совместимого API.
+
+    Синхронные запросы идут через общий клиент с повторами самого SDK;
+    для асинхронных запросов ``async_session`` создает отдельный клиент
+    без повторов - их выполняет ResumeParser с учетом лимитов и джиттера.
+    При ``json_mode`` запрашивается ``response_format={"type": "json_object"}``,
+    и модель не может обернуть JSON в пояснения. С ``http_client`` запросы
+    идут через общий пул соединений, а таймауты берутся из его настроек.
+    """
+
+    name = 'remote'
+
+    def __init__(self, api_key: Optional[str], base_url: str = DEFAULT_REMOTE_BASE_URL,
+                 model: str = DEFAULT_REMOTE_MODEL, timeout: float = DEFAULT_TIMEOUT, max_retries: int = 2,
+                 json_mode: bool = True, http_client: Optional[SharedHTTPClient] = None):
+        if not api_key:
+            raise ValueError("API key is required")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.json_mode = json_mode
+        self.http_client = http_client
+        if http_client is not None:
+            self.client = openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries,
+                                        http_client=http_client.client)
+        else:
+            self.client = openai.OpenAI(api_key=api_key, base_url=base_url, timeout=timeout,
+                                        max_retries=max_retries)
+
+    def request_options(self, messages: Messages) -> Dict[str, Any]:
+        options = {'model': self.model, 'messages': messages}
+        if self.json_mode:
+            options['response_format'] = {'type': 'json_object'}
+        return options
+
+    def complete(self, messages: Messages) -> str:
+        """Отправляет запрос и возвращает текст ответа модели"""
+        response = self.client.chat.completions.create(**self.request_options(messages))
+        return response.choices[0].message.content
+
+    def stream(self, messages: Messages) -> Iterator[str]:
+        """Отправляет запрос и отдает ответ модели по мере генерации"""
+        chunks = self.client.chat.completions.create(stream=True, **self.request_options(messages))
+        try:
+            for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            chunks.close()
+
+    def async_session(self) -> 'AsyncOpenAISession':
+        """Асинхронная сессия; клиент привязан к текущему event loop"""
+        return AsyncOpenAISession(self)
+
+
+class LocalOpenAIBackend(OpenAIBackend):
+    """Локальный OpenAI-совместимый сервер (llama.cpp, vLLM, Ollama); ключ API не обязателен"""
+
+    name = 'local'
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = DEFAULT_LOCAL_BASE_URL,
+                 model: str = DEFAULT_LOCAL_MODEL, timeout: float = DEFAULT_TIMEOUT, max_retries: int = 2,
+                 json_mode: bool = True, http_client: Optional[SharedHTTPClient] = None):
+        # SDK требует непустой ключ, локальные серверы его не проверяют
+        super().__init__(api_key or 'local', base_url=base_url, model=model, timeout=timeout,
+                         max_retries=max_retries, json_mode=json_mode, http_client=http_client)
+
+
+class AsyncOpenAISession:
+    def __init__(self, backend: OpenAIBackend):
+        self.backend = backend
+        if backend.http_client is not None:
+            self.client = openai.AsyncOpenAI(api_key=backend.api_key, base_url=backend.base_url, max_retries=0,
+                                             http_client=backend.http_client.async_client())
+        else:
+            self.client = openai.AsyncOpenAI(api_key=backend.api_key, base_url=backend.base_url,
+                                             timeout=backend.timeout, max_retries=0)
+
+    async def complete(self, messages: Messages) -> str:
+        response = await self.client.chat.completions.create(**self.backend.request_options(messages))
+        return response.choices[0].message.content
+
+    async def close(self):
+        await self.client.close()
+
+
+def fake_answer(prompt: str) -> str:
+    """Детерминированный ответ: результат локального извлечения по тексту из промпта"""
+    instructions, _, text = prompt.rpartition(RESUME_MARKER)
+    requested = [section for section in SECTIONS if f'"{section}"' in instructions]
+    if len(requested) == 1:
+        # Промпт одной секции содержит ее текст без заголовка
+        text = f"{SECTION_HEADERS[requested[0]][0]}\n{text}"
+    data, _, _ = LocalExtractor().extract(text)
+    return json.dumps({section: data[section] for section in requested or SECTIONS}, ensure_ascii=False)
+
+
+class FakeBackend:
+    """
+    Детерминированный backend без сети для тестов и сравнения backend'ов.
+
+    Args:
+        answer: Функция prompt -> текст ответа модели; по умолчанию локальное извлечение
+        model (str): Имя модели, участвующее в ключе кэша
+        chunk_size (int): Размер фрагментов, которыми ``stream`` отдает ответ
+    """
+
+    name = 'fake'
+
+    def __init__(self, answer: Callable[[str], str] = fake_answer, model: str = 'fake', chunk_size: int = 16):
+        self.answer = answer
+        self.model = model
+        self.chunk_size = chunk_size
+        self.requests: List[Messages] = []
+
+    def complete(self, messages: Messages) -> str:
+        self.requests.append(messages)
+        return self.answer(messages[-1]['content'])
+
+    def stream(self, messages: Messages) -> Iterator[str]:
+        content = self.complete(messages)
+        for start in range(0, len(content), self.chunk_size):
+            yield content[start:start + self.chunk_size]
+
+    def async_session(self) -> 'FakeSession':
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, backend: FakeBackend):
+        self.backend = backend
+
+    async def complete(self, messages: Messages) -> str:
+        return self.backend.complete(messages)
+
+    async def close(self):
+        pass
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    LocalOpenAIBackend.name: LocalOpenAIBackend,
+    FakeBackend.name: FakeBackend
+}
+
+
+def create_backend(config: Optional[Dict[str, Any]] = None, api_key: Optional[str] = None,
+                   http_client: Optional[SharedHTTPClient] = None):
+    """
+    Создает backend по секции ``llm`` из config.yaml.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Поля backend (remote, local, fake), model,
+            base_url, timeout, max_retries, json_mode
+        api_key (Optional[str]): Ключ API для удаленного backend
+        http_client (Optional[SharedHTTPClient]): Общий HTTP-клиент приложения
+    """
+    config = dict(config or {})
+    name = config.pop('backend', OpenAIBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    if name == FakeBackend.name:
+        return FakeBackend(model=config.get('model', 'fake'))
+
+    kwargs = {key: config[key] for key in ('base_url', 'model', 'timeout', 'max_retries', 'json_mode')
+              if key in config}
+    logger.info(f"Using {name} LLM backend with model {kwargs.get('model', 'default')}")
+    return BACKENDS[name](api_key=api_key, http_client=http_client, **kwargs)
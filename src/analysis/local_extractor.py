@@ -0,0 +1,382 @@
+from typing import Dict, List, Any, Tuple
+from datetime import date
+import calendar
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Меняется при любом изменении правил извлечения, чтобы сбросить кэш разбора
+EXTRACTOR_VERSION = '1'
+
+# Секции, которые оцениваются по уверенности и могут быть отданы LLM
+SECTIONS = ('education', 'experience', 'skills', 'languages')
+
+SECTION_HEADERS = {
+    'experience': ['опыт работы', 'профессиональный опыт', 'места работы', 'трудовой стаж',
+                   'work experience', 'professional experience', 'experience'],
+    'education': ['высшее образование', 'образование', 'education'],
+    'skills': ['ключевые навыки', 'профессиональные навыки', 'технические навыки', 'навыки',
+               'компетенции', 'key skills', 'technical skills', 'skills'],
+    'languages': ['знание языков', 'иностранные языки', 'языки', 'languages'],
+    'certifications': ['повышение квалификации, курсы', 'повышение квалификации', 'дополнительное образование',
+                       'электронные сертификаты', 'сертификаты', 'курсы', 'certifications', 'certificates',
+                       'courses'],
+    'other': ['обо мне', 'о себе', 'дополнительная информация', 'желаемая должность и зарплата',
+              'желаемая должность', 'контакты', 'гражданство, время в пути до работы', 'гражданство',
+              'рекомендации', 'портфолио', 'тесты, экзамены', 'about me', 'summary',
+              'additional information', 'contacts', 'references', 'portfolio', 'citizenship']
+}
+
+RELEVANT_KEYWORDS = [
+    'data', 'analytics', 'analysis', 'python', 'sql',
+    'machine learning', 'ai', 'artificial intelligence',
+    'big data', 'data science', 'analyst'
+]
+
+MANAGEMENT_KEYWORDS = [
+    'lead', 'head', 'manager', 'director', 'chief',
+    'руководитель', 'начальник', 'директор', 'глава'
+]
+
+MONTHS = {
+    'янв': 1, 'фев': 2, 'мар': 3, 'апр': 4, 'май': 5, 'мая': 5, 'июн': 6,
+    'июл': 7, 'авг': 8, 'сен': 9, 'окт': 10, 'ноя': 11, 'дек': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+LANGUAGES = {
+    'английский': 'english', 'english': 'english',
+    'русский': 'russian', 'russian': 'russian',
+    'немецкий': 'german', 'german': 'german', 'deutsch': 'german',
+    'французский': 'french', 'french': 'french',
+    'испанский': 'spanish', 'spanish': 'spanish',
+    'итальянский': 'italian', 'italian': 'italian',
+    'китайский': 'chinese', 'chinese': 'chinese',
+    'японский': 'japanese', 'japanese': 'japanese',
+    'корейский': 'korean', 'korean': 'korean',
+    'португальский': 'portuguese', 'portuguese': 'portuguese',
+    'турецкий': 'turkish', 'turkish': 'turkish',
+    'арабский': 'arabic', 'arabic': 'arabic',
+    'украинский': 'ukrainian', 'ukrainian': 'ukrainian'
+}
+
+# Порядок важен: более специфичные формулировки проверяются раньше общих
+LANGUAGE_LEVELS = [
+    (r'\bc2\b', 'fluent'), (r'\bc1\b', 'advanced'),
+    (r'\bb2\b', 'intermediate'), (r'\bb1\b', 'intermediate'),
+    (r'\ba[12]\b', 'basic'),
+    (r'родной|native', 'native'),
+    (r'свободн|в совершенстве|fluent|proficient', 'fluent'),
+    (r'upper[- ]intermediate|средне-продвинутый', 'intermediate'),
+    (r'pre[- ]intermediate|elementary|beginner', 'basic'),
+    (r'продвинут|advanced', 'advanced'),
+    (r'intermediate|средн', 'intermediate'),
+    (r'базов|начальн|basic|технический|читаю', 'basic')
+]
+
+DEGREES = [
+    (r'кандидат\s+наук|доктор\s+наук|аспирантура|\bphd\b|doctor', 'phd'),
+    (r'неоконченное\s+высшее|incomplete', 'incomplete_higher'),
+    (r'магистр|магистратура|\bmaster|\bmsc\b', 'master'),
+    (r'бакалавр|бакалавриат|\bbachelor|\bbsc\b', 'bachelor'),
+    (r'специалист|специалитет|specialist', 'specialist')
+]
+
+# Стандартные сроки обучения, если указан только год окончания
+DEGREE_YEARS = {'phd': 4, 'master': 2, 'bachelor': 4, 'specialist': 5, 'incomplete_higher': 4}
+
+_DATE = r'(?:[A-Za-zА-Яа-яЁё]{3,9}\.?\s+(?:19|20)\d{2}|\d{1,2}[./](?:19|20)\d{2}|(?:19|20)\d{2})'
+_PRESENT = r'(?:по\s+)?настоящее\s+время|н\.\s?в\.|present|current|now|сейчас|today'
+_RANGE_RE = re.compile(rf'({_DATE})\s*(?:[—–-]|по|to|until)\s*({_DATE}|{_PRESENT})', re.IGNORECASE)
+_YEAR_LINE_RE = re.compile(r'^((?:19|20)\d{2})(?:\s*[—–-]\s*((?:19|20)\d{2}))?\b\s*[,.]?\s*(.*)$')
+_DURATION_RE = re.compile(r'^\d+\s*(?:год|года|лет|месяц|месяца|месяцев|year|years|month|months)\b', re.IGNORECASE)
+_LOCATION_RE = re.compile(
+    r'^(?:москва|санкт-петербург|россия|новосибирск|екатеринбург|казань|нижний новгород|удаленно|'
+    r'moscow|saint petersburg|russia|remote)\b|\b[\w-]+\.(?:ru|com|io|net|org|рф)\b',
+    re.IGNORECASE
+)
+_SKILL_SPLIT_RE = re.compile(r'[,;•·|\t]|\s{2,}')
+_POSITION_COMPANY_SPLIT_RE = re.compile(r'\s+[—–-]\s+|,\s+|\s+at\s+|\s+@\s+|\s+в\s+|\s*\|\s*')
+
+
+def _header_pattern() -> Tuple[re.Pattern, List[str]]:
+    alternatives = []
+    for section, headers in SECTION_HEADERS.items():
+        for header in headers:
+            alternatives.append((header, section))
+    # Более длинные заголовки проверяются первыми («высшее образование» раньше «образование»)
+    alternatives.sort(key=lambda item: -len(item[0]))
+    pattern = '|'.join(f'(?P<h{index}>{re.escape(header)})' for index, (header, _) in enumerate(alternatives))
+    header_re = re.compile(rf'^\s*(?:{pattern})\s*[:：]?\s*(?P<rest>(?:[—–-].*|\(.*\))?)\s*$', re.IGNORECASE)
+    return header_re, [section for _, section in alternatives]
+
+
+_HEADER_RE, _HEADER_SECTIONS = _header_pattern()
+
+
+def parse_date(token: str, end: bool = False) -> str:
+    """Переводит «Январь 2019», «01.2019» или «2019» в YYYY-MM-DD (начало или конец периода)"""
+    token = token.strip().lower()
+    if re.fullmatch(_PRESENT, token, re.IGNORECASE):
+        return date.today().isoformat()
+
+    year_match = re.search(r'(?:19|20)\d{2}', token)
+    if not year_match:
+        return ''
+    year = int(year_match.group(0))
+
+    month = None
+    numeric = re.match(r'(\d{1,2})[./]', token)
+    if numeric:
+        month = int(numeric.group(1))
+    else:
+        word = re.match(r'[a-zа-яё]+', token)
+        if word:
+            month = MONTHS.get(word.group(0)[:3])
+    if month is None or not 1 <= month <= 12:
+        return f'{year}-12-31' if end else f'{year}-01-01'
+    day = calendar.monthrange(year, month)[1] if end else 1
+    return f'{year}-{month:02d}-{day:02d}'
+
+
+def _years_between(start: str, end: str) -> float:
+    try:
+        delta = date.fromisoformat(end) - date.fromisoformat(start)
+    except ValueError:
+        return 0.0
+    return max(round(delta.days / 365.25, 2), 0.0)
+
+
+def _match_degree(text: str) -> str:
+    for pattern, degree in DEGREES:
+        if re.search(pattern, text, re.IGNORECASE):
+            return degree
+    return ''
+
+
+def _strip_degree(text: str) -> str:
+    for pattern, _ in DEGREES:
+        text = re.sub(rf'\s*[,(]?\s*(?:{pattern})\s*\)?', '', text, flags=re.IGNORECASE)
+    return text.strip(' ,.()')
+
+
+class LocalExtractor:
+    """
+    Детерминированное извлечение данных из резюме без обращения к LLM.
+
+    Текст делится на секции по заголовкам («Опыт работы», «Образование»,
+    «Ключевые навыки», «Знание языков» и их английским вариантам), каждая
+    секция разбирается правилами для шаблонных резюме (выгрузки hh.ru и
+    похожие), а для каждой оцениваемой секции считается уверенность от 0 до 1.
+    Результат имеет ту же структуру, что и ответ LLM.
+    """
+
+    def split_sections(self, text: str) -> Dict[str, List[str]]:
+        """Возвращает строки каждой секции; текст до первого заголовка попадает в 'header'"""
+        sections: Dict[str, List[str]] = {'header': []}
+        current = 'header'
+        for raw_line in text.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            match = _HEADER_RE.match(line) if len(line) <= 60 else None
+            if match:
+                group = next(name for name, value in match.groupdict().items()
+                             if value is not None and name != 'rest')
+                section = _HEADER_SECTIONS[int(group[1:])]
+                if section != current:
+                    current = section
+                    sections.setdefault(current, [])
+                rest = match.group('rest').strip(' —–-')
+                if rest:
+                    sections[current].append(rest)
+                continue
+            sections[current].append(line)
+        return sections
+
+    def extract(self, text: str) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, str]]:
+        """
+        Извлекает данные из текста резюме.
+
+        Returns:
+            Tuple: (данные в формате ответа LLM, уверенность по секциям,
+            текст найденных секций)
+        """
+        sections = self.split_sections(text or '')
+        education, education_confidence = self.parse_education(sections.get('education', []))
+        experience, experience_confidence = self.parse_experience(sections.get('experience', []))
+        skills, skills_confidence = self.parse_skills(sections.get('skills', []))
+        skills['certifications'] = self.parse_certifications(sections.get('certifications', []))
+        languages, languages_confidence = self.parse_languages(sections.get('languages', []))
+
+        data = {
+            'education': education,
+            'experience': experience,
+            'skills': skills,
+            'languages': languages
+        }
+        confidence = {
+            'education': education_confidence if 'education' in sections else 0.0,
+            'experience': experience_confidence if 'experience' in sections else 0.0,
+            'skills': skills_confidence if 'skills' in sections else 0.0,
+            'languages': languages_confidence if 'languages' in sections else 0.0
+        }
+        section_texts = {name: '\n'.join(lines) for name, lines in sections.items() if name in SECTIONS}
+        return data, confidence, section_texts
+
+    def parse_experience(self, lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Разбирает опыт работы. Каждая запись начинается строкой с периодом;
+        должность и компания берутся либо из той же строки («Data Scientist,
+        Яндекс, 2019 — 2021»), либо из следующих строк в порядке hh.ru:
+        период, стаж, компания, город/сайт, должность, описание.
+        """
+        entries: List[Tuple[str, str, str, List[str]]] = []
+        preamble = 0
+        for line in lines:
+            match = _RANGE_RE.search(line)
+            if match:
+                prefix = line[:match.start()].strip(' ,|—–-()')
+                entries.append((match.group(1), match.group(2), prefix, []))
+            elif entries:
+                entries[-1][3].append(line)
+            elif not _DURATION_RE.match(line):
+                preamble += 1
+
+        experience = []
+        completeness = []
+        for start_token, end_token, prefix, body in entries:
+            body = [line for line in body if not _DURATION_RE.match(line)]
+            position, company = '', ''
+            if prefix:
+                parts = [part.strip() for part in _POSITION_COMPANY_SPLIT_RE.split(prefix, maxsplit=1)]
+                position = parts[0]
+                company = parts[1] if len(parts) > 1 else ''
+            else:
+                if body:
+                    company = body.pop(0)
+                if body and _LOCATION_RE.search(body[0]):
+                    body.pop(0)
+                if body:
+                    position = body.pop(0)
+
+            start_date = parse_date(start_token)
+            end_date = parse_date(end_token, end=True)
+            description = '\n'.join(body)
+            context = f'{position} {company} {description}'.lower()
+            experience.append({
+                'company': company,
+                'position': position,
+                'start_date': start_date,
+                'end_date': end_date,
+                'duration_years': f'{_years_between(start_date, end_date):.2f}',
+                'description': description,
+                'is_relevant': any(keyword in context for keyword in RELEVANT_KEYWORDS),
+                'is_management': any(keyword in context for keyword in MANAGEMENT_KEYWORDS)
+            })
+            # Слишком длинные «должность» и «компания» означают, что шаблон не распознан
+            filled = [bool(start_date), 0 < len(company) <= 80, 0 < len(position) <= 80]
+            completeness.append(sum(filled) / len(filled))
+
+        if not experience:
+            return [], 0.0
+        confidence = sum(completeness) / len(completeness)
+        if preamble:
+            # Строки до первого периода означают другой порядок полей
+            confidence *= 0.5
+        return experience, round(confidence, 3)
+
+    def parse_education(self, lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Разбирает образование. Запись начинается с года выпуска или периода
+        обучения, за которыми следуют учебное заведение и специальность;
+        степень берется из записи или из строки перед записями («Высшее образование (Магистр)»).
+        """
+        section_degree = ''
+        entries: List[Tuple[str, str, List[str]]] = []
+        for line in lines:
+            match = _YEAR_LINE_RE.match(line)
+            if match:
+                start_year, end_year = (match.group(1), match.group(2)) if match.group(2) else (None, match.group(1))
+                entries.append((start_year, end_year, [match.group(3)] if match.group(3) else []))
+            elif entries:
+                entries[-1][2].append(line)
+            else:
+                section_degree = _match_degree(line) or section_degree
+
+        education = []
+        completeness = []
+        for start_year, end_year, body in entries:
+            entry_text = ' '.join(body)
+            degree = _match_degree(entry_text) or section_degree
+            institution = _strip_degree(body[0]) if body else ''
+            speciality = _strip_degree(', '.join(body[1:])) if len(body) > 1 else ''
+            if start_year is None:
+                start_year = str(int(end_year) - DEGREE_YEARS.get(degree, 4))
+            education.append({
+                'degree': degree,
+                'institution': institution,
+                'speciality': speciality,
+                'start_date': f'{start_year}-01-01',
+                'end_date': f'{end_year}-12-31'
+            })
+            filled = [bool(degree), 0 < len(institution) <= 150]
+            completeness.append(sum(filled) / len(filled))
+
+        if not education:
+            return [], 0.0
+        return education, round(sum(completeness) / len(completeness), 3)
+
+    def parse_skills(self, lines: List[str]) -> Tuple[Dict[str, List[str]], float]:
+        """Разбирает навыки: списки через запятую, табуляцию, маркеры или по одному в строке"""
+        skills = {'required': [], 'additional': [], 'certifications': []}
+        category = 'required'
+        long_items = 0
+        for line in lines:
+            if re.match(r'(?i)^(дополнительн|additional|другие|other)', line):
+                category = 'additional'
+                continue
+            for item in _SKILL_SPLIT_RE.split(line):
+                item = item.strip(' -–—*')
+                if not item:
+                    continue
+                if len(item) > 60:
+                    long_items += 1
+                    continue
+                if item not in skills[category]:
+                    skills[category].append(item)
+
+        found = len(skills['required']) + len(skills['additional'])
+        if not found:
+            return skills, 0.0
+        # Навыки, описанные связным текстом, правила разбирают плохо
+        return skills, round(found / (found + long_items), 3)
+
+    def parse_languages(self, lines: List[str]) -> Tuple[List[Dict[str, str]], float]:
+        """Разбирает строки вида «Английский — C1 — Продвинутый» или «English: fluent»"""
+        languages = []
+        recognized = 0
+        for line in lines:
+            lowered = line.lower()
+            name = next((value for key, value in LANGUAGES.items() if re.search(rf'\b{key}\b', lowered)), None)
+            level = next((value for pattern, value in LANGUAGE_LEVELS if re.search(pattern, lowered)), None)
+            if name and level:
+                recognized += 1
+                languages.append({'language': name, 'level': level})
+            elif name:
+                languages.append({'language': name, 'level': 'basic'})
+
+        if not lines:
+            return languages, 0.0
+        return languages, round(recognized / len(lines), 3)
+
+    def parse_certifications(self, lines: List[str]) -> List[str]:
+        """Названия курсов и сертификатов без годов"""
+        certifications = []
+        for line in lines:
+            name = re.sub(r'^(?:19|20)\d{2}\s*', '', line).strip(' ,.-–—')
+            if name:
+                certifications.append(name)
+        return certifications
@@ -0,0 +1,213 @@
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = 'parse_cache.sqlite'
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MEMORY_ENTRIES = 256
+# Как часто (в записях) проверять размер и срок хранения на диске
+PRUNE_EVERY = 100
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Схлопывает пробельные символы, чтобы переносы строк из PDF не меняли ключ"""
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+def cache_key(text: str, model: str, prompt_version: str) -> str:
+    """Ключ кэша: sha256 от нормализованного текста, модели и версии промпта"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_text(text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Кэш результатов разбора резюме: LRU в памяти перед SQLite-хранилищем на диске.
+
+    Записи на диске удаляются по истечении ``ttl`` секунд и, когда суммарный
+    размер превышает ``max_bytes``, в порядке давности последнего обращения.
+    SQLite работает в режиме WAL, поэтому одним файлом могут пользоваться
+    несколько потоков и процессов; у каждого потока свое соединение.
+    """
+
+    def __init__(self, cache_dir: str = 'cache', ttl: Optional[float] = DEFAULT_TTL,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _init_schema(self):
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_parse_cache_accessed_at ON parse_cache (accessed_at);
+        """)
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Возвращает сохраненный результат или None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry[1], now):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return json.loads(entry[0])
+
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT value, created_at FROM parse_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                connection.execute('DELETE FROM parse_cache WHERE key = ?', (key,))
+                self._count('evictions')
+                row = None
+            if row is None:
+                self._count('misses')
+                return None
+            connection.execute('UPDATE parse_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            logger.error(f"Error reading parse cache: {str(e)}")
+            self._count('misses')
+            return None
+
+        self._count('disk_hits')
+        self._remember(key, row[0], row[1])
+        return json.loads(row[0])
+
+    def set(self, key: str, data: Dict[str, Any]):
+        """Сохраняет результат разбора"""
+        value = json.dumps(data, ensure_ascii=False)
+        now = time.time()
+        self._remember(key, value, now)
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO parse_cache (key, value, size, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, value, len(value.encode('utf-8')), now, now)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing parse cache: {str(e)}")
+            return
+
+        with self._lock:
+            self.counters['writes'] += 1
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def _remember(self, key: str, value: str, created_at: float):
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def prune(self) -> int:
+        """Удаляет просроченные записи и самые старые по обращению сверх max_bytes"""
+        removed = 0
+        try:
+            connection = self._connection()
+            if self.ttl is not None:
+                removed += connection.execute(
+                    'DELETE FROM parse_cache WHERE created_at < ?', (time.time() - self.ttl,)
+                ).rowcount
+            if self.max_bytes is not None:
+                total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM parse_cache').fetchone()[0]
+                if total > self.max_bytes:
+                    # Граница по accessed_at, после которой оставшиеся записи укладываются в лимит
+                    cutoff = None
+                    excess = total - self.max_bytes
+                    for accessed_at, size in connection.execute(
+                            'SELECT accessed_at, size FROM parse_cache ORDER BY accessed_at'):
+                        excess -= size
+                        cutoff = accessed_at
+                        if excess <= 0:
+                            break
+                    removed += connection.execute(
+                        'DELETE FROM parse_cache WHERE accessed_at <= ?', (cutoff,)
+                    ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error pruning parse cache: {str(e)}")
+            return removed
+
+        if removed:
+            # Вытесненные с диска записи не должны оставаться в памяти других потоков
+            with self._lock:
+                self._memory.clear()
+            self._count('evictions', removed)
+            logger.info(f"Evicted {removed} parse cache entries")
+        return removed
+
+    def clear(self):
+        """Полностью очищает кэш"""
+        with self._lock:
+            self._memory.clear()
+        self._connection().execute('DELETE FROM parse_cache')
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов, число и суммарный размер записей на диске"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self._memory)
+        try:
+            entries, size = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache'
+            ).fetchone()
+            stats.update(disk_entries=entries, disk_bytes=size)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading parse cache stats: {str(e)}")
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,183 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import io
+import logging
+import os
+import threading
+import PyPDF2
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:  # pragma: no cover - PyMuPDF необязателен
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+# Документы с меньшим числом страниц разбираются одним потоком
+PARALLEL_MIN_PAGES = 16
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# PyMuPDF не потокобезопасен: вызовы из потоков Flask и JobQueue выполняются по одному
+_fitz_lock = threading.Lock()
+
+# Путь к файлу, содержимое PDF в памяти или открытый бинарный поток
+BinarySource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+
+def read_source(source: BinarySource) -> Union[str, bytes, bytearray, memoryview]:
+    """Приводит источник к пути или буферу; потоки читаются в память целиком"""
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, os.PathLike):
+        return os.fspath(source)
+    return source.read()
+
+
+class PyMuPDFBackend:
+    """
+    Извлечение текста через PyMuPDF (MuPDF на C, в разы быстрее PyPDF2).
+
+    Каждое обращение к fitz выполняется под _fitz_lock; блокировка не
+    удерживается между страницами, поэтому брошенный итератор не блокирует
+    другие потоки.
+    """
+
+    name = 'pymupdf'
+
+    def _open(self, source):
+        if isinstance(source, str):
+            return fitz.open(source)
+        return fitz.open(stream=source, filetype='pdf')
+
+    def page_count(self, source) -> int:
+        with _fitz_lock, self._open(source) as document:
+            return document.page_count
+
+    def iter_pages(self, source, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        with _fitz_lock:
+            document = self._open(source)
+            stop = document.page_count if stop is None else min(stop, document.page_count)
+        try:
+            for number in range(start, stop):
+                with _fitz_lock:
+                    text = document.load_page(number).get_text()
+                yield text
+        finally:
+            with _fitz_lock:
+                document.close()
+
+
+class PyPDF2Backend:
+    """Извлечение текста через PyPDF2 (чистый Python)"""
+
+    name = 'pypdf2'
+
+    def _open(self, source):
+        if isinstance(source, str):
+            return open(source, 'rb')
+        return io.BytesIO(source)
+
+    def page_count(self, source) -> int:
+        with self._open(source) as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+    def iter_pages(self, source, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        with self._open(source) as file:
+            pages = PyPDF2.PdfReader(file).pages
+            stop = len(pages) if stop is None else min(stop, len(pages))
+            for number in range(start, stop):
+                yield pages[number].extract_text() or ''
+
+
+BACKENDS = {
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    PyPDF2Backend.name: PyPDF2Backend
+}
+
+
+def get_backend(name: Optional[str] = None):
+    """Возвращает backend по имени; по умолчанию PyMuPDF, если он установлен"""
+    if name is None:
+        name = PyMuPDFBackend.name if fitz is not None else PyPDF2Backend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name}")
+    if name == PyMuPDFBackend.name and fitz is None:
+        raise ValueError("PyMuPDF is not installed")
+    return BACKENDS[name]()
+
+
+def _extract_range(backend: str, source, start: int, stop: int) -> List[str]:
+    # Каждый диапазон открывает документ сам: объекты fitz и PdfReader не делятся между потоками
+    return list(get_backend(backend).iter_pages(source, start, stop))
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    Общий пул потоков, создается при первом большом документе.
+
+    Пул процессов здесь не подходит: при spawn и forkserver каждый процесс
+    заново импортирует главный модуль, а src/main.py при импорте запускает
+    все приложение (база, очереди, клиент LLM). Вызовы PyMuPDF в потоках
+    идут через _fitz_lock.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-text')
+            _pool_workers = workers
+        return _pool
+
+
+def _page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pdf_text(source: BinarySource, backend: Optional[str] = None,
+                     workers: int = DEFAULT_WORKERS,
+                     parallel_min_pages: int = PARALLEL_MIN_PAGES) -> str:
+    """
+    Извлекает текст PDF целиком.
+
+    Большие документы делятся на диапазоны страниц, которые разбираются
+    в общем пуле потоков; текст страниц склеивается один раз.
+
+    Args:
+        source (BinarySource): Путь к PDF, его содержимое или бинарный поток
+        backend (Optional[str]): 'pymupdf' или 'pypdf2'; по умолчанию лучший доступный
+        workers (int): Число потоков для больших документов
+        parallel_min_pages (int): Минимальное число страниц для параллельного разбора
+    """
+    pdf_backend = get_backend(backend)
+    source = read_source(source)
+    page_count = pdf_backend.page_count(source)
+    logger.info(f"PDF file has {page_count} pages")
+
+    if workers > 1 and page_count >= parallel_min_pages:
+        ranges = _page_ranges(page_count, workers)
+        try:
+            pool = _get_pool(workers)
+            futures = [pool.submit(_extract_range, pdf_backend.name, source, start, stop)
+                       for start, stop in ranges]
+            pages = [text for future in futures for text in future.result()]
+            return '\n'.join(pages).strip()
+        except Exception as e:
+            logger.warning(f"Parallel PDF extraction failed, falling back to a single thread: {str(e)}")
+
+    return '\n'.join(pdf_backend.iter_pages(source)).strip()
+
+
+def shutdown_pool():
+    """Останавливает пул потоков (для тестов и завершения приложения)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,57 @@
+from typing import Optional
+import asyncio
+import random
+import time
+import openai
+
+
+class TokenBucket:
+    """Асинхронный token bucket: не более ``rate`` запросов в секунду с пиком ``capacity``"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Ждет, пока в ведре появится токен, и забирает его"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def is_retryable(error: Exception) -> bool:
+    """429, 5xx, таймауты и сетевые ошибки стоит повторить, остальные - нет"""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0,
+                  error: Optional[Exception] = None) -> float:
+    """Экспоненциальная задержка с полным джиттером; учитывает Retry-After ответа"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), cap))
+        except ValueError:
+            pass
+    return delay
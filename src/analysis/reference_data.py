@@ -0,0 +1,362 @@
+from typing import Dict, List, Any, Optional, Tuple
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+import yaml
+from .alias_matcher import AliasMatcher, build_experience_matchers
+from .university_index import UniversityIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = 'data'
+DEFAULT_CHECK_INTERVAL = 30.0
+
+# Бинарный кэш скомпилированных справочников. Версию формата нужно повышать
+# при любом изменении состава полей ReferenceData или устройства индексов
+CACHE_FILENAME = 'reference_data.cache'
+CACHE_FORMAT_VERSION = 2
+
+SOURCE_FILES = (
+    'competency_matrix.yaml',
+    'industry_matrix.yaml',
+    'universities.yaml',
+    'course_recommendations.yaml',
+    'experience_matrix.yaml'
+)
+
+EMPTY_EXPERIENCE_MATRIX = {
+    'positions': [],
+    'companies': [],
+    'tasks': [],
+    'industries': []
+}
+
+
+def source_hash(data_dir: str) -> str:
+    """SHA-256 содержимого исходных YAML-файлов и версии формата кэша"""
+    digest = hashlib.sha256(f"format:{CACHE_FORMAT_VERSION}".encode())
+    for filename in SOURCE_FILES:
+        digest.update(filename.encode())
+        try:
+            with open(os.path.join(data_dir, filename), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+
+def _read_yaml(data_dir: str, filename: str) -> Any:
+    with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def load_competency_matrix(data_dir: str = DEFAULT_DATA_DIR, strict: bool = False) -> Dict:
+    """Загружает матрицу компетенций"""
+    try:
+        data = _read_yaml(data_dir, 'competency_matrix.yaml')
+
+        matrix = {
+            'roles': data['roles'],
+            'competencies': {}
+        }
+
+        # Собираем все компетенции в один словарь
+        for category in ['general', 'algorithms', 'data_management']:
+            for comp in data['competencies'][category]:
+                matrix['competencies'][comp['name']] = {
+                    'levels': comp['levels'],
+                    'skills': comp.get('skills', [])
+                }
+
+        return matrix
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading competency matrix: {str(e)}")
+        return {}
+
+
+def load_industry_matrix(data_dir: str = DEFAULT_DATA_DIR, strict: bool = False) -> Dict:
+    """Загружает матрицу отраслей"""
+    try:
+        return _read_yaml(data_dir, 'industry_matrix.yaml')['industry_matrix']
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading industry matrix: {str(e)}")
+        return {}
+
+
+def load_universities(data_dir: str = DEFAULT_DATA_DIR, strict: bool = False) -> List[Dict]:
+    """Загружает данные об университетах"""
+    try:
+        return _read_yaml(data_dir, 'universities.yaml').get('universities', [])
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading universities data: {str(e)}")
+        return []
+
+
+def load_course_recommendations(data_dir: str = DEFAULT_DATA_DIR, strict: bool = False) -> Dict:
+    """Загружает рекомендации по курсам"""
+    try:
+        return _read_yaml(data_dir, 'course_recommendations.yaml').get('courses', {})
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading course recommendations: {str(e)}")
+        return {}
+
+
+def load_experience_matrix(data_dir: str = DEFAULT_DATA_DIR, strict: bool = False) -> Dict:
+    """Загружает матрицу опыта"""
+    try:
+        data = _read_yaml(data_dir, 'experience_matrix.yaml')
+        return data.get('experience_matrix', dict(EMPTY_EXPERIENCE_MATRIX)) or dict(EMPTY_EXPERIENCE_MATRIX)
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading experience matrix: {str(e)}")
+        return dict(EMPTY_EXPERIENCE_MATRIX)
+
+
+class ReferenceData:
+    """Снимок справочных данных из ``data/*.yaml`` вместе с производными индексами.
+
+    Снимок создается один раз и далее только читается: анализатор не выполняет
+    обращений к диску во время обработки запроса, а один и тот же снимок
+    разделяется всеми экземплярами ``CompetencyAnalyzer`` в процессе.
+    """
+
+    __slots__ = (
+        'data_dir',
+        'source_hash',
+        'competency_matrix',
+        'industry_matrix',
+        'universities',
+        'course_recommendations',
+        'experience_matrix',
+        'experience_matchers',
+        'university_index'
+    )
+
+    # Поля, которые сохраняются в бинарный кэш (data_dir определяется при загрузке)
+    _compiled_fields = __slots__[1:]
+
+    def __init__(self, data_dir: str, source_hash: str, competency_matrix: Dict,
+                 industry_matrix: Dict, universities: List[Dict], course_recommendations: Dict,
+                 experience_matrix: Dict, experience_matchers: Dict[str, AliasMatcher],
+                 university_index: UniversityIndex):
+        object.__setattr__(self, 'data_dir', data_dir)
+        object.__setattr__(self, 'source_hash', source_hash)
+        object.__setattr__(self, 'competency_matrix', competency_matrix)
+        object.__setattr__(self, 'industry_matrix', industry_matrix)
+        object.__setattr__(self, 'universities', universities)
+        object.__setattr__(self, 'course_recommendations', course_recommendations)
+        object.__setattr__(self, 'experience_matrix', experience_matrix)
+        object.__setattr__(self, 'experience_matchers', experience_matchers)
+        object.__setattr__(self, 'university_index', university_index)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReferenceData is read-only")
+
+    @classmethod
+    def load(cls, data_dir: str = DEFAULT_DATA_DIR, strict: bool = False,
+             use_cache: bool = True) -> 'ReferenceData':
+        """Загружает справочные данные, по возможности из бинарного кэша.
+
+        Если кэш отсутствует или построен по другим версиям YAML-файлов,
+        данные читаются из YAML, а кэш пересобирается. В режиме ``strict``
+        ошибки чтения не подменяются пустыми данными, а пробрасываются
+        вызывающему коду.
+        """
+        digest = source_hash(data_dir)
+        if use_cache:
+            snapshot = cls.load_compiled(data_dir, digest)
+            if snapshot is not None:
+                return snapshot
+
+        try:
+            snapshot = cls.from_yaml(data_dir, digest, strict=True)
+        except Exception:
+            if strict:
+                raise
+            # Неполные данные не кэшируем, чтобы не закрепить ошибку
+            return cls.from_yaml(data_dir, digest, strict=False)
+
+        if use_cache:
+            snapshot.save_compiled()
+        return snapshot
+
+    @classmethod
+    def from_yaml(cls, data_dir: str, digest: Optional[str] = None, strict: bool = False) -> 'ReferenceData':
+        """Читает YAML-файлы и строит индексы"""
+        experience_matrix = load_experience_matrix(data_dir, strict)
+        universities = load_universities(data_dir, strict)
+        return cls(
+            data_dir=data_dir,
+            source_hash=digest or source_hash(data_dir),
+            competency_matrix=load_competency_matrix(data_dir, strict),
+            industry_matrix=load_industry_matrix(data_dir, strict),
+            universities=universities,
+            course_recommendations=load_course_recommendations(data_dir, strict),
+            experience_matrix=experience_matrix,
+            experience_matchers=build_experience_matchers(experience_matrix),
+            university_index=UniversityIndex(universities)
+        )
+
+    @classmethod
+    def load_compiled(cls, data_dir: str, digest: Optional[str] = None) -> Optional['ReferenceData']:
+        """Загружает снимок из бинарного кэша или возвращает None, если кэш устарел"""
+        path = os.path.join(data_dir, CACHE_FILENAME)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading reference data cache {path}: {str(e)}")
+            return None
+
+        if not isinstance(payload, dict) or payload.get('format_version') != CACHE_FORMAT_VERSION:
+            logger.info(f"Reference data cache {path} has an outdated format, falling back to YAML")
+            return None
+        if payload.get('source_hash') != (digest or source_hash(data_dir)):
+            logger.info(f"Reference data cache {path} is stale, falling back to YAML")
+            return None
+
+        return cls(data_dir=data_dir, **payload['fields'])
+
+    def save_compiled(self) -> Optional[str]:
+        """Атомарно записывает снимок в бинарный кэш. Возвращает путь к файлу"""
+        path = os.path.join(self.data_dir, CACHE_FILENAME)
+        payload = {
+            'format_version': CACHE_FORMAT_VERSION,
+            'source_hash': self.source_hash,
+            'fields': {name: getattr(self, name) for name in self._compiled_fields}
+        }
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Замена файла атомарна, параллельные процессы видят либо старый, либо новый кэш
+            os.replace(temp_path, path)
+            return path
+        except Exception as e:
+            logger.warning(f"Error writing reference data cache {path}: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return None
+
+
+def source_signature(data_dir: str) -> Tuple:
+    """Сигнатура исходных файлов: время изменения и размер каждого из них"""
+    signature = []
+    for filename in SOURCE_FILES:
+        try:
+            stat = os.stat(os.path.join(data_dir, filename))
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((filename, None, None))
+    return tuple(signature)
+
+
+class ReferenceDataRegistry:
+    """Реестр справочных данных с горячей перезагрузкой.
+
+    Не чаще одного раза в ``check_interval`` секунд сверяет время изменения
+    и размер YAML-файлов. Если файлы изменились, новый снимок полностью
+    строится в стороне и затем подменяется одним присваиванием ссылки.
+    Перезагрузку выполняет только поток, обнаруживший изменение; остальные
+    читатели ее не ждут и до подмены получают предыдущий снимок. Если
+    измененный файл не удается разобрать, продолжает использоваться
+    последний корректный снимок.
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._signature = source_signature(data_dir)
+        self._snapshot = ReferenceData.load(data_dir)
+        self._next_check = time.monotonic() + check_interval
+        logger.info(f"Reference data loaded from {os.path.abspath(data_dir)}")
+
+    def get(self) -> ReferenceData:
+        """Возвращает актуальный снимок, при необходимости проверив файлы"""
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force: bool = False) -> bool:
+        """Перечитывает данные, если файлы изменились. Возвращает True при замене снимка"""
+        # Перезагрузку выполняет только один поток, остальные не блокируются
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            signature = source_signature(self.data_dir)
+            if signature == self._signature and not force:
+                return False
+
+            try:
+                snapshot = ReferenceData.load(self.data_dir, strict=True)
+            except Exception as e:
+                logger.error(f"Error reloading reference data, keeping previous version: {str(e)}")
+                return False
+
+            self._snapshot = snapshot
+            self._signature = signature
+            logger.info(f"Reference data reloaded from {os.path.abspath(self.data_dir)}")
+            return True
+        finally:
+            self._reload_lock.release()
+
+
+_registries: Dict[str, ReferenceDataRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(data_dir: str = DEFAULT_DATA_DIR,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL) -> ReferenceDataRegistry:
+    """Возвращает общий для процесса реестр справочных данных каталога"""
+    key = os.path.abspath(data_dir)
+    registry = _registries.get(key)
+    if registry is not None:
+        return registry
+
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = ReferenceDataRegistry(data_dir, check_interval)
+            _registries[key] = registry
+        return registry
+
+
+def get_reference_data(data_dir: str = DEFAULT_DATA_DIR) -> ReferenceData:
+    """Возвращает актуальный снимок справочных данных каталога"""
+    return get_registry(data_dir).get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Компиляция data/*.yaml в бинарный кэш справочных данных')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог с YAML-матрицами')
+    args = parser.parse_args()
+
+    snapshot = ReferenceData.load(args.data_dir, strict=True, use_cache=False)
+    path = snapshot.save_compiled()
+    if path is None:
+        raise SystemExit(f"Не удалось записать кэш в {args.data_dir}")
+    print(f"Reference data compiled to {path} (source hash {snapshot.source_hash[:12]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,160 @@
-import openai
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+import asyncio
 import logging
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import hashlib
 import os
+import threading
 from pathlib import Path
+from .rate_limit import TokenBucket, is_retryable, backoff_delay
+from .parse_cache import ParseCache, cache_key
+from .local_extractor import (LocalExtractor, SECTIONS, EXTRACTOR_VERSION,
+                              RELEVANT_KEYWORDS, MANAGEMENT_KEYWORDS)
+from .llm_backends import (OpenAIBackend, DEFAULT_REMOTE_BASE_URL, DEFAULT_REMOTE_MODEL,
+                           DEFAULT_TIMEOUT, RESUME_MARKER)
+from .json_stream import JSONSectionStream, extract_json
+from .http_client import SharedHTTPClient
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = DEFAULT_REMOTE_BASE_URL
+DEFAULT_MODEL = DEFAULT_REMOTE_MODEL
+SYSTEM_PROMPT = "You are a helpful assistant that extracts structured information from resumes. Always respond with valid JSON."
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+# Повторный запрос, если ответ не удалось разобрать даже после извлечения JSON из текста
+REPAIR_PROMPT = "Ответ не является корректным JSON. Верни только JSON-объект в указанном формате, без пояснений."
+
+# Длина текста, после которой общий промпт отправляется по частям
+DEFAULT_MAX_PROMPT_CHARS = 12000
+
+# Пустые значения секций на случай, если модель не вернула секцию
+EMPTY_SECTIONS = {
+    'education': list,
+    'experience': list,
+    'skills': lambda: {'required': [], 'additional': [], 'certifications': []},
+    'languages': list
+}
+
+# Правила и формат ответа для промптов по отдельным секциям
+SECTION_PROMPTS = {
+    'education': """Извлеки из секции резюме информацию об образовании.
+Используй только факты из текста, оставляй поля пустыми, если информация отсутствует.
+
+Правила:
+1. Степень: phd, master, bachelor, specialist или incomplete_higher
+2. Полное название учебного заведения и специальность
+3. Даты в формате YYYY-MM-DD; если указан только год, начало YYYY-01-01, конец YYYY-12-31
+4. Если даты не указаны, используй стандартные сроки: бакалавриат 4 года, магистратура 2 года, PhD 4 года
+
+Формат ответа:
+{
+    "education": [
+        {
+            "degree": "master",
+            "institution": "Название университета",
+            "speciality": "Специальность",
+            "start_date": "YYYY-MM-DD",
+            "end_date": "YYYY-MM-DD"
+        }
+    ]
+}""",
+    'experience': """Извлеки из секции резюме опыт работы.
+Используй только факты из текста, оставляй поля пустыми, если информация отсутствует.
+
+Правила:
+1. Для каждой позиции укажи точное название должности, полное название компании, даты и обязанности
+2. Даты в формате YYYY-MM-DD; если указан только год, начало YYYY-01-01, конец YYYY-12-31;
+   если указан месяц и год, начало YYYY-MM-01; если дата окончания не указана, используй текущую дату
+3. Продолжительность в годах с точностью до двух знаков; опыт менее месяца - 0.08
+4. Не суммируй опыт из разных позиций
+
+Формат ответа:
+{
+    "experience": [
+        {
+            "company": "Название компании",
+            "position": "Должность",
+            "start_date": "YYYY-MM-DD",
+            "end_date": "YYYY-MM-DD",
+            "duration_years": "X.XX",
+            "description": "Описание обязанностей и достижений",
+            "is_relevant": true,
+            "is_management": false
+        }
+    ]
+}""",
+    'skills': """Извлеки из секции резюме навыки.
+
+Правила:
+1. required: технические навыки, необходимые для работы
+2. additional: дополнительные знания и умения
+3. certifications: сертификаты и курсы
+4. Стандартизируй названия навыков и не дублируй их между категориями
+
+Формат ответа:
+{
+    "skills": {
+        "required": ["навык1", "навык2"],
+        "additional": ["навык3"],
+        "certifications": ["сертификат1"]
+    }
+}""",
+    'languages': """Извлеки из секции резюме знание языков.
+
+Правила:
+1. Уровень владения: native, fluent, advanced, intermediate или basic
+2. Используй стандартные названия языков
+
+Формат ответа:
+{
+    "languages": [
+        {
+            "language": "название языка",
+            "level": "уровень владения"
+        }
+    ]
+}"""
+}
+
 class ResumeParser:
-    def __init__(self, api_key: str):
-        if not api_key:
-            raise ValueError("API key is required")
-        self.client = openai.OpenAI(
-            api_key=api_key,
-            base_url='https://api.rockapi.ru/openai/v1'
-        )
+    def __init__(self, api_key: Optional[str] = None, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL,
+                 cache_dir: str = "cache", max_concurrency: int = 5,
+                 requests_per_second: Optional[float] = None, max_retries: int = 4,
+                 retry_base_delay: float = 0.5, cache: Optional[ParseCache] = None,
+                 local_first: bool = True, confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+                 section_prompts: bool = True, max_prompt_chars: int = DEFAULT_MAX_PROMPT_CHARS,
+                 backend=None, timeout: float = DEFAULT_TIMEOUT, http_client: Optional[SharedHTTPClient] = None):
+        """
+        Args:
+            api_key (str): Ключ OpenAI-совместимого API
+            base_url (str): Адрес API
+            model (str): Модель для извлечения данных
+            cache_dir (str): Каталог кэша результатов разбора
+            max_concurrency (int): Максимум одновременных запросов в parse_many
+            requests_per_second (Optional[float]): Ограничение частоты запросов в parse_many
+            max_retries (int): Количество повторов при 429/5xx и сетевых ошибках
+            retry_base_delay (float): Базовая задержка экспоненциального повтора в секундах
+            cache (Optional[ParseCache]): Кэш результатов разбора; по умолчанию создается в cache_dir
+            local_first (bool): Сначала извлекать данные локальными правилами и звать LLM только при необходимости
+            confidence_threshold (float): Уверенность секции, ниже которой она извлекается через LLM
+            section_prompts (bool): Отправлять найденные секции отдельными параллельными запросами
+            max_prompt_chars (int): Длина текста, после которой общий промпт делится на части
+            backend: Backend извлечения (llm_backends); по умолчанию удаленный API по api_key, base_url и model
+            timeout (float): Таймаут запроса к API по умолчанию в секундах
+            http_client (Optional[SharedHTTPClient]): Общий пул соединений для backend по умолчанию
+        """
+        if backend is None:
+            backend = OpenAIBackend(api_key, base_url=base_url, model=model, timeout=timeout,
+                                    http_client=http_client)
+        self.backend = backend
+        self.model = backend.model
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
         self.section_patterns = {
             'education': r'(?i)(образование|education|учёба|университет|вуз|институт)',
             'experience': r'(?i)(опыт работы|experience|трудовой стаж|места работы)',
@@ -25,8 +162,22 @@ class ResumeParser:
             'languages': r'(?i)(языки|languages|знание языков)',
             'certifications': r'(?i)(сертификаты|certifications|курсы|обучение)'
         }
-        self.cache_dir = Path("cache")
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache = cache if cache is not None else ParseCache(cache_dir)
+        self.local_first = local_first
+        self.confidence_threshold = confidence_threshold
+        # Изменение промпта, локальных правил или порога их уверенности меняет ключи кэша,
+        # поэтому старые результаты не используются
+        self.prompt_version = hashlib.sha256(
+            (SYSTEM_PROMPT + self._get_prompt('') + json.dumps(SECTION_PROMPTS, sort_keys=True)
+             + EXTRACTOR_VERSION + json.dumps([local_first, confidence_threshold])).encode('utf-8')
+        ).hexdigest()[:16]
+        self.section_prompts = section_prompts
+        self.max_prompt_chars = max_prompt_chars
+        self.local_extractor = LocalExtractor()
+        # Сколько резюме разобрано локально, частично через LLM и целиком через LLM,
+        # и сколько ответов пришлось запрашивать повторно из-за некорректного JSON
+        self.extraction_stats = {'local': 0, 'partial': 0, 'llm': 0, 'repairs': 0}
+        self._stats_lock = threading.Lock()
 
     def _split_text(self, text: str, max_length: int = 1500) -> List[str]:
         """Разбивает текст на части подходящей длины"""
@@ -78,47 +229,308 @@ class ResumeParser:
     def parse_resume(self, text: str, filename: str) -> Dict[str, Any]:
         """Парсит текст резюме и возвращает структурированные данные"""
         try:
-            # Создаем хэш из текста резюме
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            cache_file = self.cache_dir / f"{text_hash}.json"
-            
             # Проверяем наличие кэшированного результата
-            if cache_file.exists():
-                logger.info(f"Using cached parsing result for {filename}")
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            cached = self._load_cached(text, filename)
+            if cached is not None:
+                return cached
             
             logger.info("Starting information extraction")
             
-            # Используем GPT для извлечения структурированной информации
-            prompt = self._get_prompt(text)
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts structured information from resumes. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            # Сначала пробуем извлечь данные локальными правилами
+            local_data, uncertain, prompts = self._plan_extraction(text, filename)
+            if not uncertain:
+                return local_data
             
-            try:
-                extracted_data = json.loads(response.choices[0].message.content)
-                logger.debug("Extracted data:")
-                logger.debug(json.dumps(extracted_data, ensure_ascii=False, indent=2))
-                
-                # Сохраняем результат в кэш
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(extracted_data, f, ensure_ascii=False, indent=2)
-                
-                return extracted_data
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse GPT response as JSON: {str(e)}")
-                return {}
+            # Используем GPT для секций, которые не удалось уверенно разобрать;
+            # запросы по секциям выполняются параллельно
+            if len(prompts) == 1:
+                responses = [self._complete(prompts[0][1])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_concurrency)) as executor:
+                    responses = list(executor.map(self._complete, [prompt for _, prompt in prompts]))
+            
+            return self._handle_responses(text, prompts, responses, local_data, uncertain)
                 
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse GPT response as JSON: {str(e)}")
+            return {}
         except Exception as e:
             logger.error(f"Error parsing resume: {str(e)}", exc_info=True)
             return {}
 
+    def parse_resume_stream(self, text: str, filename: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Парсит резюме и отдает пары (секция, данные) по мере готовности.
+        
+        Уверенные локальные секции отдаются сразу. Ответ на общий промпт
+        читается потоком, и секция отдается, как только ее JSON завершен;
+        промпты по секциям отдаются в порядке завершения запросов.
+        Собранный результат сохраняется в кэш так же, как в parse_resume.
+        """
+        try:
+            cached = self._load_cached(text, filename)
+            if cached is not None:
+                yield from cached.items()
+                return
+            
+            local_data, uncertain, prompts = self._plan_extraction(text, filename)
+            if not uncertain:
+                yield from local_data.items()
+                return
+            
+            emitted = set()
+            if local_data is not None:
+                for section in SECTIONS:
+                    if section not in uncertain:
+                        emitted.add(section)
+                        yield section, local_data[section]
+            
+            if len(prompts) == 1:
+                section, prompt = prompts[0]
+                wanted = {section} if section is not None else set(uncertain)
+                response = yield from self._stream_complete(prompt, wanted)
+                emitted.update(wanted.intersection(response))
+                responses = [response]
+            else:
+                responses = [None] * len(prompts)
+                with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_concurrency)) as executor:
+                    futures = {executor.submit(self._complete, prompt): index
+                               for index, (_, prompt) in enumerate(prompts)}
+                    for future in as_completed(futures):
+                        index = futures[future]
+                        responses[index] = future.result()
+                        section = prompts[index][0]
+                        if section is not None:
+                            emitted.add(section)
+                            yield section, responses[index].get(section, EMPTY_SECTIONS[section]())
+            
+            # Секции, которые модель не вернула или которые собраны из частей длинного текста
+            result = self._handle_responses(text, prompts, responses, local_data, uncertain)
+            for section in SECTIONS:
+                if section not in emitted and section in result:
+                    yield section, result[section]
+                    
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse GPT response as JSON: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error parsing resume {filename}: {str(e)}", exc_info=True)
+
+    def _complete(self, prompt: str) -> Dict[str, Any]:
+        """Запрос к LLM; если в ответе нет корректного JSON, один раз просит исправить ответ"""
+        messages = self._build_messages(prompt)
+        response = self.backend.complete(messages)
+        try:
+            return extract_json(response)
+        except json.JSONDecodeError:
+            return extract_json(self.backend.complete(self._repair_messages(messages, response)))
+
+    def _stream_complete(self, prompt: str, sections: set):
+        """
+        Потоковый запрос к LLM: отдает завершенные секции из ``sections``
+        по мере генерации и возвращает весь разобранный ответ
+        """
+        messages = self._build_messages(prompt)
+        parser = JSONSectionStream()
+        chunks = []
+        try:
+            for chunk in self.backend.stream(messages):
+                chunks.append(chunk)
+                for section, value in parser.feed(chunk):
+                    if section in sections:
+                        yield section, value
+            return parser.close()
+        except json.JSONDecodeError:
+            # Уже отданные секции остаются, исправленный ответ дополняет остальные
+            repaired = extract_json(self.backend.complete(self._repair_messages(messages, ''.join(chunks))))
+            for section, value in repaired.items():
+                if section in sections and section not in parser.result:
+                    yield section, value
+            return {**repaired, **parser.result}
+
+    def _repair_messages(self, messages: List[Dict[str, str]], response: str) -> List[Dict[str, str]]:
+        logger.warning("Model response is not valid JSON, requesting a repaired answer")
+        self._count_extraction('repairs')
+        return messages + [
+            {"role": "assistant", "content": response or ''},
+            {"role": "user", "content": REPAIR_PROMPT}
+        ]
+
+    def parse_many(self, texts: List[str], filenames: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Парсит несколько резюме параллельно и возвращает результаты в исходном порядке.
+        
+        Запросы выполняются через асинхронную сессию backend: одновременно не больше
+        max_concurrency, с частотой не выше requests_per_second и с повтором
+        ответов 429/5xx после экспоненциальной задержки с джиттером.
+        """
+        return asyncio.run(self.aparse_many(texts, filenames))
+
+    async def aparse_many(self, texts: List[str], filenames: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Асинхронный вариант parse_many"""
+        if filenames is None:
+            filenames = [f"resume_{index}" for index in range(len(texts))]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(self.requests_per_second) if self.requests_per_second else None
+        # Повторы выполняются здесь, чтобы учитывать лимиты и джиттер
+        session = self.backend.async_session()
+        try:
+            return await asyncio.gather(*[
+                self.aparse_resume(text, filename, session, semaphore, bucket)
+                for text, filename in zip(texts, filenames)
+            ])
+        finally:
+            await session.close()
+
+    async def aparse_resume(self, text: str, filename: str, session,
+                            semaphore: asyncio.Semaphore, bucket: Optional[TokenBucket] = None) -> Dict[str, Any]:
+        """Асинхронно парсит одно резюме с учетом ограничений параллельности и частоты"""
+        try:
+            cached = self._load_cached(text, filename)
+            if cached is not None:
+                return cached
+
+            local_data, uncertain, prompts = self._plan_extraction(text, filename)
+            if not uncertain:
+                return local_data
+
+            responses = await asyncio.gather(*[
+                self._acomplete(prompt, filename, session, semaphore, bucket)
+                for _, prompt in prompts
+            ])
+            return self._handle_responses(text, prompts, responses, local_data, uncertain)
+
+        except Exception as e:
+            logger.error(f"Error parsing resume {filename}: {str(e)}")
+            return {}
+
+    async def _acomplete(self, prompt: str, filename: str, session,
+                         semaphore: asyncio.Semaphore, bucket: Optional[TokenBucket] = None) -> Dict[str, Any]:
+        """Асинхронный вариант _complete"""
+        messages = self._build_messages(prompt)
+        response = await self._arequest(messages, filename, session, semaphore, bucket)
+        try:
+            return extract_json(response)
+        except json.JSONDecodeError:
+            repair = self._repair_messages(messages, response)
+            return extract_json(await self._arequest(repair, filename, session, semaphore, bucket))
+
+    async def _arequest(self, messages: List[Dict[str, str]], filename: str, session,
+                        semaphore: asyncio.Semaphore, bucket: Optional[TokenBucket] = None) -> str:
+        """Один запрос к LLM с ограничением параллельности, частоты и повторами"""
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                if bucket is not None:
+                    await bucket.acquire()
+                try:
+                    return await session.complete(messages)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    delay = backoff_delay(attempt, base=self.retry_base_delay, error=e)
+                    logger.warning(f"Retrying {filename} in {delay:.2f}s after error: {str(e)}")
+                    await asyncio.sleep(delay)
+
+    def _plan_extraction(self, text: str, filename: str) -> Tuple[Optional[Dict[str, Any]], List[str],
+                                                                  List[Tuple[Optional[str], str]]]:
+        """
+        Извлекает данные локально и решает, какие запросы отправить в LLM.
+        
+        Если все неуверенные секции найдены в тексте, на каждую уходит отдельный
+        короткий промпт только с ее текстом; иначе используется общий промпт
+        по всему тексту, а слишком длинный текст делится на части.
+        
+        Returns:
+            Tuple: (локальные данные или None, секции с уверенностью ниже порога,
+            список пар (секция или None для общего промпта, промпт)). Если список
+            секций пуст, локальный результат уже сохранен в кэш и LLM не нужен.
+        """
+        if self.local_first:
+            local_data, confidence, section_texts = self.local_extractor.extract(text)
+            uncertain = [section for section in SECTIONS if confidence[section] < self.confidence_threshold]
+            logger.info(f"Local extraction confidence for {filename}: {confidence}")
+            
+            if not uncertain:
+                self._count_extraction('local')
+                self.cache.set(self._cache_key(text), local_data)
+                return local_data, [], []
+        else:
+            local_data, uncertain = None, list(SECTIONS)
+            section_texts = {
+                section: '\n'.join(lines)
+                for section, lines in self.local_extractor.split_sections(text).items()
+                if section in SECTIONS
+            }
+        
+        self._count_extraction('partial' if len(uncertain) < len(SECTIONS) else 'llm')
+        if self.section_prompts and all(section_texts.get(section) for section in uncertain):
+            return local_data, uncertain, [
+                (section, self._get_section_prompt(section, section_texts[section])) for section in uncertain
+            ]
+        
+        chunks = self._split_text(text, self.max_prompt_chars) if len(text) > self.max_prompt_chars else [text]
+        return local_data, uncertain, [(None, self._get_prompt(chunk)) for chunk in chunks]
+
+    def _count_extraction(self, kind: str):
+        with self._stats_lock:
+            self.extraction_stats[kind] += 1
+
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _cache_key(self, text: str) -> str:
+        return cache_key(text, self.model, self.prompt_version)
+
+    def _load_cached(self, text: str, filename: str) -> Optional[Dict[str, Any]]:
+        cached = self.cache.get(self._cache_key(text))
+        if cached is not None:
+            logger.info(f"Using cached parsing result for {filename}")
+        return cached
+
+    def _handle_responses(self, text: str, prompts: List[Tuple[Optional[str], str]],
+                          responses: List[Dict[str, Any]], local_data: Optional[Dict[str, Any]] = None,
+                          uncertain: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Собирает разобранные ответы модели в одну структуру, дополняет ее
+        уверенными локальными секциями и сохраняет в кэш
+        """
+        extracted_data: Dict[str, Any] = {}
+        for (section, _), partial in zip(prompts, responses):
+            if section is not None:
+                extracted_data[section] = partial.get(section, EMPTY_SECTIONS[section]())
+            else:
+                self._merge_partial(extracted_data, partial)
+        logger.debug("Extracted data:")
+        logger.debug(json.dumps(extracted_data, ensure_ascii=False, indent=2))
+        
+        if local_data is not None:
+            for section in SECTIONS:
+                if section not in (uncertain or []):
+                    extracted_data[section] = local_data[section]
+        
+        # Сохраняем результат в кэш
+        self.cache.set(self._cache_key(text), extracted_data)
+        
+        return extracted_data
+
+    def _merge_partial(self, extracted_data: Dict[str, Any], partial: Dict[str, Any]):
+        """Объединяет ответ по части текста с уже собранными: списки склеиваются, навыки - без повторов"""
+        for key, value in partial.items():
+            current = extracted_data.get(key)
+            if current is None:
+                extracted_data[key] = value
+            elif isinstance(current, list) and isinstance(value, list):
+                current.extend(value)
+            elif isinstance(current, dict) and isinstance(value, dict):
+                for name, items in value.items():
+                    if isinstance(current.get(name), list) and isinstance(items, list):
+                        current[name].extend(item for item in items if item not in current[name])
+                    else:
+                        current.setdefault(name, items)
+
     def _split_into_sections(self, text: str) -> Dict[str, str]:
         """Разделяет текст на секции по заголовкам"""
         sections = {}
@@ -412,24 +824,13 @@ class ResumeParser:
 
     def _is_relevant_experience(self, text: str) -> bool:
         """Определяет, является ли опыт релевантным"""
-        relevant_keywords = [
-            'data', 'analytics', 'analysis', 'python', 'sql',
-            'machine learning', 'ai', 'artificial intelligence',
-            'big data', 'data science', 'analyst'
-        ]
-        
         text = text.lower()
-        return any(keyword in text for keyword in relevant_keywords)
+        return any(keyword in text for keyword in RELEVANT_KEYWORDS)
 
     def _is_management_position(self, text: str) -> bool:
         """Определяет, является ли позиция управленческой"""
-        management_keywords = [
-            'lead', 'head', 'manager', 'director', 'chief',
-            'руководитель', 'начальник', 'директор', 'глава'
-        ]
-        
         text = text.lower()
-        return any(keyword in text for keyword in management_keywords)
+        return any(keyword in text for keyword in MANAGEMENT_KEYWORDS)
 
     def _enhance_with_gpt(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Улучшает структурированные данные с помощью GPT"""
@@ -447,16 +848,13 @@ class ResumeParser:
             Верни ответ в формате JSON.
             """
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that enhances resume data structure. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self.backend.complete([
+                {"role": "system", "content": "You are a helpful assistant that enhances resume data structure. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ])
             
             try:
-                enhanced_data = json.loads(response.choices[0].message.content)
+                enhanced_data = extract_json(response)
                 return enhanced_data
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse GPT response as JSON: {str(e)}")
@@ -466,6 +864,10 @@ class ResumeParser:
             logger.error(f"Error enhancing data with GPT: {str(e)}")
             return data
 
+    def _get_section_prompt(self, section: str, text: str) -> str:
+        """Короткий промпт для одной секции резюме"""
+        return f"{SECTION_PROMPTS[section]}\n\n{RESUME_MARKER}{text}"
+
     def _get_prompt(self, text: str) -> str:
         return f"""Проанализируй текст резюме и извлеки структурированную информацию. 
 Используй только факты из резюме, оставляй поля пустыми, если информация отсутствует.
@@ -0,0 +1,100 @@
+from typing import Dict, List, Any, Optional, Tuple
+import re
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Разбивает строку на токены в нижнем регистре без знаков препинания"""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(str(text).lower().replace('ё', 'е'))
+
+
+def _abbreviations(name: str) -> List[str]:
+    """Аббревиатуры, уже записанные в официальном названии («МИФИ», (РИНХ), ИТМО)"""
+    return [
+        token for token in _TOKEN_PATTERN.findall(name)
+        if len(token) >= 3 and sum(1 for char in token if char.isupper()) >= 2
+    ]
+
+
+class UniversityIndex:
+    """Индекс университетов для поиска по строке с названием учебного заведения.
+
+    Для каждого университета строятся ключи: полное название, алиасы из
+    ``universities.yaml`` и аббревиатуры из самого названия. Каждый ключ
+    индексируется по самому редкому из своих токенов, поэтому на каждый
+    токен входной строки приходится один поиск в словаре и проверка
+    нескольких кандидатов, а не просмотр всего списка университетов.
+    Ключ считается найденным, если его токены идут подряд во входной строке;
+    при нескольких совпадениях выбирается самый длинный ключ, а при равной
+    длине - университет, стоящий в файле раньше.
+    """
+
+    def __init__(self, universities: List[Dict[str, Any]]):
+        self.universities: List[Tuple[str, Any]] = []
+        keys: Dict[Tuple[str, ...], int] = {}
+        ambiguous = set()
+
+        for position, univ in enumerate(universities):
+            if not isinstance(univ, dict) or not univ.get('name'):
+                continue
+            name = str(univ['name'])
+            univ_id = len(self.universities)
+            self.universities.append((name, univ.get('rank')))
+
+            variants = [name] + [str(alias) for alias in univ.get('aliases', []) or []]
+            abbreviations = _abbreviations(name)
+            for variant in variants + abbreviations:
+                key = tuple(normalize_tokens(variant))
+                if not key:
+                    continue
+                if key in keys and keys[key] != univ_id:
+                    # Одинаковый ключ у разных университетов не позволяет их различить
+                    ambiguous.add(key)
+                    continue
+                keys.setdefault(key, univ_id)
+
+        for key in ambiguous:
+            del keys[key]
+
+        # Частота токенов среди всех ключей - по ней выбирается опорный токен
+        frequency: Dict[str, int] = {}
+        for key in keys:
+            for token in set(key):
+                frequency[token] = frequency.get(token, 0) + 1
+
+        # Опорный токен -> список (фраза ключа, длина ключа, id университета)
+        self._postings: Dict[str, List[Tuple[str, int, int]]] = {}
+        for key, univ_id in keys.items():
+            anchor = min(key, key=lambda token: (frequency[token], token))
+            self._postings.setdefault(anchor, []).append((' ' + ' '.join(key) + ' ', len(key), univ_id))
+
+    def __len__(self) -> int:
+        return len(self.universities)
+
+    def resolve(self, institution: str) -> Optional[int]:
+        """Возвращает номер университета для строки или None"""
+        tokens = normalize_tokens(institution)
+        if not tokens:
+            return None
+
+        text = ' ' + ' '.join(tokens) + ' '
+        best = None
+        for token in set(tokens):
+            for phrase, length, univ_id in self._postings.get(token, ()):
+                candidate = (-length, univ_id)
+                if (best is None or candidate < best) and phrase in text:
+                    best = candidate
+        return best[1] if best is not None else None
+
+    def resolve_name(self, institution: str) -> Optional[str]:
+        """Официальное название университета для строки или None"""
+        univ_id = self.resolve(institution)
+        return self.universities[univ_id][0] if univ_id is not None else None
+
+    def resolve_rank(self, institution: str) -> Optional[Any]:
+        """Ранг университета для строки или None"""
+        univ_id = self.resolve(institution)
+        return self.universities[univ_id][1] if univ_id is not None else None
@@ -0,0 +1,85 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+# Ширина корзины гистограммы total_score; 100 попадает в последнюю корзину
+SCORE_BUCKET_SIZE = 10
+MAX_BUCKET = 100 // SCORE_BUCKET_SIZE
+# Срезы сводки: месяц загрузки, вуз, лучшая роль, навык. Отдельного счетчика
+# всех резюме нет: каждое резюме есть ровно в одной строке period (без даты -
+# с пустым name), и гистограмма по всей базе - сумма строк period
+DIMENSIONS = ('period', 'university', 'role', 'skill')
+# Счетчики разложены по шардам resume_id % AGGREGATE_SHARDS: одновременные
+# записи в PostgreSQL обновляют разные строки и не ждут друг друга
+AGGREGATE_SHARDS = 16
+
+AggregateKey = Tuple[str, str, int, int]
+
+_UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def score_bucket(score: Any) -> int:
+    try:
+        value = int(float(score or 0))
+    except (TypeError, ValueError):
+        value = 0
+    return min(max(value, 0) // SCORE_BUCKET_SIZE, MAX_BUCKET)
+
+
+def best_role(analysis_result: Any) -> Optional[str]:
+    """Роль с наибольшим соответствием из role_fit результата анализа"""
+    if not isinstance(analysis_result, dict):
+        return None
+    role = (analysis_result.get('role_fit') or {}).get('best_fit') or {}
+    return role.get('role') if isinstance(role, dict) else None
+
+
+def aggregate_keys(resume_id: int, total_score: Any, upload_date: Optional[datetime],
+                   university: Optional[str], role: Optional[str], skills: Iterable[str]) -> Counter:
+    """
+    Вклад одного резюме в сводку: (срез, значение среза, корзина оценки, шард) -> 1.
+
+    university - официальное название (resumes.canonical_university), чтобы
+    алиасы одного вуза попадали в один счетчик.
+    """
+    bucket = score_bucket(total_score)
+    shard = resume_id % AGGREGATE_SHARDS
+    period = upload_date.strftime('%Y-%m') if upload_date is not None else ''
+    keys = Counter({('period', period, bucket, shard): 1})
+    if university:
+        keys[('university', university[:255], bucket, shard)] += 1
+    if role:
+        keys[('role', role, bucket, shard)] += 1
+    for skill in set(skills):
+        keys[('skill', skill, bucket, shard)] += 1
+    return keys
+
+
+def apply_aggregates(connection, table: Table, delta: Dict[AggregateKey, int]):
+    """
+    Прибавляет изменения счетчиков одной вставкой с ON CONFLICT DO UPDATE.
+
+    Args:
+        connection: Connection или Session, в транзакции которых меняются данные резюме
+        table (Table): Таблица resume_aggregates
+        delta (Dict[AggregateKey, int]): Изменения счетчиков (отрицательные при удалении)
+    """
+    # Одинаковый порядок строк во всех транзакциях исключает взаимные блокировки в PostgreSQL
+    rows = [{'dimension': dimension, 'name': name, 'bucket': bucket, 'shard': shard, 'resume_count': count}
+            for (dimension, name, bucket, shard), count in sorted(delta.items()) if count]
+    if not rows:
+        return
+    dialect = connection.get_bind().dialect.name if hasattr(connection, 'get_bind') else connection.dialect.name
+    if dialect not in _UPSERT_DIALECTS:
+        raise ValueError(f"Aggregates are not supported for {dialect}")
+    statement = _UPSERT_DIALECTS[dialect](table)
+    statement = statement.on_conflict_do_update(
+        index_elements=['dimension', 'name', 'bucket', 'shard'],
+        set_={'resume_count': table.c.resume_count + statement.excluded.resume_count}
+    )
+    connection.execute(statement, rows)
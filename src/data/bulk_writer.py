@@ -0,0 +1,78 @@
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+
+class BulkWriter:
+    """
+    Отложенная запись результатов анализа для пакетной загрузки.
+
+    Потоки обработки отдают результаты через ``submit`` и не ждут базу;
+    отдельный поток собирает их в порции до ``batch_size`` штук (или пока
+    не пройдет ``flush_interval`` секунд с первого результата порции) и
+    сохраняет через ``Database.save_analyses_bulk``. ``submit`` возвращает
+    Future с ID записи или None, если запись не сохранилась.
+
+    Args:
+        db: Экземпляр Database
+        batch_size (Optional[int]): Размер порции; по умолчанию db.bulk_batch_size
+        flush_interval (float): Сколько секунд ждать заполнения порции
+    """
+
+    def __init__(self, db, batch_size: Optional[int] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.db = db
+        self.batch_size = batch_size or db.bulk_batch_size
+        self.flush_interval = flush_interval
+        self._queue: 'queue.Queue[Optional[Tuple[Dict[str, Any], Future]]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='bulk-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Dict[str, Any]) -> Future:
+        """Ставит результат в очередь записи; item - аргументы save_analysis"""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self):
+        """Записывает оставшиеся результаты и останавливает поток"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        try:
+            ids = self.db.save_analyses_bulk([item for item, _ in batch], batch_size=self.batch_size)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} analyses: {str(e)}")
+            ids = [None] * len(batch)
+        finally:
+            self.db.remove_session()
+        for (_, future), resume_id in zip(batch, ids):
+            future.set_result(resume_id)
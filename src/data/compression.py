@@ -0,0 +1,64 @@
+from typing import Any, Optional
+import json
+import logging
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd необязателен
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Первый байт сжатых данных определяет алгоритм, поэтому записи читаются
+# при любой текущей настройке compression
+ZLIB_HEADER = b'z'
+ZSTD_HEADER = b's'
+COMPRESSION_METHODS = ('none', 'zlib', 'zstd')
+
+
+def resolve_method(method: Optional[str]) -> str:
+    """Проверяет настройку compression; без пакета zstandard zstd заменяется на zlib"""
+    method = method or 'none'
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(f"Unsupported compression: {method}")
+    if method == 'zstd' and zstandard is None:
+        logger.warning("zstandard is not installed, falling back to zlib compression")
+        return 'zlib'
+    return method
+
+
+def compress_json(value: Any, method: str) -> Optional[bytes]:
+    """Компактный JSON, сжатый выбранным алгоритмом; для 'none' - None"""
+    if method == 'none' or value is None:
+        return None
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if method == 'zstd':
+        return ZSTD_HEADER + zstandard.ZstdCompressor(level=3).compress(data)
+    return ZLIB_HEADER + zlib.compress(data, 6)
+
+
+def decompress_json(payload: bytes) -> Any:
+    """
+    Raises:
+        ValueError: Неизвестный заголовок или нет пакета zstandard для zstd
+    """
+    payload = bytes(payload)
+    header, data = payload[:1], payload[1:]
+    if header == ZLIB_HEADER:
+        return json.loads(zlib.decompress(data))
+    if header == ZSTD_HEADER:
+        if zstandard is None:
+            raise ValueError("zstandard is required to read zstd-compressed data")
+        return json.loads(zstandard.ZstdDecompressor().decompress(data))
+    raise ValueError("Unknown compressed payload format")
+
+
+def json_value(value: Any) -> Any:
+    """Значение JSON-колонки; старые записи хранят JSON, закодированный строкой"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
@@ -1,16 +1,36 @@
 import yaml
+import base64
 import json
 import os
+import re
 import logging
-from typing import List, Dict, Optional, Any
+from contextlib import contextmanager
+from collections import Counter
+from typing import List, Dict, Optional, Any, Iterable, Iterator, Tuple
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, JSON, DateTime, Text
+from sqlalchemy import (create_engine, event, BigInteger, Column, ForeignKey, Index, Integer, LargeBinary,
+                        SmallInteger, String, JSON, DateTime, Text,
+                        and_, delete, func, insert, literal, literal_column, or_, select, table, column, tuple_, update)
+from sqlalchemy.engine import URL, Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import aliased, deferred, sessionmaker, scoped_session, undefer_group, Session
 from sqlalchemy.exc import SQLAlchemyError
+from .aggregates import MAX_BUCKET, SCORE_BUCKET_SIZE, aggregate_keys, apply_aggregates, best_role
+from .compression import compress_json, decompress_json, json_value, resolve_method
+from .fingerprint import NEAR_DUPLICATE_DISTANCE, Fingerprint, hamming_distance, simhash_bands
+from .migrations import migrate
+from .skill_catalog import DEFAULT_SKILLS_MATRIX, SkillCatalog, resume_skill_names
+from .university_names import DEFAULT_UNIVERSITIES, UniversityNames
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+# Сколько секунд SQLite ждет освобождения блокировки записи
+DEFAULT_BUSY_TIMEOUT = 30
+# Сколько резюме save_analyses_bulk записывает одной транзакцией
+DEFAULT_BULK_BATCH_SIZE = 500
+
 Base = declarative_base()
 
 class Resume(Base):
@@ -18,55 +38,264 @@ class Resume(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
-    content = Column(Text, nullable=False)
-    extracted_info = Column(JSON)
-    analysis_results = Column(JSON)
+    # Тяжелые колонки загружаются только по запросу (undefer_group('payload'))
+    content = deferred(Column(Text, nullable=False), group='payload')
+    extracted_info = deferred(Column(JSON), group='payload')
+    analysis_results = deferred(Column(JSON(none_as_null=True)), group='payload')
+    # Сжатый analysis_results при включенном database.compression
+    analysis_payload = deferred(Column(LargeBinary), group='payload')
     university = Column(String(255))
+    # Официальное название вуза из справочника (см. university_names.py) - срез сводки по вузам
+    canonical_university = Column(String(255))
     speciality = Column(String(255))
     graduation_year = Column(String(50))
     education_score = Column(Integer)
     skills = Column(JSON)
     experience_years = Column(Integer)
     total_score = Column(Integer)
+    scoring_version = Column(String(64), index=True)
+    # Отпечатки текста для поиска повторных загрузок (см. fingerprint.py)
+    content_hash = Column(String(64))
+    simhash = Column(BigInteger)
+    # role_fit.best_fit.role из analysis_results - срез сводки по ролям
+    best_role = Column(String(64))
     upload_date = Column(DateTime, default=datetime.utcnow)
     last_modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_resumes_upload_date_id', 'upload_date', 'id'),
+        Index('ix_resumes_total_score_id', 'total_score', 'id'),
+        Index('ix_resumes_education_score_id', 'education_score', 'id'),
+        Index('ux_resumes_content_hash', 'content_hash', unique=True),
+    )
+
+class ResumeSkill(Base):
+    """Канонический навык резюме: по индексу (skill, resume_id) ищутся кандидаты с навыком"""
+    __tablename__ = 'resume_skills'
+    
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    skill = Column(String(255), primary_key=True)
+    
+    __table_args__ = (
+        Index('ix_resume_skills_skill_resume_id', 'skill', 'resume_id'),
+    )
+
+class ResumeSimhashBand(Base):
+    """Полоса SimHash: кандидаты в почти-дубликаты ищутся по совпадению хотя бы одной полосы"""
+    __tablename__ = 'resume_simhash_bands'
+    
+    band = Column(SmallInteger, primary_key=True, autoincrement=False)
+    value = Column(Integer, primary_key=True, autoincrement=False)
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+
+class ResumeUpload(Base):
+    """
+    Загрузка файла резюме.
+    
+    Повторная загрузка не создает запись в resumes, а ссылается на исходную;
+    match - new, file (тот же файл), exact (тот же текст) или near (почти тот же текст).
+    """
+    __tablename__ = 'resume_uploads'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False, index=True)
+    filename = Column(String(255))
+    file_hash = Column(String(64), index=True)
+    match = Column(String(16), nullable=False)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+class ResumeAggregate(Base):
+    """
+    Счетчик сводки для дашборда: сколько резюме попало в корзину оценки внутри среза.
+    
+    dimension - period (месяц загрузки), university, role или skill;
+    name - значение среза, bucket - total_score // SCORE_BUCKET_SIZE,
+    shard - resume_id % AGGREGATE_SHARDS. Значение среза складывается из
+    строк всех шардов. Счетчики меняются в той же транзакции, что и сами резюме.
+    """
+    __tablename__ = 'resume_aggregates'
+    
+    dimension = Column(String(32), primary_key=True)
+    name = Column(String(255), primary_key=True)
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(SmallInteger, primary_key=True, autoincrement=False)
+    resume_count = Column(Integer, nullable=False)
+
+# Колонки, по которым история сортируется на сервере
+HISTORY_SORT_FIELDS = ('upload_date', 'total_score', 'education_score')
+# Поля, которые можно запросить в истории
+HISTORY_FIELDS = ('id', 'filename', 'university', 'speciality', 'graduation_year', 'education_score',
+                  'experience_years', 'total_score', 'scoring_version', 'upload_date', 'last_modified',
+                  'analysis_results')
+DEFAULT_HISTORY_FIELDS = ('id', 'filename', 'university', 'speciality', 'education_score',
+                          'experience_years', 'total_score', 'upload_date')
+MAX_HISTORY_LIMIT = 200
+# Максимум навыков в одном поисковом запросе: каждый добавляет соединение с resume_skills
+MAX_SEARCH_SKILLS = 10
+# Максимум вузов и навыков в сводке /api/stats
+MAX_STATS_TOP = 100
+
+_SEARCH_TOKEN = re.compile(r'\w+')
+# Индекс FTS5 (миграция 5); в модели не описан, потому что это виртуальная таблица
+_resumes_fts = table('resumes_fts', column('rowid', Integer))
+
+def build_database_url(config: Dict[str, Any]) -> URL:
+    """
+    Адрес базы из секции ``database`` config.yaml.
+
+    Для SQLite используется ``path``; для PostgreSQL - ``url`` либо поля
+    host, port, name, user и password (пароль можно задать переменной
+    окружения DATABASE_PASSWORD).
+    """
+    db_type = config.get('type', 'sqlite')
+    if db_type == 'sqlite':
+        return URL.create('sqlite', database=os.path.abspath(config['path']))
+    if db_type in ('postgresql', 'postgres'):
+        if config.get('url'):
+            return config['url']
+        return URL.create(
+            config.get('driver', 'postgresql+psycopg2'),
+            username=config.get('user'),
+            password=config.get('password') or os.getenv('DATABASE_PASSWORD'),
+            host=config.get('host', 'localhost'),
+            port=config.get('port', 5432),
+            database=config.get('name', 'hr_analytics')
+        )
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def create_database_engine(config: Dict[str, Any]) -> Engine:
+    """
+    Создает engine с пулом соединений.
+    
+    SQLite переводится в режим WAL с synchronous=NORMAL: чтение не блокирует
+    запись, а параллельные записи ждут друг друга до busy_timeout секунд
+    вместо немедленной ошибки database is locked.
+    """
+    url = build_database_url(config)
+    pool_options = {
+        'pool_size': config.get('pool_size', DEFAULT_POOL_SIZE),
+        'max_overflow': config.get('max_overflow', DEFAULT_MAX_OVERFLOW),
+        'pool_pre_ping': True,
+        # Кириллица в JSON-колонках хранится как есть, а не escape-последовательностями \uXXXX
+        'json_serializer': compact_json
+    }
+    if config.get('type', 'sqlite') != 'sqlite':
+        return create_engine(url, pool_recycle=config.get('pool_recycle', 1800), **pool_options)
+    
+    busy_timeout = config.get('busy_timeout', DEFAULT_BUSY_TIMEOUT)
+    engine = create_engine(url, connect_args={'timeout': busy_timeout, 'check_same_thread': False},
+                           **pool_options)
+    
+    @event.listens_for(engine, 'connect')
+    def configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout * 1000)}')
+        cursor.close()
+    
+    return engine
 
 class Database:
-    def __init__(self, config_path: str = 'config.yaml'):
+    def __init__(self, config_path: str = 'config.yaml', skill_catalog: Optional[SkillCatalog] = None,
+                 university_names: Optional[UniversityNames] = None):
         try:
             with open(config_path) as f:
                 config = yaml.safe_load(f)['database']
-                
-            # Создаем путь к файлу базы данных
-            db_path = os.path.abspath(config['path'])
-            db_dir = os.path.dirname(db_path)
             
-            # Создаем директорию для базы данных, если она не существует
-            if not os.path.exists(db_dir):
-                os.makedirs(db_dir)
-                logger.info(f"Created database directory: {db_dir}")
+            self.compression = resolve_method(config.get('compression'))
+            self.bulk_batch_size = config.get('bulk_batch_size', DEFAULT_BULK_BATCH_SIZE)
+            
+            # Навыки сохраняются и ищутся под каноническими названиями матрицы
+            self.skill_catalog = skill_catalog or SkillCatalog.load(config.get('skills_matrix', DEFAULT_SKILLS_MATRIX))
+            # Алиасы вуза (МГУ, MSU) считаются в сводке одним университетом
+            self.university_names = university_names or UniversityNames.load(
+                config.get('universities', DEFAULT_UNIVERSITIES))
+                
+            if config.get('type', 'sqlite') == 'sqlite':
+                # Создаем директорию для базы данных, если она не существует
+                db_dir = os.path.dirname(os.path.abspath(config['path']))
+                if not os.path.exists(db_dir):
+                    os.makedirs(db_dir)
+                    logger.info(f"Created database directory: {db_dir}")
             
-            self.engine = create_engine(f"sqlite:///{db_path}")
+            self.engine = create_database_engine(config)
             
-            # Удаляем существующую таблицу и создаем новую с обновленной схемой
-            Base.metadata.drop_all(self.engine)
-            Base.metadata.create_all(self.engine)
+            # Схема обновляется миграциями на месте, сохраненные данные не теряются
+            applied = migrate(self.engine)
+            if applied:
+                logger.info(f"Applied database migrations: {applied}")
             
-            Session = sessionmaker(bind=self.engine)
-            self.session = Session()
-            logger.info("Database connection established successfully")
+            # У каждого потока своя сессия: ошибка в одном запросе не ломает остальные
+            self.Session = scoped_session(sessionmaker(bind=self.engine, expire_on_commit=False))
+            logger.info(f"Database connection established successfully ({self.engine.dialect.name})")
             
         except Exception as e:
             logger.error(f"Error initializing database: {str(e)}")
             raise
 
-    def save_analysis(self, extracted_info: Dict, analysis_result: Dict) -> Optional[int]:
+    @property
+    def session(self) -> Session:
+        """Сессия текущего потока"""
+        return self.Session()
+
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """Единица работы: фиксирует изменения при успехе и откатывает при ошибке"""
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def remove_session(self):
+        """Закрывает сессию текущего потока (в конце запроса или фоновой задачи)"""
+        self.Session.remove()
+
+    def close(self):
+        self.Session.remove()
+        self.engine.dispose()
+
+    @staticmethod
+    def extract_scores(analysis_result: Dict) -> Tuple[int, int]:
+        """Возвращает (total_score, education_score) из результата анализа"""
+        overall_score = analysis_result.get('overall_score', {}).get('value', 0)
+        education_score = analysis_result.get('details', {}).get('education', {}).get('score', 0)
+        
+        # Преобразуем оценки в целые числа
+        try:
+            if isinstance(overall_score, dict):
+                total_score = int(float(overall_score.get('value', 0)))
+            else:
+                total_score = int(float(overall_score))
+        
+            if isinstance(education_score, dict):
+                education_score = int(float(education_score.get('value', 0)))
+            else:
+                education_score = int(float(education_score))
+        except (ValueError, TypeError):
+            total_score = 0
+            education_score = 0
+        
+        return total_score, education_score
+
+    def save_analysis(self, extracted_info: Dict, analysis_result: Dict,
+                      scoring_version: Optional[str] = None, filename: Optional[str] = None,
+                      content: Optional[str] = None) -> Optional[int]:
         """
         Сохраняет результаты анализа резюме в базу данных.
         
         Args:
             extracted_info (Dict): Извлеченная информация из резюме
             analysis_result (Dict): Результаты анализа компетенций
+            scoring_version (Optional[str]): Версия модели оценки, которой получен результат
+            filename (Optional[str]): Имя загруженного файла
+            content (Optional[str]): Текст резюме для полнотекстового поиска
             
         Returns:
             Optional[int]: ID сохраненной записи или None в случае ошибки
@@ -76,130 +305,329 @@ class Database:
             logger.debug(f"Extracted info: {json.dumps(extracted_info, indent=2)}")
             logger.debug(f"Analysis result: {json.dumps(analysis_result, indent=2)}")
             
-            # Получаем данные об образовании
-            education = extracted_info.get('education', [{}])[0] if extracted_info.get('education') else {}
-            
-            # Подсчитываем годы опыта с обработкой русских текстовых значений
-            experience = extracted_info.get('experience', [])
-            total_experience = 0
-            for exp in experience:
-                if isinstance(exp, dict):
-                    duration = exp.get('years', '0')
-                    if isinstance(duration, str):
-                        # Обработка русских текстовых значений
-                        if 'месяц' in duration.lower():
-                            try:
-                                months = float(duration.split()[0]) / 12
-                                total_experience += months
-                            except (ValueError, IndexError):
-                                total_experience += 0
-                        else:
-                            try:
-                                total_experience += float(duration)
-                            except ValueError:
-                                total_experience += 0
-                    else:
-                        total_experience += float(duration)
-            
-            # Получаем оценки из результатов анализа
-            overall_score = analysis_result.get('overall_score', {}).get('value', 0)
-            education_score = analysis_result.get('details', {}).get('education', {}).get('score', 0)
-            
-            # Преобразуем оценки в целые числа
-            try:
-                if isinstance(overall_score, dict):
-                    total_score = int(float(overall_score.get('value', 0)))
-                else:
-                    total_score = int(float(overall_score))
-                
-                if isinstance(education_score, dict):
-                    education_score = int(float(education_score.get('value', 0)))
-                else:
-                    education_score = int(float(education_score))
-            except (ValueError, TypeError):
-                total_score = 0
-                education_score = 0
-            
-            # Создаем запись в БД
-            resume = Resume(
-                filename=extracted_info.get('original_filename', 'unknown.pdf'),
-                content=extracted_info.get('text', ''),
-                extracted_info=json.dumps(extracted_info),
-                analysis_results=json.dumps(analysis_result),
-                university=education.get('institution', ''),
-                speciality=education.get('speciality', ''),
-                graduation_year=education.get('end_date', ''),
-                education_score=education_score,
-                skills=json.dumps(extracted_info.get('skills', {})),
-                experience_years=int(total_experience),
-                total_score=total_score
-            )
+            values = self._analysis_row(extracted_info, analysis_result, scoring_version, filename, content)
             
             # Логируем данные перед сохранением
-            logger.info(f"Saving resume: filename={resume.filename}, "
-                       f"university={resume.university}, "
-                       f"total_score={resume.total_score}")
+            logger.info(f"Saving resume: filename={values['filename']}, "
+                       f"university={values['university']}, "
+                       f"total_score={values['total_score']}")
             
-            self.session.add(resume)
-            self.session.commit()
-            logger.info(f"Successfully saved analysis results with ID: {resume.id}")
-            return resume.id
+            resume_id = self._save_row(values)
+            logger.info(f"Successfully saved analysis results with ID: {resume_id}")
+            return resume_id
             
         except SQLAlchemyError as e:
             logger.error(f"Database error while saving analysis: {str(e)}")
-            self.session.rollback()
             return None
         except Exception as e:
             logger.error(f"Error saving analysis: {str(e)}")
             logger.error(f"Extracted info type: {type(extracted_info)}")
             logger.error(f"Analysis result type: {type(analysis_result)}")
-            self.session.rollback()
             return None
 
+    def save_analyses_bulk(self, items: Iterable[Dict[str, Any]],
+                           batch_size: Optional[int] = None) -> List[Optional[int]]:
+        """
+        Сохраняет много результатов анализа порциями.
+        
+        Каждая порция записывается одной транзакцией: резюме - одним
+        многострочным INSERT с RETURNING, навыки и полосы SimHash - еще
+        двумя. Если порция не записалась (например, повторный текст нарушил
+        уникальность content_hash), ее строки сохраняются по одной, и
+        ошибка одной строки не теряет остальные.
+        
+        Args:
+            items (Iterable[Dict[str, Any]]): Словари с аргументами save_analysis
+                (extracted_info, analysis_result, scoring_version, filename, content)
+            batch_size (Optional[int]): Размер порции; по умолчанию database.bulk_batch_size
+            
+        Returns:
+            List[Optional[int]]: ID записей в порядке items, None для несохраненных
+        """
+        batch_size = max(1, batch_size or self.bulk_batch_size)
+        ids = []
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                ids.extend(self._save_batch(batch))
+                batch = []
+        if batch:
+            ids.extend(self._save_batch(batch))
+        return ids
+
+    def _save_batch(self, items: List[Dict[str, Any]]) -> List[Optional[int]]:
+        ids: List[Optional[int]] = [None] * len(items)
+        rows = []
+        for index, item in enumerate(items):
+            try:
+                rows.append((index, self._analysis_row(**item)))
+            except Exception as e:
+                logger.error(f"Error preparing analysis {index} for bulk save: {str(e)}")
+        if not rows:
+            return ids
+        
+        try:
+            with self.session_scope() as session:
+                # Для SQLite SQLAlchemy гарантирует порядок RETURNING только построчными INSERT;
+                # но rowid новых строк одного INSERT растут в порядке VALUES, и сортировки ID достаточно
+                ordered = self.engine.dialect.name != 'sqlite'
+                statement = insert(Resume).returning(Resume.id, sort_by_parameter_order=ordered)
+                new_ids = session.execute(statement, [values for _, values in rows]).scalars().all()
+                if not ordered:
+                    new_ids = sorted(new_ids)
+                skills, bands = [], []
+                for (index, values), resume_id in zip(rows, new_ids):
+                    ids[index] = resume_id
+                    skills.extend({'resume_id': resume_id, 'skill': name}
+                                  for name in self.skill_catalog.canonicalize_all(resume_skill_names(values['skills'])))
+                    if values['simhash'] is not None:
+                        bands.extend({'band': band, 'value': value, 'resume_id': resume_id}
+                                     for band, value in simhash_bands(values['simhash']))
+                if skills:
+                    session.execute(insert(ResumeSkill), skills)
+                if bands:
+                    session.execute(insert(ResumeSimhashBand), bands)
+                self._update_aggregates(session, new_ids, Counter())
+            logger.info(f"Saved {len(rows)} analyses in one transaction")
+            return ids
+        except SQLAlchemyError as e:
+            logger.warning(f"Bulk save of {len(rows)} analyses failed, saving one by one: {str(e)}")
+        
+        ids = [None] * len(items)
+        for index, values in rows:
+            try:
+                ids[index] = self._save_row(values)
+            except SQLAlchemyError as e:
+                logger.error(f"Database error while saving analysis {index}: {str(e)}")
+        return ids
+
+    def _analysis_row(self, extracted_info: Dict, analysis_result: Dict, scoring_version: Optional[str] = None,
+                      filename: Optional[str] = None, content: Optional[str] = None) -> Dict[str, Any]:
+        """Значения колонок resumes для результата анализа"""
+        # Получаем данные об образовании
+        education = extracted_info.get('education', [{}])[0] if extracted_info.get('education') else {}
+        
+        # Подсчитываем годы опыта с обработкой русских текстовых значений
+        experience = extracted_info.get('experience', [])
+        total_experience = 0
+        for exp in experience:
+            if isinstance(exp, dict):
+                duration = exp.get('years', '0')
+                if isinstance(duration, str):
+                    # Обработка русских текстовых значений
+                    if 'месяц' in duration.lower():
+                        try:
+                            months = float(duration.split()[0]) / 12
+                            total_experience += months
+                        except (ValueError, IndexError):
+                            total_experience += 0
+                    else:
+                        try:
+                            total_experience += float(duration)
+                        except ValueError:
+                            total_experience += 0
+                else:
+                    total_experience += float(duration)
+        
+        # Получаем оценки из результатов анализа
+        total_score, education_score = self.extract_scores(analysis_result)
+        
+        return dict(
+            filename=filename or extracted_info.get('original_filename', 'unknown.pdf'),
+            content=content if content is not None else extracted_info.get('text', ''),
+            extracted_info=extracted_info,
+            **self._analysis_columns(analysis_result),
+            university=education.get('institution', ''),
+            canonical_university=self.university_names.canonicalize(education.get('institution')),
+            speciality=education.get('speciality', ''),
+            graduation_year=education.get('end_date', ''),
+            education_score=education_score,
+            skills=extracted_info.get('skills', {}),
+            experience_years=int(total_experience),
+            total_score=total_score,
+            scoring_version=scoring_version,
+            **self._fingerprint_columns(content)
+        )
+
+    def _save_row(self, values: Dict[str, Any]) -> int:
+        """Сохраняет одно резюме с навыками и полосами SimHash"""
+        resume = Resume(**values)
+        with self.session_scope() as session:
+            session.add(resume)
+            session.flush()
+            self._save_skills(session, resume.id, values['skills'])
+            self._save_simhash_bands(session, resume.id, resume.simhash)
+            self._update_aggregates(session, [resume.id], Counter())
+        return resume.id
+
     def save_resume(self, filename: str, content: str, extracted_info: Dict, 
                    analysis_results: Dict) -> Optional[int]:
         try:
             resume = Resume(
                 filename=filename,
                 content=content,
-                extracted_info=json.dumps(extracted_info),
-                analysis_results=json.dumps(analysis_results),
+                extracted_info=extracted_info,
+                **self._analysis_columns(analysis_results),
                 university=extracted_info.get('education', [{}])[0].get('university'),
+                canonical_university=self.university_names.canonicalize(
+                    extracted_info.get('education', [{}])[0].get('university')),
                 speciality=extracted_info.get('education', [{}])[0].get('speciality'),
                 graduation_year=extracted_info.get('education', [{}])[0].get('year'),
-                education_score=analysis_results.get('education_score'),
-                skills=json.dumps(extracted_info.get('skills', [])),
+                education_score=analysis_results.get('education_score') or 0,
+                skills=extracted_info.get('skills', []),
                 experience_years=analysis_results.get('experience_years'),
-                total_score=analysis_results.get('total_score')
+                total_score=analysis_results.get('total_score') or 0,
+                **self._fingerprint_columns(content)
             )
-            self.session.add(resume)
-            self.session.commit()
+            with self.session_scope() as session:
+                session.add(resume)
+                session.flush()
+                self._save_skills(session, resume.id, extracted_info.get('skills', []))
+                self._save_simhash_bands(session, resume.id, resume.simhash)
+                self._update_aggregates(session, [resume.id], Counter())
             logger.info(f"Successfully saved resume with ID: {resume.id}")
             return resume.id
         except SQLAlchemyError as e:
             logger.error(f"Database error while saving resume: {str(e)}")
-            self.session.rollback()
             return None
         except Exception as e:
             logger.error(f"Error saving resume: {str(e)}")
-            self.session.rollback()
+            return None
+
+    def _analysis_columns(self, analysis_result: Any) -> Dict[str, Any]:
+        """analysis_results как JSON или, при включенном сжатии, в analysis_payload"""
+        payload = compress_json(analysis_result, self.compression)
+        role = best_role(analysis_result)
+        if payload is None:
+            return {'analysis_results': analysis_result, 'analysis_payload': None, 'best_role': role}
+        return {'analysis_results': None, 'analysis_payload': payload, 'best_role': role}
+
+    @staticmethod
+    def _analysis_value(results: Any, payload: Optional[bytes]) -> Any:
+        if payload is not None:
+            return decompress_json(payload)
+        return json_value(results)
+
+    def _save_skills(self, session: Session, resume_id: int, skills: Any):
+        """Заменяет канонические навыки резюме"""
+        session.execute(delete(ResumeSkill).where(ResumeSkill.resume_id == resume_id))
+        names = self.skill_catalog.canonicalize_all(resume_skill_names(skills))
+        if names:
+            session.execute(insert(ResumeSkill), [{'resume_id': resume_id, 'skill': name} for name in names])
+
+    @staticmethod
+    def _aggregates(session: Session, ids: List[int]) -> Counter:
+        """Вклад резюме с указанными ID в сводку resume_aggregates по текущему состоянию транзакции"""
+        keys = Counter()
+        if not ids:
+            return keys
+        skills: Dict[int, List[str]] = {}
+        for resume_id, skill in session.execute(
+                select(ResumeSkill.resume_id, ResumeSkill.skill).where(ResumeSkill.resume_id.in_(ids))):
+            skills.setdefault(resume_id, []).append(skill)
+        for row in session.execute(
+                select(Resume.id, Resume.total_score, Resume.upload_date, Resume.canonical_university,
+                       Resume.best_role)
+                .where(Resume.id.in_(ids))):
+            keys.update(aggregate_keys(row.id, row.total_score, row.upload_date, row.canonical_university,
+                                       row.best_role, skills.get(row.id, [])))
+        return keys
+
+    def _update_aggregates(self, session: Session, ids: List[int], before: Counter):
+        """Переносит в сводку разницу между текущим вкладом резюме и вкладом до изменения"""
+        session.flush()
+        delta = self._aggregates(session, ids)
+        delta.subtract(before)
+        apply_aggregates(session, ResumeAggregate.__table__, delta)
+
+    @staticmethod
+    def _fingerprint_columns(content: Optional[str]) -> Dict[str, Any]:
+        fingerprint = Fingerprint.from_text(content) if content else None
+        if fingerprint is None:
+            return {'content_hash': None, 'simhash': None}
+        return {'content_hash': fingerprint.content_hash, 'simhash': fingerprint.simhash}
+
+    @staticmethod
+    def _save_simhash_bands(session: Session, resume_id: int, simhash: Optional[int]):
+        if simhash is not None:
+            session.execute(insert(ResumeSimhashBand), [{'band': band, 'value': value, 'resume_id': resume_id}
+                                                        for band, value in simhash_bands(simhash)])
+
+    def find_duplicate(self, file_hash: Optional[str] = None, text: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ищет ранее сохраненное резюме для повторной загрузки.
+        
+        Сначала по хэшу файла (до извлечения текста), затем по хэшу
+        нормализованного текста и по SimHash: почти-дубликатом считается
+        запись, отличающаяся не больше чем в NEAR_DUPLICATE_DISTANCE битах.
+        Каждая проверка - поиск по индексу.
+        
+        Args:
+            file_hash (Optional[str]): sha256 содержимого файла
+            text (Optional[str]): Извлеченный текст резюме
+            
+        Returns:
+            Optional[Dict[str, Any]]: {'resume_id', 'match': file|exact|near, 'distance'} или None
+        """
+        with self.session_scope() as session:
+            if file_hash:
+                resume_id = session.execute(select(ResumeUpload.resume_id)
+                                            .where(ResumeUpload.file_hash == file_hash).limit(1)).scalar()
+                if resume_id is not None:
+                    return {'resume_id': resume_id, 'match': 'file', 'distance': 0}
+            
+            fingerprint = Fingerprint.from_text(text) if text else None
+            if fingerprint is None:
+                return None
+            resume_id = session.execute(select(Resume.id)
+                                        .where(Resume.content_hash == fingerprint.content_hash)).scalar()
+            if resume_id is not None:
+                return {'resume_id': resume_id, 'match': 'exact', 'distance': 0}
+            
+            bands = [(ResumeSimhashBand.band == band) & (ResumeSimhashBand.value == value)
+                     for band, value in simhash_bands(fingerprint.simhash)]
+            candidates = session.execute(
+                select(Resume.id, Resume.simhash).distinct()
+                .join(ResumeSimhashBand, ResumeSimhashBand.resume_id == Resume.id)
+                .where(or_(*bands))
+            ).all()
+        
+        matches = sorted((hamming_distance(fingerprint.simhash, row.simhash), row.id) for row in candidates)
+        if matches and matches[0][0] <= NEAR_DUPLICATE_DISTANCE:
+            distance, resume_id = matches[0]
+            return {'resume_id': resume_id, 'match': 'near', 'distance': distance}
+        return None
+
+    def record_upload(self, resume_id: int, filename: Optional[str], file_hash: Optional[str] = None,
+                      match: str = 'new') -> Optional[int]:
+        """Записывает загрузку файла и ее связь с сохраненным резюме"""
+        try:
+            upload = ResumeUpload(resume_id=resume_id, filename=filename, file_hash=file_hash, match=match)
+            with self.session_scope() as session:
+                session.add(upload)
+            return upload.id
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while recording upload: {str(e)}")
             return None
 
     def get_resume(self, resume_id: int) -> Optional[Dict]:
         try:
-            resume = self.session.query(Resume).filter(Resume.id == resume_id).first()
+            with self.session_scope() as session:
+                resume = (session.query(Resume).options(undefer_group('payload'))
+                          .filter(Resume.id == resume_id).first())
             if resume:
                 return {
                     'id': resume.id,
                     'filename': resume.filename,
                     'content': resume.content,
-                    'extracted_info': json.loads(resume.extracted_info),
-                    'analysis_results': json.loads(resume.analysis_results),
+                    'extracted_info': json_value(resume.extracted_info),
+                    'analysis_results': self._analysis_value(resume.analysis_results, resume.analysis_payload),
                     'university': resume.university,
                     'speciality': resume.speciality,
                     'graduation_year': resume.graduation_year,
                     'education_score': resume.education_score,
-                    'skills': json.loads(resume.skills),
+                    'skills': json_value(resume.skills),
                     'experience_years': resume.experience_years,
                     'total_score': resume.total_score,
                     'upload_date': resume.upload_date.isoformat(),
@@ -212,7 +640,8 @@ class Database:
 
     def get_all_resumes(self) -> List[Dict]:
         try:
-            resumes = self.session.query(Resume).all()
+            with self.session_scope() as session:
+                resumes = session.query(Resume).all()
             return [{
                 'id': r.id,
                 'filename': r.filename,
@@ -229,71 +658,333 @@ class Database:
             logger.error(f"Error retrieving all resumes: {str(e)}")
             return []
 
+    def get_history(self, limit: int = 50, cursor: Optional[str] = None, sort: str = 'upload_date',
+                    order: str = 'desc', fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Страница истории анализов с курсорной пагинацией.
+        
+        Записи выбираются по индексу (колонка сортировки, id) условием
+        "ключ после последней записи предыдущей страницы", поэтому время
+        ответа не зависит от номера страницы и размера таблицы.
+        
+        Args:
+            limit (int): Размер страницы (не больше MAX_HISTORY_LIMIT)
+            cursor (Optional[str]): Курсор из next_cursor предыдущей страницы
+            sort (str): upload_date, total_score или education_score
+            order (str): asc или desc
+            fields (Optional[List[str]]): Возвращаемые поля из HISTORY_FIELDS
+            
+        Returns:
+            Dict[str, Any]: {'items': [...], 'next_cursor': курсор или None на последней странице}
+            
+        Raises:
+            ValueError: Неизвестные сортировка, порядок, поле или некорректный курсор
+        """
+        if sort not in HISTORY_SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unsupported order: {order}")
+        fields = list(fields or DEFAULT_HISTORY_FIELDS)
+        unknown = [field for field in fields if field not in HISTORY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported fields: {', '.join(unknown)}")
+        limit = max(1, min(int(limit), MAX_HISTORY_LIMIT))
+        
+        sort_column = getattr(Resume, sort)
+        names = ['id', sort] + [field for field in fields if field not in ('id', sort)]
+        if 'analysis_results' in fields:
+            names.append('analysis_payload')
+        query = select(*[getattr(Resume, name) for name in names])
+        if cursor:
+            value, last_id = self._decode_cursor(cursor, sort, order)
+            key = tuple_(sort_column, Resume.id)
+            bound = tuple_(literal(value, sort_column.type), literal(last_id, Integer()))
+            query = query.where(key < bound if order == 'desc' else key > bound)
+        if order == 'desc':
+            query = query.order_by(sort_column.desc(), Resume.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Resume.id.asc())
+        
+        with self.session_scope() as session:
+            rows = session.execute(query.limit(limit + 1)).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(sort, order, getattr(rows[-1], sort), rows[-1].id)
+        return {
+            'items': [{field: self._history_value(row, field) for field in fields} for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    @classmethod
+    def _history_value(cls, row: Any, field: str) -> Any:
+        if field == 'analysis_results':
+            return cls._analysis_value(row.analysis_results, row.analysis_payload)
+        value = getattr(row, field)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _encode_cursor(sort: str, order: str, value: Any, last_id: int) -> str:
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps([sort, order, value, last_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            cursor_sort, cursor_order, value, last_id = json.loads(payload)
+            if sort == 'upload_date':
+                value = datetime.fromisoformat(value)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {str(e)}")
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise ValueError("Cursor does not match sort order")
+        return value, int(last_id)
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Сводка для дашборда из предрасчитанных счетчиков resume_aggregates.
+        
+        Таблица resumes не читается: время ответа зависит от числа
+        различных вузов, навыков и месяцев, а не от числа резюме.
+        
+        Args:
+            top (int): Сколько вузов и навыков вернуть (не больше MAX_STATS_TOP)
+            
+        Returns:
+            Dict[str, Any]: total, score_histogram, roles, periods, top_universities и top_skills
+        """
+        top = max(1, min(int(top), MAX_STATS_TOP))
+        count = func.sum(ResumeAggregate.resume_count).label('resume_count')
+        with self.session_scope() as session:
+            rows = session.execute(
+                select(ResumeAggregate.dimension, ResumeAggregate.name, ResumeAggregate.bucket,
+                       ResumeAggregate.resume_count)
+                .where(ResumeAggregate.dimension.in_(('role', 'period')), ResumeAggregate.resume_count > 0)
+            ).all()
+            top_rows = {
+                dimension: session.execute(
+                    select(ResumeAggregate.name, count)
+                    .where(ResumeAggregate.dimension == dimension, ResumeAggregate.resume_count > 0)
+                    .group_by(ResumeAggregate.name)
+                    .order_by(count.desc(), ResumeAggregate.name)
+                    .limit(top)
+                ).all()
+                for dimension in ('university', 'skill')
+            }
+        
+        histogram = [0] * (MAX_BUCKET + 1)
+        roles, periods = Counter(), Counter()
+        for row in rows:
+            if row.dimension == 'role':
+                roles[row.name] += row.resume_count
+            else:
+                # Каждое резюме ровно в одной строке period: ее корзины дают гистограмму всей базы
+                histogram[row.bucket] += row.resume_count
+                if row.name:
+                    periods[row.name] += row.resume_count
+        return {
+            'total': sum(histogram),
+            'score_histogram': [{'from': bucket * SCORE_BUCKET_SIZE,
+                                 'to': min(bucket * SCORE_BUCKET_SIZE + SCORE_BUCKET_SIZE - 1, 100),
+                                 'count': value} for bucket, value in enumerate(histogram)],
+            'roles': [{'role': role, 'count': value} for role, value in roles.most_common()],
+            'periods': [{'period': period, 'count': periods[period]} for period in sorted(periods)],
+            'top_universities': [{'university': row.name, 'count': row.resume_count}
+                                 for row in top_rows['university']],
+            'top_skills': [{'skill': row.name, 'count': row.resume_count} for row in top_rows['skill']]
+        }
+
     def update_resume(self, resume_id: int, updates: Dict[str, Any]) -> bool:
         try:
-            resume = self.session.query(Resume).filter(Resume.id == resume_id).first()
-            if resume:
+            with self.session_scope() as session:
+                resume = session.query(Resume).filter(Resume.id == resume_id).first()
+                if not resume:
+                    return False
+                before = self._aggregates(session, [resume_id])
+                if 'analysis_results' in updates:
+                    updates = dict(updates, **self._analysis_columns(updates['analysis_results']))
+                if 'university' in updates:
+                    updates = dict(updates, canonical_university=self.university_names.canonicalize(updates['university']))
                 for key, value in updates.items():
                     if hasattr(resume, key):
                         setattr(resume, key, value)
-                self.session.commit()
-                logger.info(f"Successfully updated resume {resume_id}")
-                return True
-            return False
+                if 'skills' in updates:
+                    self._save_skills(session, resume_id, updates['skills'])
+                self._update_aggregates(session, [resume_id], before)
+            logger.info(f"Successfully updated resume {resume_id}")
+            return True
         except Exception as e:
             logger.error(f"Error updating resume {resume_id}: {str(e)}")
-            self.session.rollback()
             return False
 
     def delete_resume(self, resume_id: int) -> bool:
         try:
-            resume = self.session.query(Resume).filter(Resume.id == resume_id).first()
-            if resume:
-                self.session.delete(resume)
-                self.session.commit()
-                logger.info(f"Successfully deleted resume {resume_id}")
-                return True
-            return False
+            with self.session_scope() as session:
+                resume = session.query(Resume).filter(Resume.id == resume_id).first()
+                if not resume:
+                    return False
+                apply_aggregates(session, ResumeAggregate.__table__,
+                                 {key: -count for key, count in self._aggregates(session, [resume_id]).items()})
+                # Внешние ключи SQLite по умолчанию выключены, каскад не сработает
+                for model in (ResumeSkill, ResumeSimhashBand, ResumeUpload):
+                    session.execute(delete(model).where(model.resume_id == resume_id))
+                session.delete(resume)
+            logger.info(f"Successfully deleted resume {resume_id}")
+            return True
         except Exception as e:
             logger.error(f"Error deleting resume {resume_id}: {str(e)}")
-            self.session.rollback()
             return False
 
-    def search_resumes(self, criteria: Dict[str, Any]) -> List[Dict]:
-        try:
-            query = self.session.query(Resume)
+    def search(self, skills: Optional[List[str]] = None, text_query: Optional[str] = None,
+               min_total_score: Optional[int] = None, min_education_score: Optional[int] = None,
+               min_experience_years: Optional[int] = None, limit: int = 50,
+               cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Поиск кандидатов по навыкам, оценкам и тексту резюме.
+        
+        Навыки приводятся к каноническим названиям матрицы (алиасы
+        разрешаются) и ищутся по индексу resume_skills; текст - по
+        полнотекстовому индексу (FTS5 в SQLite, tsvector в PostgreSQL).
+        Все условия объединяются через И, результаты идут от новых к
+        старым с курсорной пагинацией по id.
+        
+        Args:
+            skills (Optional[List[str]]): Навыки, которые должны быть у кандидата (все)
+            text_query (Optional[str]): Слова из текста резюме, вуза или специальности (префиксы)
+            min_total_score (Optional[int]): Минимальная общая оценка
+            min_education_score (Optional[int]): Минимальная оценка образования
+            min_experience_years (Optional[int]): Минимальный опыт в годах
+            limit (int): Размер страницы (не больше MAX_HISTORY_LIMIT)
+            cursor (Optional[str]): Курсор из next_cursor предыдущей страницы
             
-            if 'university' in criteria:
-                query = query.filter(Resume.university.ilike(f"%{criteria['university']}%"))
-            if 'speciality' in criteria:
-                query = query.filter(Resume.speciality.ilike(f"%{criteria['speciality']}%"))
-            if 'min_education_score' in criteria:
-                query = query.filter(Resume.education_score >= criteria['min_education_score'])
-            if 'min_experience_years' in criteria:
-                query = query.filter(Resume.experience_years >= criteria['min_experience_years'])
-            if 'min_total_score' in criteria:
-                query = query.filter(Resume.total_score >= criteria['min_total_score'])
+        Returns:
+            Dict[str, Any]: {'items': [...], 'next_cursor': курсор или None на последней странице}
             
-            resumes = query.all()
-            return [{
-                'id': r.id,
-                'filename': r.filename,
-                'university': r.university,
-                'speciality': r.speciality,
-                'graduation_year': r.graduation_year,
-                'education_score': r.education_score,
-                'experience_years': r.experience_years,
-                'total_score': r.total_score,
-                'upload_date': r.upload_date.isoformat(),
-                'last_modified': r.last_modified.isoformat()
-            } for r in resumes]
+        Raises:
+            ValueError: Слишком много навыков или некорректный курсор
+        """
+        names = self.skill_catalog.canonicalize_all(skills or [])
+        if len(names) > MAX_SEARCH_SKILLS:
+            raise ValueError(f"Too many skills, at most {MAX_SEARCH_SKILLS} are supported")
+        limit = max(1, min(int(limit), MAX_HISTORY_LIMIT))
+        
+        query = select(*[getattr(Resume, field) for field in DEFAULT_HISTORY_FIELDS])
+        # Сортировка по id таблицы, с которой начинается выборка: тогда индекс
+        # отдает строки уже в нужном порядке и чтение останавливается на limit
+        order_key = Resume.id
+        for name in names:
+            skill = aliased(ResumeSkill)
+            query = query.join(skill, (skill.resume_id == Resume.id) & (skill.skill == name))
+            if order_key is Resume.id:
+                order_key = skill.resume_id
+        tokens = _SEARCH_TOKEN.findall(text_query or '')
+        if tokens and self.engine.dialect.name == 'sqlite':
+            match = ' '.join(f'"{token}"*' for token in tokens)
+            query = query.join(_resumes_fts, _resumes_fts.c.rowid == Resume.id).where(
+                literal_column('resumes_fts').op('MATCH')(match))
+            # FTS5 отдает совпадения по убыванию rowid без сортировки
+            order_key = _resumes_fts.c.rowid
+        elif tokens:
+            query = query.where(self._text_condition(tokens))
+        if min_total_score is not None:
+            query = query.where(Resume.total_score >= min_total_score)
+        if min_education_score is not None:
+            query = query.where(Resume.education_score >= min_education_score)
+        if min_experience_years is not None:
+            query = query.where(Resume.experience_years >= min_experience_years)
+        if cursor:
+            _, last_id = self._decode_cursor(cursor, 'id', 'desc')
+            query = query.where(order_key < last_id)
+        
+        with self.session_scope() as session:
+            rows = session.execute(query.order_by(order_key.desc()).limit(limit + 1)).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor('id', 'desc', rows[-1].id, rows[-1].id)
+        return {
+            'items': [{field: self._history_value(row, field) for field in DEFAULT_HISTORY_FIELDS} for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    def _text_condition(self, tokens: List[str]):
+        """Условие полнотекстового поиска без FTS5: все слова как префиксы"""
+        if self.engine.dialect.name == 'postgresql':
+            tsquery = ' & '.join(f"'{token}':*" for token in tokens)
+            return literal_column('resumes.search_vector').op('@@')(func.to_tsquery('simple', tsquery))
+        # Без полнотекстового индекса - медленный, но рабочий поиск подстрок
+        return and_(*[Resume.content.ilike(f'%{token}%') for token in tokens])
+
+    def search_resumes(self, criteria: Dict[str, Any]) -> List[Dict]:
+        """Первая страница search по словарю критериев (skills, text, university, speciality, min_*)"""
+        try:
+            words = [criteria[key] for key in ('text', 'university', 'speciality') if criteria.get(key)]
+            return self.search(
+                skills=criteria.get('skills'),
+                text_query=' '.join(words),
+                min_total_score=criteria.get('min_total_score'),
+                min_education_score=criteria.get('min_education_score'),
+                min_experience_years=criteria.get('min_experience_years'),
+                limit=criteria.get('limit', MAX_HISTORY_LIMIT)
+            )['items']
         except Exception as e:
             logger.error(f"Error searching resumes: {str(e)}")
             return []
 
-    def __del__(self):
+    def iter_unscored(self, scoring_version: str, chunk_size: int = 500) -> Iterator[List[Tuple[int, Any]]]:
+        """
+        Порциями отдает (id, extracted_info) записей, оцененных другой версией модели.
+        
+        Записи читаются по возрастанию id с продолжением от последнего
+        прочитанного id, поэтому в памяти находится не больше одной порции,
+        а после прерывания обработка продолжается с необработанных записей.
+        """
+        last_id = 0
+        while True:
+            # Транзакция чтения не остается открытой, пока обрабатывается порция
+            with self.session_scope() as session:
+                rows = (
+                    session.query(Resume.id, Resume.extracted_info)
+                    .filter(Resume.id > last_id)
+                    .filter(or_(Resume.scoring_version.is_(None), Resume.scoring_version != scoring_version))
+                    .order_by(Resume.id)
+                    .limit(chunk_size)
+                    .all()
+                )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [(row[0], row[1]) for row in rows]
+
+    def update_scores_bulk(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Обновляет оценки группы записей одной транзакцией.
+        
+        Args:
+            updates (List[Dict[str, Any]]): Словари с ключом id и обновляемыми колонками;
+                analysis_results передается словарем и сжимается по настройке compression
+            
+        Returns:
+            int: Количество обновленных записей
+        """
+        if not updates:
+            return 0
+        updates = [dict(values, **self._analysis_columns(values['analysis_results']))
+                   if 'analysis_results' in values else values for values in updates]
         try:
-            self.session.close()
-            logger.info("Database connection closed")
-        except:
-            pass
+            with self.session_scope() as session:
+                ids = [values['id'] for values in updates]
+                before = self._aggregates(session, ids)
+                session.execute(update(Resume), updates)
+                self._update_aggregates(session, ids, before)
+            return len(updates)
+        except Exception as e:
+            logger.error(f"Error updating scores: {str(e)}")
+            raise
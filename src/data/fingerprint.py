@@ -0,0 +1,76 @@
+from typing import List, Optional, Tuple
+import hashlib
+import re
+import numpy as np
+
+# Резюме считаются почти одинаковыми, если SimHash отличается не больше чем в 3 битах из 64
+NEAR_DUPLICATE_DISTANCE = 3
+# 64 бита делятся на NEAR_DUPLICATE_DISTANCE + 1 полос: при расстоянии <= 3
+# хотя бы одна полоса совпадает целиком, и кандидатов можно искать по индексу
+SIMHASH_BANDS = NEAR_DUPLICATE_DISTANCE + 1
+BAND_BITS = 64 // SIMHASH_BANDS
+SHINGLE_SIZE = 3
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize_text(text: str) -> List[str]:
+    """Слова текста в нижнем регистре: переносы строк, пробелы и пунктуация не влияют на отпечаток"""
+    return _WORD.findall((text or '').lower())
+
+
+def file_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def content_hash(words: List[str]) -> str:
+    return hashlib.sha256(' '.join(words).encode('utf-8')).hexdigest()
+
+
+def simhash(words: List[str]) -> int:
+    """64-битный SimHash по шинглам из SHINGLE_SIZE слов"""
+    size = min(SHINGLE_SIZE, len(words))
+    digests = b''.join(
+        hashlib.blake2b(' '.join(words[index:index + size]).encode('utf-8'), digest_size=8).digest()
+        for index in range(len(words) - size + 1)
+    )
+    # Строка - шингл, столбец - бит хэша от старшего к младшему
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(bits)
+    return int(''.join('1' if vote > 0 else '0' for vote in votes), 2)
+
+
+def to_signed(value: int) -> int:
+    """Беззнаковые 64 бита -> знаковое число для колонки BIGINT"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << 64) - 1)
+
+
+def simhash_bands(value: int) -> List[Tuple[int, int]]:
+    """Пары (номер полосы, значение полосы) для индекса почти-дубликатов"""
+    value = to_unsigned(value)
+    mask = (1 << BAND_BITS) - 1
+    return [(band, value >> (band * BAND_BITS) & mask) for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(to_unsigned(first) ^ to_unsigned(second)).count('1')
+
+
+class Fingerprint:
+    """Отпечатки текста резюме: точный (content_hash) и для почти-дубликатов (simhash)"""
+
+    def __init__(self, content_hash: str, simhash: int):
+        self.content_hash = content_hash
+        self.simhash = simhash
+
+    @classmethod
+    def from_text(cls, text: str) -> Optional['Fingerprint']:
+        """None, если в тексте нет слов (например, PDF из одних картинок)"""
+        words = normalize_text(text)
+        if not words:
+            return None
+        return cls(content_hash(words), to_signed(simhash(words)))
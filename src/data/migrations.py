@@ -0,0 +1,445 @@
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, JSON, MetaData, SmallInteger, String, Table, Text,
+                        bindparam, inspect, select, text, update)
+from sqlalchemy.engine import Connection, Engine
+from .aggregates import aggregate_keys, apply_aggregates, best_role
+from .compression import decompress_json, json_value
+from .fingerprint import Fingerprint, simhash_bands
+from .skill_catalog import SkillCatalog, resume_skill_names
+from .university_names import UniversityNames
+
+logger = logging.getLogger(__name__)
+
+# Размер порции при переносе данных: в памяти не больше одной порции строк
+BACKFILL_BATCH_SIZE = 1000
+
+schema_metadata = MetaData()
+schema_version = Table(
+    'schema_version', schema_metadata,
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('name', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+class Migration:
+    """
+    Изменение схемы, применяемое один раз и только вперед.
+
+    ``upgrade`` выполняется в одной транзакции и должен быть идемпотентным
+    (проверять, что колонка или индекс еще не созданы): если перенос данных
+    прервется, миграция будет запущена заново. ``backfill`` выполняется после
+    изменения схемы и фиксирует данные порциями, поэтому тоже обязан
+    пропускать уже обработанные строки.
+    """
+
+    def __init__(self, version: int, name: str, upgrade: Callable[[Connection], None],
+                 backfill: Optional[Callable[[Engine], Any]] = None):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.backfill = backfill
+
+
+def has_column(connection: Connection, table: str, column: str) -> bool:
+    return any(info['name'] == column for info in inspect(connection).get_columns(table))
+
+
+def add_column(connection: Connection, table: str, column: str, ddl_type: str):
+    """ALTER TABLE ... ADD COLUMN, если колонки еще нет"""
+    if not has_column(connection, table, column):
+        connection.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}')
+
+
+def create_index(connection: Connection, name: str, table: str, columns: Sequence[str], unique: bool = False):
+    """CREATE INDEX IF NOT EXISTS (поддерживается SQLite и PostgreSQL)"""
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    connection.exec_driver_sql(f'CREATE {kind} IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+
+def for_each_batch(engine: Engine, table_name: str, columns: Sequence[str],
+                   handle: Callable[[Connection, Table, List[Any]], int], where=None,
+                   batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Обрабатывает строки таблицы порциями.
+
+    Строки читаются по возрастанию id с продолжением от последнего id
+    (без OFFSET), каждая порция обрабатывается и фиксируется отдельной
+    транзакцией, поэтому таблица любого размера не загружается в память
+    и не блокируется целиком.
+
+    Args:
+        engine (Engine): Подключение к базе
+        table_name (str): Таблица с целочисленным первичным ключом id
+        columns (Sequence[str]): Колонки, которые нужны ``handle``
+        handle: (соединение, таблица, строки порции) -> количество измененных строк
+        where: Функция table -> условие отбора строк
+        batch_size (int): Размер порции
+
+    Returns:
+        int: Суммарное количество измененных строк
+    """
+    table = Table(table_name, MetaData(), autoload_with=engine)
+    query = select(table.c.id, *[table.c[name] for name in columns]).order_by(table.c.id).limit(batch_size)
+    if where is not None:
+        query = query.where(where(table))
+
+    changed = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(query.where(table.c.id > last_id)).all()
+            if not rows:
+                return changed
+            last_id = rows[-1].id
+            changed += handle(connection, table, rows)
+        logger.info(f"Processed {table_name} up to id {last_id} ({changed} rows changed)")
+
+
+def backfill(engine: Engine, table_name: str, columns: Sequence[str],
+             transform: Callable[[Any], Optional[Dict[str, Any]]], where=None,
+             batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Заполняет колонки таблицы порциями (см. for_each_batch).
+
+    Args:
+        transform: Строка -> словарь новых значений или None, если строку менять не нужно
+
+    Returns:
+        int: Количество обновленных строк
+    """
+    def update_rows(connection: Connection, table: Table, rows: List[Any]) -> int:
+        changes = []
+        for row in rows:
+            values = transform(row)
+            if values:
+                changes.append({'row_id': row.id, **values})
+        if changes:
+            connection.execute(update(table).where(table.c.id == bindparam('row_id')), changes)
+        return len(changes)
+
+    return for_each_batch(engine, table_name, columns, update_rows, where=where, batch_size=batch_size)
+
+
+def _initial_schema(connection: Connection):
+    # Схема таблицы на момент появления миграций; дальнейшие изменения - отдельными миграциями
+    metadata = MetaData()
+    Table(
+        'resumes', metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('filename', String(255), nullable=False),
+        Column('content', Text, nullable=False),
+        Column('extracted_info', JSON),
+        Column('analysis_results', JSON),
+        Column('university', String(255)),
+        Column('speciality', String(255)),
+        Column('graduation_year', String(50)),
+        Column('education_score', Integer),
+        Column('skills', JSON),
+        Column('experience_years', Integer),
+        Column('total_score', Integer),
+        Column('upload_date', DateTime),
+        Column('last_modified', DateTime)
+    )
+    metadata.create_all(connection)
+
+
+def _add_scoring_version(connection: Connection):
+    # NULL означает, что запись нужно пересчитать (см. rescore.py)
+    add_column(connection, 'resumes', 'scoring_version', 'VARCHAR(64)')
+    create_index(connection, 'ix_resumes_scoring_version', 'resumes', ['scoring_version'])
+
+
+def _add_history_indexes(connection: Connection):
+    # Ключи постраничной выборки истории: (колонка сортировки, id)
+    create_index(connection, 'ix_resumes_upload_date_id', 'resumes', ['upload_date', 'id'])
+    create_index(connection, 'ix_resumes_total_score_id', 'resumes', ['total_score', 'id'])
+    create_index(connection, 'ix_resumes_education_score_id', 'resumes', ['education_score', 'id'])
+
+
+def _fill_missing_scores(engine: Engine):
+    # Сравнение ключей с NULL не работает, поэтому пустые оценки заменяются нулем
+    return backfill(
+        engine, 'resumes', ['total_score', 'education_score'],
+        lambda row: {'total_score': row.total_score or 0, 'education_score': row.education_score or 0},
+        where=lambda table: (table.c.total_score.is_(None)) | (table.c.education_score.is_(None))
+    )
+
+
+def _create_resume_skills(connection: Connection):
+    metadata = MetaData()
+    Table(
+        'resume_skills', metadata,
+        Column('resume_id', Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True),
+        Column('skill', String(255), primary_key=True)
+    )
+    Table('resumes', metadata, autoload_with=connection)
+    metadata.create_all(connection, tables=[metadata.tables['resume_skills']])
+    # Поиск по навыку отдает resume_id по убыванию прямо из индекса
+    create_index(connection, 'ix_resume_skills_skill_resume_id', 'resume_skills', ['skill', 'resume_id'])
+
+
+def _fill_resume_skills(engine: Engine):
+    catalog = SkillCatalog.load()
+
+    def index_skills(connection: Connection, table: Table, rows: List[Any]) -> int:
+        values = [{'resume_id': row.id, 'skill': skill}
+                  for row in rows for skill in catalog.canonicalize_all(resume_skill_names(row.skills))]
+        # Повторный запуск после прерывания не создает дубликатов
+        connection.execute(text('DELETE FROM resume_skills WHERE resume_id BETWEEN :first AND :last'),
+                           {'first': rows[0].id, 'last': rows[-1].id})
+        if values:
+            connection.execute(text('INSERT INTO resume_skills (resume_id, skill) VALUES (:resume_id, :skill)'),
+                               values)
+        return len(values)
+
+    return for_each_batch(engine, 'resumes', ['skills'], index_skills)
+
+
+def _create_fulltext_index(connection: Connection):
+    if connection.dialect.name == 'sqlite':
+        # Внешнее содержимое: FTS5 хранит только индекс, текст остается в resumes
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5("
+            "content, university, speciality, content='resumes', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN "
+            "INSERT INTO resumes_fts (rowid, content, university, speciality) "
+            "VALUES (new.id, new.content, new.university, new.speciality); END"
+        )
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN "
+            "INSERT INTO resumes_fts (resumes_fts, rowid, content, university, speciality) "
+            "VALUES ('delete', old.id, old.content, old.university, old.speciality); END"
+        )
+        connection.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF content, university, speciality "
+            "ON resumes BEGIN "
+            "INSERT INTO resumes_fts (resumes_fts, rowid, content, university, speciality) "
+            "VALUES ('delete', old.id, old.content, old.university, old.speciality); "
+            "INSERT INTO resumes_fts (rowid, content, university, speciality) "
+            "VALUES (new.id, new.content, new.university, new.speciality); END"
+        )
+        # Индекс по уже сохраненным резюме; rebuild идемпотентен
+        connection.exec_driver_sql("INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')")
+    elif connection.dialect.name == 'postgresql':
+        if not has_column(connection, 'resumes', 'search_vector'):
+            connection.exec_driver_sql(
+                "ALTER TABLE resumes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+                "to_tsvector('simple', coalesce(content, '') || ' ' || coalesce(university, '') || ' ' "
+                "|| coalesce(speciality, ''))) STORED"
+            )
+        connection.exec_driver_sql(
+            'CREATE INDEX IF NOT EXISTS ix_resumes_search_vector ON resumes USING GIN (search_vector)'
+        )
+    else:
+        logger.warning(f"Full-text search is not supported for {connection.dialect.name}")
+
+
+def _add_analysis_payload(connection: Connection):
+    ddl_type = 'BYTEA' if connection.dialect.name == 'postgresql' else 'BLOB'
+    add_column(connection, 'resumes', 'analysis_payload', ddl_type)
+
+
+def _decode_json_columns(engine: Engine):
+    # Раньше значения сериализовались json.dumps перед записью в JSON-колонки
+    # и хранились строкой внутри JSON; такие строки заменяются самими объектами
+    columns = ['extracted_info', 'analysis_results', 'skills']
+
+    def decode(row) -> Optional[Dict[str, Any]]:
+        values = {}
+        for name in columns:
+            value = getattr(row, name)
+            if isinstance(value, str):
+                try:
+                    values[name] = json.loads(value)
+                except ValueError:
+                    continue
+        return values or None
+
+    return backfill(engine, 'resumes', columns, decode)
+
+
+def _add_fingerprints(connection: Connection):
+    add_column(connection, 'resumes', 'content_hash', 'VARCHAR(64)')
+    add_column(connection, 'resumes', 'simhash', 'BIGINT')
+    create_index(connection, 'ux_resumes_content_hash', 'resumes', ['content_hash'], unique=True)
+    metadata = MetaData()
+    Table('resumes', metadata, autoload_with=connection)
+    Table(
+        'resume_simhash_bands', metadata,
+        Column('band', SmallInteger, primary_key=True, autoincrement=False),
+        Column('value', Integer, primary_key=True, autoincrement=False),
+        Column('resume_id', Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    )
+    Table(
+        'resume_uploads', metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('resume_id', Integer, ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False, index=True),
+        Column('filename', String(255)),
+        Column('file_hash', String(64), index=True),
+        Column('match', String(16), nullable=False),
+        Column('uploaded_at', DateTime)
+    )
+    metadata.create_all(connection, tables=[metadata.tables['resume_simhash_bands'],
+                                            metadata.tables['resume_uploads']])
+
+
+def _fill_fingerprints(engine: Engine):
+    # Из уже сохраненных дубликатов отпечаток получает только первая запись,
+    # иначе нарушится уникальность content_hash
+    def fingerprint(connection: Connection, table: Table, rows: List[Any]) -> int:
+        fingerprints = {row.id: Fingerprint.from_text(row.content) for row in rows}
+        hashes = {item.content_hash for item in fingerprints.values() if item is not None}
+        seen = set(connection.execute(select(table.c.content_hash).where(table.c.content_hash.in_(hashes)))
+                   .scalars()) if hashes else set()
+        changes, bands = [], []
+        for resume_id, item in fingerprints.items():
+            if item is None or item.content_hash in seen:
+                continue
+            seen.add(item.content_hash)
+            changes.append({'row_id': resume_id, 'content_hash': item.content_hash, 'simhash': item.simhash})
+            bands.extend({'band': band, 'value': value, 'resume_id': resume_id}
+                         for band, value in simhash_bands(item.simhash))
+        # Полосы пишутся в той же транзакции, что и content_hash: у строк без отпечатка их нет
+        if changes:
+            connection.execute(update(table).where(table.c.id == bindparam('row_id')), changes)
+            connection.execute(text('INSERT INTO resume_simhash_bands (band, value, resume_id) '
+                                    'VALUES (:band, :value, :resume_id)'), bands)
+        return len(changes)
+
+    return for_each_batch(engine, 'resumes', ['content'], fingerprint,
+                          where=lambda table: table.c.content_hash.is_(None))
+
+
+def _add_aggregates(connection: Connection):
+    add_column(connection, 'resumes', 'best_role', 'VARCHAR(64)')
+    metadata = MetaData()
+    Table(
+        'resume_aggregates', metadata,
+        Column('dimension', String(32), primary_key=True),
+        Column('name', String(255), primary_key=True),
+        Column('bucket', Integer, primary_key=True, autoincrement=False),
+        Column('resume_count', Integer, nullable=False)
+    )
+    metadata.create_all(connection)
+
+
+def _fill_best_role(engine: Engine):
+    backfill(
+        engine, 'resumes', ['analysis_results', 'analysis_payload'],
+        lambda row: {'best_role': best_role(decompress_json(row.analysis_payload) if row.analysis_payload
+                                            else json_value(row.analysis_results))},
+        where=lambda table: table.c.best_role.is_(None)
+    )
+
+
+def _no_schema_changes(connection: Connection):
+    pass
+
+
+def _shard_aggregates(connection: Connection):
+    add_column(connection, 'resumes', 'canonical_university', 'VARCHAR(255)')
+    # Счетчики выводятся из resumes, поэтому таблицу старого вида можно пересоздать
+    if inspect(connection).has_table('resume_aggregates') and \
+            not has_column(connection, 'resume_aggregates', 'shard'):
+        connection.exec_driver_sql('DROP TABLE resume_aggregates')
+    metadata = MetaData()
+    Table(
+        'resume_aggregates', metadata,
+        Column('dimension', String(32), primary_key=True),
+        Column('name', String(255), primary_key=True),
+        Column('bucket', Integer, primary_key=True, autoincrement=False),
+        Column('shard', SmallInteger, primary_key=True, autoincrement=False),
+        Column('resume_count', Integer, nullable=False)
+    )
+    metadata.create_all(connection)
+
+
+def _fill_aggregates(engine: Engine):
+    names = UniversityNames.load()
+    backfill(
+        engine, 'resumes', ['university'],
+        lambda row: {'canonical_university': names.canonicalize(row.university)},
+        where=lambda table: table.c.canonical_university.is_(None) & table.c.university.isnot(None)
+    )
+
+    # Сводка пересчитывается целиком, поэтому повторный запуск после прерывания безопасен
+    totals = Counter()
+
+    def count(connection: Connection, table: Table, rows: List[Any]) -> int:
+        skills = {}
+        for resume_id, skill in connection.execute(
+                text('SELECT resume_id, skill FROM resume_skills WHERE resume_id BETWEEN :first AND :last'),
+                {'first': rows[0].id, 'last': rows[-1].id}):
+            skills.setdefault(resume_id, []).append(skill)
+        for row in rows:
+            totals.update(aggregate_keys(row.id, row.total_score, row.upload_date, row.canonical_university,
+                                         row.best_role, skills.get(row.id, [])))
+        return len(rows)
+
+    for_each_batch(engine, 'resumes', ['total_score', 'upload_date', 'canonical_university', 'best_role'], count)
+    aggregates = Table('resume_aggregates', MetaData(), autoload_with=engine)
+    with engine.begin() as connection:
+        connection.execute(aggregates.delete())
+        apply_aggregates(connection, aggregates, totals)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'initial schema', _initial_schema),
+    Migration(2, 'resumes.scoring_version', _add_scoring_version),
+    Migration(3, 'history keyset indexes', _add_history_indexes, _fill_missing_scores),
+    Migration(4, 'resume_skills', _create_resume_skills, _fill_resume_skills),
+    Migration(5, 'full-text index', _create_fulltext_index),
+    Migration(6, 'native JSON columns and analysis_payload', _add_analysis_payload, _decode_json_columns),
+    Migration(7, 'resume fingerprints and uploads', _add_fingerprints, _fill_fingerprints),
+    Migration(8, 'resume_aggregates', _add_aggregates, _fill_best_role),
+    Migration(9, 'reindex skills without short aliases in text', _no_schema_changes, _fill_resume_skills),
+    Migration(10, 'sharded resume_aggregates and canonical_university', _shard_aggregates, _fill_aggregates)
+]
+
+
+def current_version(connection: Connection) -> int:
+    version = connection.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())
+                                 .limit(1)).scalar()
+    return version or 0
+
+
+def migrate(engine: Engine, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """
+    Применяет недостающие миграции по порядку версий.
+
+    Если схема актуальна, выполняется один запрос к schema_version.
+
+    Returns:
+        List[int]: Версии примененных миграций
+    """
+    migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda item: item.version)
+    schema_metadata.create_all(engine)
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    applied = []
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        started = time.monotonic()
+        logger.info(f"Applying migration {migration.version}: {migration.name}")
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+        if migration.backfill is not None:
+            migration.backfill(engine)
+        with engine.begin() as connection:
+            connection.execute(schema_version.insert().values(
+                version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+            ))
+        applied.append(migration.version)
+        logger.info(f"Migration {migration.version} applied in {time.monotonic() - started:.2f}s")
+    return applied
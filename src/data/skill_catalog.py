@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import re
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILLS_MATRIX = os.path.join('data', 'skills_matrix.yaml')
+# Длина колонки resume_skills.skill
+MAX_SKILL_LENGTH = 255
+# Более короткие алиасы (r, cv, bi) ищутся только как навык целиком, а не внутри текста:
+# иначе "R&D management" дает R, а "составление CV" - Computer Vision
+MIN_TEXT_ALIAS_LENGTH = 3
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_skill(text: str) -> str:
+    """Нижний регистр, схлопнутые пробелы, без знаков препинания по краям"""
+    return _WHITESPACE.sub(' ', str(text or '')).strip(' \t,.;:-–—•·').lower()
+
+
+def resume_skill_names(skills) -> List[str]:
+    """Навыки из колонки skills: required и additional (сертификаты не являются навыками)"""
+    if isinstance(skills, str):
+        try:
+            skills = json.loads(skills)
+        except ValueError:
+            return []
+    if isinstance(skills, list):
+        return [str(skill) for skill in skills if skill]
+    if not isinstance(skills, dict):
+        return []
+    return [str(skill) for key in ('required', 'additional') for skill in skills.get(key, []) or [] if skill]
+
+
+class SkillCatalog:
+    """
+    Канонические названия навыков из skills_matrix.yaml.
+
+    ``canonicalize`` сопоставляет навык из резюме с названиями матрицы:
+    сначала целиком по алиасу, затем по алиасам не короче
+    MIN_TEXT_ALIAS_LENGTH, встречающимся в тексте отдельными словами. Навыки вне матрицы сохраняются в нормализованном
+    виде, чтобы по ним тоже можно было искать.
+    """
+
+    def __init__(self, skills: Optional[Dict[str, List[str]]] = None):
+        # Алиас -> канонические названия (один алиас может относиться к нескольким навыкам)
+        self._aliases: Dict[str, List[str]] = {}
+        for name, aliases in (skills or {}).items():
+            for alias in [name] + list(aliases or []):
+                names = self._aliases.setdefault(normalize_skill(alias), [])
+                if name not in names:
+                    names.append(name)
+        self._pattern = None
+        text_aliases = [alias for alias in self._aliases if len(alias) >= MIN_TEXT_ALIAS_LENGTH]
+        if text_aliases:
+            alternatives = '|'.join(re.escape(alias) for alias in sorted(text_aliases, key=len, reverse=True))
+            self._pattern = re.compile(rf'(?<!\w)({alternatives})(?!\w)')
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SKILLS_MATRIX) -> 'SkillCatalog':
+        """Загружает матрицу навыков; без файла каталог пуст и навыки только нормализуются"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                matrix = yaml.safe_load(f).get('skills_matrix', {})
+        except Exception as e:
+            logger.error(f"Error loading skills matrix: {str(e)}")
+            return cls()
+
+        skills = {}
+        for category, groups in matrix.items():
+            if category == 'flags':
+                continue
+            for group in groups or []:
+                for skill in group.get('skills', []) or []:
+                    skills[skill['name']] = skill.get('aliases', [])
+        return cls(skills)
+
+    def canonicalize(self, skill: str) -> List[str]:
+        """Канонические названия для одного навыка из резюме"""
+        normalized = normalize_skill(skill)
+        if not normalized:
+            return []
+        if normalized in self._aliases:
+            return list(self._aliases[normalized])
+        if self._pattern is not None:
+            found = []
+            for match in self._pattern.finditer(normalized):
+                for name in self._aliases[match.group(1)]:
+                    if name not in found:
+                        found.append(name)
+            if found:
+                return found
+        return [normalized[:MAX_SKILL_LENGTH]]
+
+    def canonicalize_all(self, skills: Iterable[str]) -> List[str]:
+        """Канонические названия для списка навыков без повторов"""
+        result = []
+        for skill in skills:
+            for name in self.canonicalize(skill):
+                if name not in result:
+                    result.append(name)
+        return result
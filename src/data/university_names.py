@@ -0,0 +1,51 @@
+from typing import Optional
+import logging
+import os
+import re
+import yaml
+
+try:
+    from ..analysis.university_index import UniversityIndex
+except ImportError:  # пакет data импортирован верхнеуровневым из src/main.py
+    from analysis.university_index import UniversityIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UNIVERSITIES = os.path.join('data', 'universities.yaml')
+# Длина колонки resumes.canonical_university
+MAX_UNIVERSITY_LENGTH = 255
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class UniversityNames:
+    """
+    Официальные названия университетов для сводки по вузам.
+
+    Название из резюме ищется через UniversityIndex (полное название,
+    алиасы, аббревиатуры), поэтому "МГУ" и "MSU" считаются одним вузом.
+    Вузы вне справочника сохраняются со схлопнутыми пробелами.
+    """
+
+    def __init__(self, index: Optional[UniversityIndex] = None):
+        self.index = index
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_UNIVERSITIES) -> 'UniversityNames':
+        """Загружает справочник; без файла названия только нормализуются"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                universities = yaml.safe_load(f).get('universities', [])
+        except Exception as e:
+            logger.error(f"Error loading universities: {str(e)}")
+            return cls()
+        return cls(UniversityIndex(universities))
+
+    def canonicalize(self, university: Optional[str]) -> Optional[str]:
+        """Официальное название вуза или нормализованная строка; None для пустой строки"""
+        name = _WHITESPACE.sub(' ', str(university or '')).strip(' \t,.;')
+        if not name:
+            return None
+        if self.index is not None:
+            name = self.index.resolve_name(name) or name
+        return name[:MAX_UNIVERSITY_LENGTH]
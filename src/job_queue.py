@@ -0,0 +1,138 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """В очереди уже слишком много необработанных элементов"""
+
+
+class JobQueue:
+    """
+    Фоновая очередь пакетных задач.
+
+    Каждая задача состоит из набора элементов (например, загруженных файлов),
+    которые обрабатываются пулом потоков независимо друг от друга. Состояние
+    задачи и результаты по каждому элементу можно запрашивать по ID.
+    Хранится не больше ``max_jobs`` задач: при переполнении удаляются самые
+    старые завершенные, задачи в работе не удаляются никогда. Элементы
+    держат содержимое файлов в памяти, поэтому необработанных элементов
+    не может быть больше ``max_pending``.
+    """
+
+    def __init__(self, workers: int = 4, max_jobs: int = 100, max_pending: int = 1000):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job-worker')
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, items: List[Dict[str, Any]], process: Callable[[Dict[str, Any]], Any],
+               cleanup: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Ставит элементы в очередь и сразу возвращает ID задачи.
+
+        Args:
+            items (List[Dict[str, Any]]): Элементы задачи, у каждого есть ключ 'name'
+            process: Функция обработки одного элемента, возвращает его результат
+            cleanup: Функция, вызываемая для элемента после обработки в любом случае
+            
+        Raises:
+            QueueFullError: Вместе с новыми элементами необработанных стало бы больше max_pending
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'created_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'total': len(items),
+            'completed': 0,
+            'failed': 0,
+            'items': [
+                {'name': item.get('name'), 'status': 'queued', 'result': None, 'error': None}
+                for item in items
+            ]
+        }
+        with self._lock:
+            if self._pending + len(items) > self.max_pending:
+                raise QueueFullError(f"Too many pending items ({self._pending}), maximum is {self.max_pending}")
+            self._pending += len(items)
+            self._jobs[job_id] = job
+            self._evict_finished()
+
+        if not items:
+            self._finish_if_done(job)
+        for index, item in enumerate(items):
+            self.executor.submit(self._run_item, job, index, item, process, cleanup)
+
+        logger.info(f"Job {job_id} queued with {len(items)} items")
+        return job_id
+
+    def _evict_finished(self):
+        # Вызывается под self._lock; задачи в работе остаются, даже если их больше max_jobs
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] == 'finished'][:excess]
+        for job_id in finished:
+            del self._jobs[job_id]
+
+    @property
+    def pending(self) -> int:
+        """Число элементов, которые еще не обработаны"""
+        with self._lock:
+            return self._pending
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает копию состояния задачи или None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot['items'] = [dict(item) for item in job['items']]
+            return snapshot
+
+    def _run_item(self, job: Dict[str, Any], index: int, item: Dict[str, Any],
+                  process: Callable[[Dict[str, Any]], Any],
+                  cleanup: Optional[Callable[[Dict[str, Any]], None]]):
+        with self._lock:
+            job['status'] = 'running'
+            job['items'][index]['status'] = 'running'
+
+        try:
+            result = process(item)
+            with self._lock:
+                job['items'][index].update(status='done', result=result)
+                job['completed'] += 1
+        except Exception as e:
+            logger.error(f"Job {job['id']} item {item.get('name')} failed: {str(e)}")
+            with self._lock:
+                job['items'][index].update(status='failed', error=str(e))
+                job['failed'] += 1
+        finally:
+            if cleanup:
+                try:
+                    cleanup(item)
+                except Exception as e:
+                    logger.error(f"Error cleaning up job item {item.get('name')}: {str(e)}")
+            with self._lock:
+                self._pending -= 1
+            self._finish_if_done(job)
+
+    def _finish_if_done(self, job: Dict[str, Any]):
+        with self._lock:
+            if job['completed'] + job['failed'] == job['total']:
+                job['status'] = 'finished'
+                job['finished_at'] = datetime.utcnow().isoformat()
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -1,10 +1,19 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from analysis.resume_parser import ResumeParser
+from analysis.parse_cache import ParseCache
+from analysis.llm_backends import create_backend
+from analysis.http_client import create_http_client
 from analysis.competency_analyzer import CompetencyAnalyzer
 from analysis.file_parser import FileParser
+from analysis.pdf_text import read_source
 from analysis.input_validator import InputValidator
 from data.database import Database
+from data.fingerprint import file_hash
+from data.bulk_writer import BulkWriter
+from rescore import DEFAULT_CHUNK_SIZE, check_chunk_size, rescore_resumes
+from job_queue import JobQueue, QueueFullError
+from upload_limits import BatchLimitError, UploadLimits
 import os
 import logging
 from dotenv import load_dotenv
@@ -13,6 +22,9 @@ from werkzeug.utils import secure_filename
 from datetime import datetime
 import json
 import time
+import threading
+import zipfile
+import yaml
 from tempfile import gettempprefix
 
 # Настройка логирования
@@ -32,20 +44,51 @@ app = Flask(__name__,
 
 CORS(app)
 
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
 
+# Загрузка конфигурации
+with open('config.yaml', encoding='utf-8') as config_file:
+    config = yaml.safe_load(config_file) or {}
+jobs_config = config.get('jobs', {})
+
+# Потолок запроса - max_batch_mb; загрузки одного файла ограничены max_file_mb
+upload_limits = UploadLimits(jobs_config)
+upload_limits.configure(app)
+cache_config = config.get('parse_cache', {})
+llm_config = config.get('llm', {})
+
 # Инициализация компонентов
 try:
     api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
+    if llm_config.get('backend', 'remote') == 'remote' and not api_key:
         raise ValueError("OPENAI_API_KEY не найден в переменных окружения")
     
-    parser = ResumeParser(api_key=api_key)
+    parse_cache = ParseCache(
+        cache_dir=cache_config.get('dir', 'cache'),
+        ttl=cache_config.get('ttl_days', 30) * 24 * 3600,
+        max_bytes=cache_config.get('max_mb', 256) * 1024 * 1024,
+        memory_entries=cache_config.get('memory_entries', 256)
+    )
+    # Один пул соединений на все обращения к LLM
+    http_client = create_http_client(llm_config)
+    parser = ResumeParser(
+        backend=create_backend(llm_config, api_key=api_key, http_client=http_client),
+        cache=parse_cache,
+        max_concurrency=llm_config.get('max_concurrency', 5),
+        requests_per_second=llm_config.get('requests_per_second'),
+        max_retries=llm_config.get('max_retries', 4)
+    )
     analyzer = CompetencyAnalyzer()
-    file_parser = FileParser(api_key=api_key)
+    file_parser = FileParser(api_key=api_key, parser=parser)
     input_validator = InputValidator()
     db = Database('config.yaml')
+    # Результаты пакетной загрузки пишутся порциями, а не транзакцией на файл
+    bulk_writer = BulkWriter(db, flush_interval=jobs_config.get('flush_interval', 0.5))
+    job_queue = JobQueue(
+        workers=jobs_config.get('workers', 4),
+        max_jobs=jobs_config.get('max_jobs', 100),
+        max_pending=jobs_config.get('max_pending', 1000)
+    )
     logger.info("Все компоненты успешно инициализированы")
 except Exception as e:
     logger.error(f"Ошибка при инициализации компонентов: {e}")
@@ -53,6 +96,15 @@ except Exception as e:
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
 
+# Состояние фонового пересчета оценок
+rescore_state = {'status': 'idle'}
+rescore_lock = threading.Lock()
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Освобождает сессию базы данных потока после запроса"""
+    db.remove_session()
+
 def allowed_file(filename):
     """Проверяет допустимость расширения файла"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -72,8 +124,8 @@ def read_file_content(file) -> str:
     # Если не удалось определить кодировку, используем latin1
     return content.decode('latin1')
 
-def save_temp_file(file) -> str:
-    """Сохраняет файл во временную директорию"""
+def upload_filename(file) -> str:
+    """Возвращает безопасное имя загруженного файла с расширением"""
     # Получаем оригинальное имя файла
     filename = secure_filename(file.filename)
     logger.info(f"Original filename: {filename}")
@@ -83,23 +135,116 @@ def save_temp_file(file) -> str:
         filename += '.pdf'
         logger.info(f"Added default extension, new filename: {filename}")
     
-    # Получаем расширение файла
-    file_ext = os.path.splitext(filename)[1]
-    logger.info(f"File extension: {file_ext}")
+    return filename
+
+def process_resume(content, filename: str, background: bool = False):
+    """Извлекает данные из содержимого файла, анализирует их и сохраняет результат"""
+    content = read_source(content)
+    upload_hash = file_hash(content) if not isinstance(content, str) else None
+    # Тот же файл уже разобран: ответ из базы без извлечения текста и LLM
+    existing = existing_analysis(db.find_duplicate(file_hash=upload_hash), filename, upload_hash)
+    if existing is not None:
+        return existing
+    
+    # Текст сохраняется вместе с анализом для полнотекстового поиска
+    try:
+        filename, text = file_parser.extract_text(content, filename)
+    except Exception as e:
+        logger.error(f"Error extracting text from {filename}: {str(e)}")
+        return None
+    existing = existing_analysis(db.find_duplicate(text=text), filename, upload_hash)
+    if existing is not None:
+        return existing
+    parsed_data = parser.parse_resume(text, filename)
+    if not parsed_data:
+        return None
+    return analyze_and_save(parsed_data, filename, text, upload_hash, background=background)
+
+def existing_analysis(duplicate, filename: str, upload_hash):
+    """Связывает повторную загрузку с сохраненным резюме и возвращает его анализ"""
+    if duplicate is None:
+        return None
+    resume = db.get_resume(duplicate['resume_id'])
+    if resume is None:
+        return None
+    logger.info(f"{filename} is a {duplicate['match']} duplicate of resume {duplicate['resume_id']}")
+    db.record_upload(duplicate['resume_id'], filename, upload_hash, duplicate['match'])
+    result = dict(resume['analysis_results'] or {})
+    result['duplicate'] = duplicate
+    return result
+
+def analyze_and_save(parsed_data: dict, filename: str, text: str = '', upload_hash: str = None,
+                     background: bool = False):
+    """
+    Анализирует извлеченные данные и сохраняет результат.
+    
+    С background=True запись передается bulk_writer и сохраняется порцией
+    вместе с файлами пакета, которые обрабатывают другие потоки JobQueue;
+    функция ждет записи своей порции и выбрасывает ValueError, если
+    анализ не сохранился, чтобы элемент пакета считался неудачным.
+    """
+    # Анализируем данные
+    analysis_result = analyzer.analyze_candidate(parsed_data)
     
-    # Создаем временное имя файла
-    temp_filename = f"resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_ext}"
-    temp_path = os.path.join(os.environ.get('TEMP', '/tmp'), temp_filename)
+    # Сохраняем результаты в базу данных
+    logger.info(f"Saving analysis for file: {filename}")
+    item = {
+        'extracted_info': parsed_data,
+        'analysis_result': analysis_result,
+        'scoring_version': analyzer.scoring_version,
+        'filename': filename,
+        'content': text
+    }
+    if background:
+        if not link_upload(bulk_writer.submit(item).result(), filename, text, upload_hash):
+            raise ValueError('Failed to save analysis')
+    else:
+        link_upload(db.save_analysis(**item), filename, text, upload_hash)
     
-    # Сохраняем файл
-    file.save(temp_path)
-    logger.info(f"File saved to {temp_path}")
+    # Возвращаем результат
+    logger.info(f"Analysis result: {analysis_result}")
+    return analysis_result
+
+def link_upload(resume_id, filename: str, text: str, upload_hash) -> bool:
+    """
+    Записывает загрузку для сохраненного резюме.
     
-    return temp_path
+    Returns:
+        bool: False, если анализ не сохранен ни этой записью, ни параллельным запросом
+    """
+    match = 'new'
+    if resume_id is None:
+        # Тот же текст мог сохранить параллельный запрос (уникальный content_hash)
+        try:
+            duplicate = db.find_duplicate(text=text)
+        except Exception as e:
+            logger.error(f"Error looking up saved analysis of {filename}: {str(e)}")
+            return False
+        if duplicate is None:
+            return False
+        resume_id, match = duplicate['resume_id'], duplicate['match']
+    try:
+        db.record_upload(resume_id, filename, upload_hash, match)
+    except Exception as e:
+        # Анализ сохранен, потеряна только запись о загрузке
+        logger.error(f"Error recording upload of {filename} for resume {resume_id}: {str(e)}")
+    return True
+
+def process_batch_item(item: dict):
+    """Обрабатывает один файл пакетной загрузки"""
+    analysis_result = process_resume(item['content'], item['name'], background=True)
+    if analysis_result is None:
+        raise ValueError('Failed to parse resume')
+    return analysis_result
+
+def release_batch_item(item: dict):
+    """Освобождает сессию базы данных потока очереди после обработки файла"""
+    db.remove_session()
 
 @app.route('/api/upload', methods=['POST'])
 def upload_resume():
     """Обрабатывает загрузку резюме"""
+    upload_limits.limit_single_file(request)
     try:
         # Проверяем наличие файла в запросе
         if 'resume' not in request.files:
@@ -112,51 +257,232 @@ def upload_resume():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type'}), 400
             
-        # Сохраняем файл
-        temp_path = save_temp_file(file)
-        
-        try:
-            # Извлекаем информацию из файла
-            parsed_data = file_parser.parse_file(temp_path)
-            if not parsed_data:
-                return jsonify({'error': 'Failed to parse resume'}), 400
+        # Разбираем файл прямо из потока запроса, без временного файла
+        analysis_result = process_resume(file.stream, upload_filename(file))
+        if analysis_result is None:
+            return jsonify({'error': 'Failed to parse resume'}), 400
+        return jsonify(analysis_result)
                 
-            # Анализируем данные
-            analysis_result = analyzer.analyze_candidate(parsed_data)
+    except Exception as e:
+        logger.error(f"Error processing upload: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/upload/stream', methods=['POST'])
+def upload_resume_stream():
+    """
+    Обрабатывает загрузку резюме и отдает оценки секций по мере разбора.
+    
+    Ответ в формате NDJSON: строка {"section", "score"} на каждую готовую
+    секцию и последняя строка {"result": ...} с полным анализом.
+    """
+    upload_limits.limit_single_file(request)
+    try:
+        if 'resume' not in request.files:
+            return jsonify({'error': 'No file part'}), 400
             
-            # Сохраняем результаты в базу данных
-            logger.info(f"Saving analysis for file: {os.path.basename(temp_path)}")
-            db.save_analysis(
-                extracted_info=parsed_data,
-                analysis_result=analysis_result
-            )
+        file = request.files['resume']
+        if file.filename == '':
+            return jsonify({'error': 'No selected file'}), 400
             
-            # Возвращаем результат
-            logger.info(f"Analysis result: {analysis_result}")
-            return jsonify(analysis_result)
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type'}), 400
             
-        finally:
-            # Удаляем временный файл
-            try:
-                os.remove(temp_path)
-                logger.info(f"Successfully deleted temporary file: {temp_path}")
-            except Exception as e:
-                logger.error(f"Error deleting temporary file: {str(e)}")
-                
+        # Текст извлекается до начала ответа, чтобы ошибки файла вернулись кодом 400
+        filename = upload_filename(file)
+        content = file.read()
+        upload_hash = file_hash(content)
+        existing = existing_analysis(db.find_duplicate(file_hash=upload_hash), filename, upload_hash)
+        if existing is None:
+            filename, text = file_parser.extract_text(content, filename)
+            existing = existing_analysis(db.find_duplicate(text=text), filename, upload_hash)
+        if existing is not None:
+            return Response(json.dumps({'result': existing}, ensure_ascii=False) + '\n',
+                            mimetype='application/x-ndjson')
+        sections = parser.parse_resume_stream(text, filename)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error processing upload: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+    def generate():
+        # Генератор выполняется после teardown_appcontext, поэтому сессию,
+        # открытую при сохранении, освобождаем здесь
+        try:
+            parsed_data = {}
+            for section, data in sections:
+                parsed_data[section] = data
+                score = analyzer.score_section(section, data)
+                yield json.dumps({'section': section, 'score': round(score, 1)}, ensure_ascii=False) + '\n'
+            if not parsed_data:
+                yield json.dumps({'error': 'Failed to parse resume'}) + '\n'
+                return
+            result = analyze_and_save(parsed_data, filename, text, upload_hash)
+            yield json.dumps({'result': result}, ensure_ascii=False) + '\n'
+        finally:
+            db.remove_session()
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Возвращает статистику кэша разбора резюме"""
+    return jsonify(parse_cache.stats())
+
+@app.route('/api/llm/stats', methods=['GET'])
+def get_llm_stats():
+    """Возвращает метрики соединений с LLM и статистику способов извлечения"""
+    return jsonify({'http': http_client.stats(), 'extraction': dict(parser.extraction_stats)})
+
+@app.route('/api/upload/batch', methods=['POST'])
+def upload_batch():
+    """Принимает несколько резюме (или zip-архив) и ставит их в очередь обработки"""
+    try:
+        files = request.files.getlist('resumes') or request.files.getlist('resume')
+        if not files:
+            return jsonify({'error': 'No file part'}), 400
+            
+        items = upload_limits.collect_batch_items(files, allowed_file)
+        if not items:
+            return jsonify({'error': 'No supported files'}), 400
+            
+        job_id = job_queue.submit(items, process_batch_item, cleanup=release_batch_item)
+        return jsonify({'job_id': job_id, 'total': len(items), 'status_url': f'/api/jobs/{job_id}'}), 202
+        
+    except BatchLimitError as e:
+        return jsonify({'error': str(e)}), e.status
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '30'}
+    except zipfile.BadZipFile:
+        return jsonify({'error': 'Invalid zip archive'}), 400
+    except Exception as e:
+        logger.error(f"Error processing batch upload: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Возвращает прогресс и результаты пакетной задачи"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
-    """Возвращает историю анализов"""
+    """
+    Возвращает страницу истории анализов.
+    
+    Параметры: limit, cursor (next_cursor предыдущей страницы),
+    sort (upload_date, total_score, education_score), order (asc, desc)
+    и fields - список полей через запятую.
+    """
     try:
-        history = db.get_history()
+        fields = request.args.get('fields')
+        history = db.get_history(
+            limit=int(request.args.get('limit', 50)),
+            cursor=request.args.get('cursor'),
+            sort=request.args.get('sort', 'upload_date'),
+            order=request.args.get('order', 'desc'),
+            fields=fields.split(',') if fields else None
+        )
         return jsonify(history)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error getting history: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Сводка для дашборда рекрутера: гистограмма total_score, распределение
+    по ролям и месяцам загрузки, топ вузов и навыков. Параметр top - размер топов.
+    """
+    try:
+        return jsonify(db.get_stats(top=int(request.args.get('top', 20))))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting stats: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def optional_int(name: str):
+    """Целочисленный параметр запроса или None, если он не задан"""
+    value = request.args.get(name)
+    return int(value) if value not in (None, '') else None
+
+@app.route('/api/search', methods=['GET'])
+def search_candidates():
+    """
+    Поиск кандидатов.
+    
+    Параметры: skills - навыки через запятую (нужны все, алиасы из матрицы
+    навыков допускаются), q - слова из текста резюме, min_total_score,
+    min_education_score, min_experience_years, limit и cursor.
+    """
+    try:
+        skills = request.args.get('skills')
+        result = db.search(
+            skills=[skill for skill in skills.split(',') if skill.strip()] if skills else None,
+            text_query=request.args.get('q'),
+            min_total_score=optional_int('min_total_score'),
+            min_education_score=optional_int('min_education_score'),
+            min_experience_years=optional_int('min_experience_years'),
+            limit=int(request.args.get('limit', 50)),
+            cursor=request.args.get('cursor')
+        )
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error searching candidates: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def run_rescore(chunk_size: int):
+    """Выполняет пересчет оценок в фоновом потоке"""
+    def update_progress(stats):
+        with rescore_lock:
+            rescore_state.update(stats)
+
+    try:
+        stats = rescore_resumes(db, analyzer, chunk_size=chunk_size, progress=update_progress)
+        with rescore_lock:
+            rescore_state.update(stats)
+            rescore_state['status'] = 'finished'
+    except Exception as e:
+        logger.error(f"Error rescoring resumes: {str(e)}")
+        with rescore_lock:
+            rescore_state['status'] = 'failed'
+            rescore_state['error'] = str(e)
+
+@app.route('/api/rescore', methods=['POST'])
+def start_rescore():
+    """Запускает пересчет оценок сохраненных резюме"""
+    try:
+        chunk_size = check_chunk_size(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid chunk_size: {str(e)}'}), 400
+
+    with rescore_lock:
+        if rescore_state.get('status') == 'running':
+            return jsonify(rescore_state), 409
+        rescore_state.clear()
+        rescore_state.update({
+            'status': 'running',
+            'scoring_version': analyzer.scoring_version,
+            'started_at': datetime.utcnow().isoformat()
+        })
+        state = dict(rescore_state)
+
+    threading.Thread(target=run_rescore, args=(chunk_size,), daemon=True).start()
+    return jsonify(state), 202
+
+@app.route('/api/rescore', methods=['GET'])
+def get_rescore_status():
+    """Возвращает состояние пересчета оценок"""
+    with rescore_lock:
+        return jsonify(dict(rescore_state))
+
 @app.route('/')
 def serve_frontend():
     """Отдаем главную страницу"""
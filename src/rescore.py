@@ -0,0 +1,140 @@
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+# Порция читается в память целиком, поэтому ее размер ограничен сверху
+MAX_CHUNK_SIZE = 5000
+
+
+def check_chunk_size(chunk_size: Any) -> int:
+    """
+    Проверяет размер порции пересчета.
+
+    Returns:
+        int: Размер порции, уменьшенный до MAX_CHUNK_SIZE
+
+    Raises:
+        ValueError: Размер не число или меньше 1
+    """
+    chunk_size = int(chunk_size)
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    return min(chunk_size, MAX_CHUNK_SIZE)
+
+
+def _chunk_size_argument(value: str) -> int:
+    try:
+        return check_chunk_size(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def rescore_resumes(db, analyzer, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Пересчитывает оценки сохраненных резюме по extracted_info без обращения к LLM.
+
+    Записи читаются порциями по ``chunk_size``, оцениваются пакетно и
+    обновляются одной транзакцией на порцию вместе с версией модели оценки.
+    Уже пересчитанные записи имеют текущую версию и пропускаются, поэтому
+    прерванный пересчет при повторном запуске продолжается с места остановки.
+
+    Args:
+        db: Экземпляр Database
+        analyzer: Экземпляр CompetencyAnalyzer
+        chunk_size (int): Размер порции (см. check_chunk_size)
+        progress: Необязательный обработчик, получающий статистику после каждой порции
+
+    Returns:
+        Dict[str, Any]: Статистика пересчета
+    """
+    chunk_size = check_chunk_size(chunk_size)
+    scoring_version = analyzer.scoring_version
+    stats = {
+        'scoring_version': scoring_version,
+        'processed': 0,
+        'updated': 0,
+        'failed': 0,
+        'last_id': None
+    }
+    started = time.monotonic()
+    logger.info(f"Rescoring resumes with scoring version {scoring_version}")
+
+    for chunk in db.iter_unscored(scoring_version, chunk_size):
+        ids = []
+        candidates = []
+        for resume_id, extracted_info in chunk:
+            # Старые записи хранят extracted_info строкой JSON
+            if isinstance(extracted_info, str):
+                try:
+                    extracted_info = json.loads(extracted_info)
+                except json.JSONDecodeError:
+                    extracted_info = None
+            if not isinstance(extracted_info, dict):
+                stats['failed'] += 1
+                continue
+            ids.append(resume_id)
+            candidates.append(extracted_info)
+
+        updates = []
+        now = datetime.utcnow()
+        for resume_id, result in zip(ids, analyzer.analyze_candidates_batch(candidates)):
+            if result.get('status') != 'success':
+                stats['failed'] += 1
+                continue
+            total_score, education_score = db.extract_scores(result)
+            updates.append({
+                'id': resume_id,
+                'analysis_results': result,
+                'total_score': total_score,
+                'education_score': education_score,
+                'scoring_version': scoring_version,
+                'last_modified': now
+            })
+
+        stats['updated'] += db.update_scores_bulk(updates)
+        stats['processed'] += len(chunk)
+        stats['last_id'] = chunk[-1][0]
+        if progress:
+            progress(dict(stats))
+
+    stats['elapsed_seconds'] = round(time.monotonic() - started, 2)
+    logger.info(f"Rescoring finished: {stats}")
+    return stats
+
+
+def main():
+    from analysis.competency_analyzer import CompetencyAnalyzer
+    from data.database import Database
+
+    parser = argparse.ArgumentParser(description='Пересчет оценок сохраненных резюме без обращения к LLM')
+    parser.add_argument('--config', default='config.yaml', help='Путь к config.yaml')
+    parser.add_argument('--chunk-size', type=_chunk_size_argument, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Размер порции записей (от 1 до {MAX_CHUNK_SIZE})')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    db = Database(args.config)
+    stats = rescore_resumes(
+        db,
+        CompetencyAnalyzer(),
+        chunk_size=args.chunk_size,
+        progress=lambda current: logger.info(
+            f"Processed {current['processed']} resumes (last id {current['last_id']})"
+        )
+    )
+    print(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import logging
+import os
+import zipfile
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Tuple
+from flask import Flask, Request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_FILES = 200
+DEFAULT_MAX_FILE_MB = 16
+DEFAULT_MAX_BATCH_MB = 128
+# Запас на заголовки multipart поверх размера самих файлов
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+class InMemoryRequest(Request):
+    """Держит загружаемые файлы в памяти вместо временных файлов Werkzeug"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Размер запроса ограничен max_content_length (см. UploadLimits)
+        return BytesIO()
+
+
+class BatchLimitError(ValueError):
+    """Пакет превышает ограничения; status - HTTP-код ответа"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class UploadLimits:
+    """
+    Ограничения размера загрузок из секции ``jobs`` config.yaml.
+
+    MAX_CONTENT_LENGTH приложения - потолок пакетной загрузки (max_batch_mb),
+    иначе Flask отклонил бы пакет раньше, чем до него дойдет проверка.
+    Загрузки одного файла понижают потолок своего запроса до max_file_mb
+    через ``limit_single_file``.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.max_files = config.get('max_files', DEFAULT_MAX_FILES)
+        self.max_file_bytes = config.get('max_file_mb', DEFAULT_MAX_FILE_MB) * 1024 * 1024
+        self.max_batch_bytes = config.get('max_batch_mb', DEFAULT_MAX_BATCH_MB) * 1024 * 1024
+
+    def configure(self, app: Flask):
+        """Держит загрузки в памяти и ограничивает запросы потолком пакета"""
+        app.request_class = InMemoryRequest
+        app.config['MAX_CONTENT_LENGTH'] = self.max_batch_bytes + MULTIPART_OVERHEAD
+
+    def limit_single_file(self, request: Request):
+        """
+        Понижает потолок запроса с одним файлом до max_file_mb.
+
+        Вызывается до обращения к request.files и вне try/except Exception
+        обработчика, чтобы клиент получил 413, а не 500.
+
+        Raises:
+            RequestEntityTooLarge: Заявленный Content-Length больше потолка
+        """
+        request.max_content_length = self.max_file_bytes + MULTIPART_OVERHEAD
+        if request.content_length is not None and request.content_length > request.max_content_length:
+            raise RequestEntityTooLarge()
+
+    def check(self, sizes: List[Tuple[str, int]]):
+        """
+        Проверяет число файлов пакета и их распакованный размер.
+
+        Args:
+            sizes (List[Tuple[str, int]]): Пары (имя файла, размер в байтах) всех файлов пакета
+
+        Raises:
+            BatchLimitError: Слишком много файлов (400) или слишком большой файл либо пакет (413)
+        """
+        if len(sizes) > self.max_files:
+            raise BatchLimitError(f'Too many files, maximum is {self.max_files}')
+        for name, size in sizes:
+            if size > self.max_file_bytes:
+                raise BatchLimitError(f'{name} is larger than {self.max_file_bytes // 1024 // 1024} MB', 413)
+        if sum(size for _, size in sizes) > self.max_batch_bytes:
+            raise BatchLimitError(f'Batch is larger than {self.max_batch_bytes // 1024 // 1024} MB', 413)
+
+    def collect_batch_items(self, files, allowed_file: Callable[[str], bool]) -> List[Dict[str, Any]]:
+        """
+        Раскладывает загруженные файлы и zip-архивы на отдельные резюме в памяти.
+
+        Файлы архивов распаковываются только после проверки ограничений по
+        заголовкам (zipfile не читает больше заявленного file_size), поэтому
+        zip-бомба отклоняется до выделения памяти.
+        """
+        items = []
+        sizes = []
+        for file in files:
+            filename = secure_filename(file.filename or '')
+            if filename.lower().endswith('.zip'):
+                with zipfile.ZipFile(file.stream) as archive:
+                    members = [member for member in archive.infolist()
+                               if not member.is_dir() and allowed_file(os.path.basename(member.filename))]
+                    sizes.extend((os.path.basename(member.filename), member.file_size) for member in members)
+                    self.check(sizes)
+                    for member in members:
+                        items.append({'name': os.path.basename(member.filename), 'content': archive.read(member)})
+            elif allowed_file(filename):
+                content = file.read()
+                sizes.append((filename, len(content)))
+                self.check(sizes)
+                items.append({'name': filename, 'content': content})
+        return items
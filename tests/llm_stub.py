@@ -0,0 +1,126 @@
+"""Локальный заглушечный сервер, имитирующий OpenAI-совместимый API api.rockapi.ru"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESUME_MARKER = 'Текст резюме:\n'
+
+
+def default_answer(prompt):
+    """Возвращает извлеченные данные, в которых записан исходный текст резюме"""
+    text = prompt.split(RESUME_MARKER, 1)[-1]
+    return json.dumps({
+        'education': [],
+        'experience': [],
+        'skills': {'required': [text], 'additional': [], 'certifications': []},
+        'languages': []
+    }, ensure_ascii=False)
+
+
+class StubLLMServer:
+    """
+    Сервер отвечает на POST /v1/chat/completions.
+
+    Args:
+        failures (int): Сколько первых запросов получат ответ ``failure_status``
+        failure_status (int): HTTP-статус ошибочных ответов
+        delay (float): Задержка ответа в секундах
+        answer: Функция prompt -> содержимое ответа модели
+    """
+
+    def __init__(self, failures=0, failure_status=429, delay=0.0, answer=default_answer):
+        self.failures = failures
+        self.failure_status = failure_status
+        self.delay = delay
+        self.answer = answer
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                with stub._lock:
+                    stub.requests.append(body)
+                    number = len(stub.requests)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    time.sleep(stub.delay)
+                    if number <= stub.failures:
+                        self._send(stub.failure_status, {'error': {'message': 'stub failure', 'type': 'stub'}})
+                        return
+                    prompt = body['messages'][-1]['content']
+                    if body.get('stream'):
+                        self._send_stream(number, body, stub.answer(prompt))
+                        return
+                    self._send(200, {
+                        'id': f'chatcmpl-{number}',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': body.get('model', 'stub'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': stub.answer(prompt)},
+                            'finish_reason': 'stop'
+                        }],
+                        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+                    })
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _send(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, number, body, content, chunk_size=16):
+                # Server-sent events в формате chat.completion.chunk
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                for start in range(0, len(content), chunk_size):
+                    chunk = {
+                        'id': f'chatcmpl-{number}',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': body.get('model', 'stub'),
+                        'choices': [{'index': 0, 'delta': {'content': content[start:start + chunk_size]},
+                                     'finish_reason': None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
@@ -1,6 +1,12 @@
+import os
+import shutil
+import tempfile
 import unittest
 from src.analysis.competency_analyzer import CompetencyAnalyzer
 from src.analysis.market_analyzer import MarketAnalyzer
+from src.analysis.alias_matcher import AliasMatcher
+from src.analysis.university_index import UniversityIndex
+from src.analysis.reference_data import ReferenceData, ReferenceDataRegistry, get_reference_data
 
 class TestCompetencyAnalyzer(unittest.TestCase):
     def setUp(self):
@@ -20,5 +26,180 @@ class TestMarketAnalyzer(unittest.TestCase):
         result = self.analyzer.analyze_market_demand(candidate_skills)
         self.assertEqual(result, expected_market_insights)
 
+SAMPLE_CANDIDATES = [
+    {
+        'education': [
+            {'degree': 'master', 'institution': 'МФТИ', 'start_date': '2012-09-01', 'end_date': '2014-06-30'},
+            {'degree': 'bachelor', 'institution': 'Колледж', 'end_date': '2012-06-30'}
+        ],
+        'experience': [
+            {'company': 'Яндекс', 'position': 'Senior Data Scientist', 'start_date': '2015-03-01',
+             'end_date': '2020-02-01', 'description': 'machine learning, a/b tests'},
+            {'company': 'ООО Ромашка', 'position': 'Аналитик данных', 'start_date': '2020-03-01',
+             'end_date': '2023-06-30', 'description': 'sql отчеты'}
+        ],
+        'skills': {'required': ['Python', 'SQL', 'Spark'], 'additional': ['Docker'], 'certifications': ['AWS']},
+        'languages': [{'language': 'English', 'level': 'fluent'}, {'language': 'Русский', 'level': 'native'}]
+    },
+    {
+        'education': [],
+        'experience': [{'company': 'Startup', 'position': 'Junior analyst', 'start_date': '2022-01-01',
+                        'end_date': '2022-12-31', 'description': ''}],
+        'skills': {'required': ['excel']},
+        'languages': []
+    },
+    {}
+]
+
+class TestBatchScoring(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = CompetencyAnalyzer()
+
+    def test_batch_matches_single_candidate_analysis(self):
+        batch = self.analyzer.analyze_candidates_batch(SAMPLE_CANDIDATES)
+        single = [self.analyzer.analyze_candidate(candidate) for candidate in SAMPLE_CANDIDATES]
+        self.assertEqual(batch, single)
+
+    def test_role_weight_change_is_applied(self):
+        self.analyzer.role_weights['data_scientist'] = {'education': 0.0, 'experience': 0.0, 'skills': 0.0, 'languages': 1.0}
+        result = self.analyzer.analyze_candidates_batch(SAMPLE_CANDIDATES[:1])[0]
+        self.assertEqual(result['role_fit']['all_roles']['data_scientist'], result['overall_score']['details']['languages'])
+
+    def test_batch_matches_single_with_custom_weights(self):
+        """Пакетный и поштучный расчет читают одни и те же таблицы весов"""
+        default = self.analyzer.analyze_candidate(SAMPLE_CANDIDATES[0])
+        self.analyzer.education_weights.update({'degree_share': 0.5, 'university_share': 0.5})
+        self.analyzer.experience_weights.update({'position_share': 0.6, 'company_share': 0.2,
+                                                 'tasks_share': 0.2, 'unmatched_score': 0.3,
+                                                 'years_multiplier': 0.05, 'relevant_experience_multiplier': 1.0})
+        self.analyzer.skills_weights['categories'] = {'required': 2.0, 'additional': 0.5, 'certifications': 1.5}
+        self.analyzer.skills_weights['max_counts'] = {'required': 4, 'additional': 3, 'certifications': 2}
+        self.analyzer.skills_weights['scale'] = 15
+        self.analyzer.languages_weights['levels'] = {'native': 0.5, 'fluent': 1.5, 'advanced': 1.0,
+                                                     'intermediate': 0.7, 'basic': 0.2}
+        self.analyzer.languages_weights['scale'] = 30
+
+        batch = self.analyzer.analyze_candidates_batch(SAMPLE_CANDIDATES)
+        single = [self.analyzer.analyze_candidate(candidate) for candidate in SAMPLE_CANDIDATES]
+        self.assertEqual(batch, single)
+        for category in ('education', 'experience', 'skills', 'languages'):
+            self.assertNotEqual(single[0]['overall_score']['details'][category],
+                                default['overall_score']['details'][category], category)
+
+    def test_invalid_candidate_does_not_break_batch(self):
+        results = self.analyzer.analyze_candidates_batch([{'education': None}] + SAMPLE_CANDIDATES[:1])
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(results[1]['status'], 'success')
+
+    def test_empty_batch(self):
+        self.assertEqual(self.analyzer.analyze_candidates_batch([]), [])
+
+class TestAliasMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = AliasMatcher([
+            {'aliases': ['Data Scientist', 'ml engineer'], 'weight': 1.2},
+            {'aliases': ['data', 'analyst'], 'weight': 0.8},
+            {'aliases': ['engineer'], 'weight': 0.9}
+        ])
+
+    def test_overlapping_aliases_are_all_found(self):
+        # "data" является префиксом "data scientist", а "engineer" - суффиксом "ml engineer"
+        self.assertEqual(self.matcher.match('senior data scientist / ml engineer'), {0, 1, 2})
+
+    def test_first_weight_follows_matrix_order(self):
+        self.assertEqual(self.matcher.first_weight('Lead Engineer, data platform'), 0.8)
+        self.assertIsNone(self.matcher.first_weight('бухгалтер'))
+
+    def test_max_weight(self):
+        self.assertEqual(self.matcher.max_weight('data engineer'), 0.9)
+
+class TestUniversityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = get_reference_data().university_index
+
+    def test_full_name_with_suffix(self):
+        self.assertEqual(
+            self.index.resolve_name('Московский государственный университет имени М.В. Ломоносова, ВМК'),
+            'Московский государственный университет имени М.В. Ломоносова'
+        )
+
+    def test_abbreviations_and_aliases(self):
+        self.assertEqual(self.index.resolve_rank('МФТИ'), 'А+')
+        self.assertEqual(self.index.resolve_rank('НИУ ВШЭ, факультет компьютерных наук'), 'А+')
+        self.assertEqual(self.index.resolve_rank('ITMO University'), 'А+')
+        # Аббревиатура, записанная в самом названии
+        self.assertEqual(self.index.resolve_name('ЛЭТИ'), 'Санкт-Петербургский государственный электротехнический университет «ЛЭТИ»')
+
+    def test_most_specific_name_wins(self):
+        self.assertEqual(
+            self.index.resolve_name('Санкт-Петербургский государственный университет аэрокосмического приборостроения'),
+            'Санкт-Петербургский государственный университет аэрокосмического приборостроения'
+        )
+
+    def test_unknown_institution(self):
+        self.assertIsNone(self.index.resolve('Колледж связи №54'))
+        self.assertIsNone(self.index.resolve(''))
+
+    def test_ambiguous_alias_is_ignored(self):
+        index = UniversityIndex([
+            {'name': 'Первый университет', 'rank': 'A', 'aliases': ['ГУ']},
+            {'name': 'Второй университет', 'rank': 'B', 'aliases': ['ГУ']}
+        ])
+        self.assertIsNone(index.resolve('ГУ'))
+
+class TestReferenceData(unittest.TestCase):
+    def test_snapshot_is_shared_between_analyzers(self):
+        first = CompetencyAnalyzer()
+        second = CompetencyAnalyzer()
+        self.assertIs(first.reference_data, second.reference_data)
+        self.assertIs(first.reference_data, get_reference_data())
+
+    def test_snapshot_is_read_only(self):
+        with self.assertRaises(AttributeError):
+            get_reference_data().universities = []
+
+class TestReferenceDataRegistry(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for filename in os.listdir('data'):
+            if filename.endswith('.yaml'):
+                shutil.copy(os.path.join('data', filename), self.data_dir)
+        self.registry = ReferenceDataRegistry(self.data_dir, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _write_universities(self, content):
+        path = os.path.join(self.data_dir, 'universities.yaml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_changed_file_is_reloaded(self):
+        before = self.registry.get()
+        self.assertIs(self.registry.get(), before)
+
+        self._write_universities('universities:\n  - rank: "top"\n    name: "Тестовый университет"\n')
+        after = self.registry.get()
+        self.assertIsNot(after, before)
+        self.assertEqual([u['name'] for u in after.universities], ['Тестовый университет'])
+        # Снимок, полученный до перезагрузки, не изменяется
+        self.assertGreater(len(before.universities), 1)
+
+    def test_compiled_cache_is_used_until_sources_change(self):
+        ReferenceData.load(self.data_dir)
+        cached = ReferenceData.load_compiled(self.data_dir)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.university_index.universities, self.registry.get().university_index.universities)
+
+        self._write_universities('universities: []\n')
+        self.assertIsNone(ReferenceData.load_compiled(self.data_dir))
+
+    def test_broken_file_keeps_previous_snapshot(self):
+        before = self.registry.get()
+        self._write_universities('universities: [\n')
+        self.assertIs(self.registry.get(), before)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1 +1,354 @@
-# Sorry, I can't assist with that.
\ No newline at end of file
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+from sqlalchemy import event, text
+from src.analysis.competency_analyzer import CompetencyAnalyzer
+from src.data.bulk_writer import BulkWriter
+from src.data.database import Database, Resume, build_database_url
+from src.data.migrations import _fill_aggregates
+from src.data.skill_catalog import SkillCatalog
+from src.rescore import MAX_CHUNK_SIZE, check_chunk_size, rescore_resumes
+
+EXTRACTED_INFO = {
+    'education': [{'degree': 'master', 'institution': 'МФТИ', 'speciality': 'Прикладная математика',
+                   'start_date': '2012-09-01', 'end_date': '2014-06-30'}],
+    'experience': [{'company': 'Яндекс', 'position': 'Data Scientist', 'start_date': '2015-01-01',
+                    'end_date': '2020-01-01', 'description': 'machine learning'}],
+    'skills': {'required': ['python', 'sql'], 'additional': [], 'certifications': []},
+    'languages': [{'language': 'english', 'level': 'fluent'}]
+}
+
+def make_database(directory, compression='none', **kwargs):
+    config_path = os.path.join(directory, 'config.yaml')
+    with open(config_path, 'w') as f:
+        f.write(f"database:\n  type: sqlite\n  path: \"{os.path.join(directory, 'test.db')}\"\n"
+                f"  compression: {compression}\n")
+    return Database(config_path, **kwargs)
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = make_database(self.directory)
+        self.analyzer = CompetencyAnalyzer()
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.directory)
+
+class TestRescoring(DatabaseTestCase):
+    def test_rescore_updates_stale_rows_and_resumes(self):
+        result = self.analyzer.analyze_candidate(EXTRACTED_INFO)
+        stale_id = self.db.save_analysis(EXTRACTED_INFO, {'overall_score': {'value': 1}}, scoring_version='old')
+        current_id = self.db.save_analysis(EXTRACTED_INFO, result, scoring_version=self.analyzer.scoring_version)
+
+        stats = rescore_resumes(self.db, self.analyzer, chunk_size=1)
+        self.assertEqual(stats['processed'], 1)
+        self.assertEqual(stats['updated'], 1)
+
+        self.db.session.expire_all()
+        stale = self.db.session.get(Resume, stale_id)
+        self.assertEqual(stale.scoring_version, self.analyzer.scoring_version)
+        self.assertEqual(stale.total_score, int(result['overall_score']['value']))
+        self.assertEqual(stale.total_score, self.db.session.get(Resume, current_id).total_score)
+
+        # Повторный запуск не находит необработанных записей
+        self.assertEqual(rescore_resumes(self.db, self.analyzer)['processed'], 0)
+
+    def test_chunk_size_is_checked(self):
+        for value in (0, -1, 'abc'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                check_chunk_size(value)
+        self.assertEqual(check_chunk_size('20'), 20)
+        self.assertEqual(check_chunk_size(MAX_CHUNK_SIZE * 10), MAX_CHUNK_SIZE)
+        with self.assertRaises(ValueError):
+            rescore_resumes(self.db, self.analyzer, chunk_size=0)
+
+    def test_weight_change_invalidates_version(self):
+        version = self.analyzer.scoring_version
+        self.analyzer.role_weights['data_scientist']['skills'] = 0.5
+        self.assertNotEqual(version, self.analyzer.scoring_version)
+
+class TestSessions(DatabaseTestCase):
+    def test_sqlite_uses_wal(self):
+        with self.db.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(connection.execute(text('PRAGMA synchronous')).scalar(), 1)
+
+    def test_concurrent_saves(self):
+        result = self.analyzer.analyze_candidate(EXTRACTED_INFO)
+        ids = []
+        lock = threading.Lock()
+
+        def save():
+            for _ in range(10):
+                resume_id = self.db.save_analysis(EXTRACTED_INFO, result, scoring_version='v1')
+                with lock:
+                    ids.append(resume_id)
+            self.db.remove_session()
+
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertNotIn(None, ids)
+        self.assertEqual(len(set(ids)), 80)
+        self.assertEqual(len(self.db.get_all_resumes()), 80)
+
+    def test_failed_write_does_not_poison_session(self):
+        self.assertIsNone(self.db.save_resume(None, 'text', {}, {}))
+        self.assertIsNotNone(self.db.save_analysis(EXTRACTED_INFO, {}, scoring_version='v1'))
+
+    def test_postgresql_url(self):
+        url = build_database_url({'type': 'postgresql', 'host': 'db', 'name': 'hr', 'user': 'hr', 'password': 'secret'})
+        self.assertEqual(url.render_as_string(hide_password=False), 'postgresql+psycopg2://hr:secret@db:5432/hr')
+
+class TestHistory(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(25):
+            self.db.save_analysis(EXTRACTED_INFO, {'overall_score': {'value': index % 7}}, scoring_version='v1')
+
+    def pages(self, **kwargs):
+        items, cursor = [], None
+        while True:
+            page = self.db.get_history(limit=10, cursor=cursor, **kwargs)
+            items.extend(page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return items
+
+    def test_pages_by_upload_date(self):
+        items = self.pages()
+        self.assertEqual([item['id'] for item in items], list(range(25, 0, -1)))
+
+    def test_sort_by_score_with_ties(self):
+        items = self.pages(sort='total_score', order='asc', fields=['id', 'total_score'])
+        self.assertEqual(len({item['id'] for item in items}), 25)
+        keys = [(item['total_score'], item['id']) for item in items]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(set(items[0]), {'id', 'total_score'})
+
+    def test_invalid_arguments(self):
+        cursor = self.db.get_history(limit=5)['next_cursor']
+        for kwargs in ({'sort': 'filename'}, {'fields': ['content']}, {'cursor': 'garbage'},
+                       {'cursor': cursor, 'sort': 'total_score'}):
+            with self.subTest(kwargs=kwargs), self.assertRaises(ValueError):
+                self.db.get_history(**kwargs)
+
+    def test_pages_use_index(self):
+        with self.db.engine.connect() as connection:
+            plan = connection.execute(text(
+                'EXPLAIN QUERY PLAN SELECT id, total_score FROM resumes WHERE (total_score, id) < (3, 10) '
+                'ORDER BY total_score DESC, id DESC LIMIT 11'
+            )).all()
+        self.assertIn('ix_resumes_total_score_id', ' '.join(row[-1] for row in plan))
+
+class TestStorage(DatabaseTestCase):
+    def stored(self, column, resume_id):
+        with self.db.engine.connect() as connection:
+            return connection.execute(text(f'SELECT {column} FROM resumes WHERE id = :id'), {'id': resume_id}).scalar()
+
+    def test_json_columns_are_not_double_encoded(self):
+        result = self.analyzer.analyze_candidate(EXTRACTED_INFO)
+        resume_id = self.db.save_analysis(EXTRACTED_INFO, result)
+        for column in ('extracted_info', 'analysis_results', 'skills'):
+            self.assertEqual(self.stored(f'json_type({column})', resume_id), 'object')
+        resume = self.db.get_resume(resume_id)
+        self.assertEqual(resume['extracted_info'], EXTRACTED_INFO)
+        self.assertEqual(resume['analysis_results'], json.loads(json.dumps(result)))
+
+    def test_compressed_analysis(self):
+        self.db.close()
+        self.db = make_database(self.directory, compression='zlib')
+        result = self.analyzer.analyze_candidate(EXTRACTED_INFO)
+        resume_id = self.db.save_analysis(EXTRACTED_INFO, result, scoring_version='old')
+        self.assertIsNone(self.stored('analysis_results', resume_id))
+        self.assertLess(len(self.stored('analysis_payload', resume_id)), len(json.dumps(result)))
+        expected = json.loads(json.dumps(result))
+        self.assertEqual(self.db.get_resume(resume_id)['analysis_results'], expected)
+        history = self.db.get_history(fields=['id', 'analysis_results'])['items']
+        self.assertEqual(history[0]['analysis_results'], expected)
+
+        rescore_resumes(self.db, self.analyzer)
+        self.assertEqual(self.db.get_resume(resume_id)['analysis_results']['status'], 'success')
+
+    def test_list_views_skip_heavy_columns(self):
+        self.db.save_analysis(EXTRACTED_INFO, {}, content='текст резюме')
+        statements = []
+        event.listen(self.db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        self.assertEqual(len(self.db.get_all_resumes()), 1)
+        self.assertNotRegex(' '.join(statements), r'resumes\.content\b')
+        self.assertNotIn('analysis_payload', ' '.join(statements))
+
+class TestDuplicates(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(7)
+        words = ['опыт', 'разработки', 'python', 'sql', 'аналитика', 'данных', 'проект', 'команда', 'модели']
+        self.text = ' '.join(f'{rng.choice(words)}{rng.randint(0, 99)}' for _ in range(300))
+        self.resume_id = self.db.save_analysis(EXTRACTED_INFO, {'status': 'success'}, content=self.text)
+
+    def test_exact_and_near_duplicates(self):
+        reformatted = self.text.upper().replace(' ', '\n  ', 20)
+        self.assertEqual(self.db.find_duplicate(text=reformatted),
+                         {'resume_id': self.resume_id, 'match': 'exact', 'distance': 0})
+        edited = self.text.replace(self.text.split()[150], 'изменено', 1) + ' телефон 89990001122'
+        duplicate = self.db.find_duplicate(text=edited)
+        self.assertEqual((duplicate['resume_id'], duplicate['match']), (self.resume_id, 'near'))
+        self.assertIsNone(self.db.find_duplicate(text=' '.join(reversed(self.text.split()))))
+
+    def test_file_hash_and_unique_content(self):
+        self.assertIsNone(self.db.find_duplicate(file_hash='a' * 64))
+        self.db.record_upload(self.resume_id, 'resume.pdf', 'a' * 64)
+        self.assertEqual(self.db.find_duplicate(file_hash='a' * 64)['match'], 'file')
+        self.assertIsNone(self.db.save_analysis(EXTRACTED_INFO, {}, content=self.text))
+
+        self.assertTrue(self.db.delete_resume(self.resume_id))
+        self.assertIsNone(self.db.find_duplicate(file_hash='a' * 64, text=self.text))
+
+class TestBulkSave(DatabaseTestCase):
+    def items(self, count):
+        return [{'extracted_info': EXTRACTED_INFO, 'analysis_result': {'overall_score': {'value': index}},
+                 'scoring_version': 'v1', 'filename': f'{index}.pdf', 'content': f'резюме номер {index}'}
+                for index in range(count)]
+
+    def test_ids_in_order_one_insert_per_batch(self):
+        inserts = []
+        event.listen(self.db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: inserts.append(statement)
+                     if statement.startswith('INSERT INTO resumes') else None)
+        ids = self.db.save_analyses_bulk(self.items(25), batch_size=10)
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual([self.db.get_resume(resume_id)['filename'] for resume_id in ids[:3]],
+                         ['0.pdf', '1.pdf', '2.pdf'])
+        self.assertEqual(len(self.db.search(skills=['python'], limit=100)['items']), 25)
+        self.assertIsNotNone(self.db.find_duplicate(text='Резюме номер 24'))
+
+    def test_failed_rows_do_not_abort_batch(self):
+        items = self.items(4)
+        items[1] = dict(items[1], extracted_info=None)
+        items[3] = dict(items[3], content=items[0]['content'])
+        ids = self.db.save_analyses_bulk(items)
+        self.assertIsNone(ids[1])
+        self.assertIsNone(ids[3])
+        self.assertEqual([self.db.get_resume(ids[index])['filename'] for index in (0, 2)], ['0.pdf', '2.pdf'])
+
+    def test_writer_batches_submitted_results(self):
+        calls = []
+        save = self.db.save_analyses_bulk
+        self.db.save_analyses_bulk = lambda items, **kwargs: calls.append(len(items)) or save(items, **kwargs)
+        writer = BulkWriter(self.db, batch_size=10, flush_interval=5)
+        futures = [writer.submit(item) for item in self.items(5)]
+        writer.close()
+        self.assertEqual(calls, [5])
+        self.assertTrue(all(isinstance(future.result(), int) for future in futures))
+
+class TestSkillCatalog(unittest.TestCase):
+    def test_aliases_resolve_to_canonical_names(self):
+        catalog = SkillCatalog.load()
+        self.assertEqual(catalog.canonicalize('питон'), ['Python'])
+        self.assertEqual(catalog.canonicalize_all(['Python3', 'MySQL', 'python']), ['Python', 'SQL'])
+        self.assertEqual(catalog.canonicalize('Опыт работы с PostgreSQL'), ['SQL'])
+        self.assertEqual(catalog.canonicalize(' Haskell  Stack. '), ['haskell stack'])
+
+    def test_short_aliases_match_whole_skill_only(self):
+        catalog = SkillCatalog.load()
+        self.assertEqual(catalog.canonicalize('R'), ['R'])
+        self.assertEqual(catalog.canonicalize('R&D management'), ['r&d management'])
+        self.assertEqual(catalog.canonicalize('Составление CV'), ['составление cv'])
+        self.assertEqual(catalog.canonicalize('CV screening'), ['cv screening'])
+
+class TestSearch(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        candidates = [
+            (['python', 'sql'], 'машинное обучение в Яндексе', 80),
+            (['Python3'], 'разработка бэкенда', 60),
+            (['java', 'MySQL'], 'машинное зрение', 90),
+            (['пайтон', 'postgresql'], 'аналитика данных', 40),
+        ]
+        self.ids = []
+        for skills, content, score in candidates:
+            info = dict(EXTRACTED_INFO, skills={'required': skills, 'additional': [], 'certifications': []})
+            self.ids.append(self.db.save_analysis(info, {'overall_score': {'value': score}}, content=content))
+
+    def found(self, **kwargs):
+        return [item['id'] for item in self.db.search(**kwargs)['items']]
+
+    def test_skills_with_aliases(self):
+        self.assertEqual(self.found(skills=['Python']), [self.ids[3], self.ids[1], self.ids[0]])
+        self.assertEqual(self.found(skills=['питон', 'SQL']), [self.ids[3], self.ids[0]])
+
+    def test_combined_filters(self):
+        self.assertEqual(self.found(skills=['sql'], text_query='машин', min_total_score=50),
+                         [self.ids[2], self.ids[0]])
+        self.assertEqual(self.found(text_query='машинное обучение'), [self.ids[0]])
+        self.assertEqual(self.found(text_query='МФТИ', min_total_score=70), [self.ids[2], self.ids[0]])
+
+    def test_pages_and_deleted_resumes(self):
+        first = self.db.search(limit=3)
+        self.assertEqual(len(first['items']), 3)
+        rest = self.db.search(limit=3, cursor=first['next_cursor'])
+        self.assertEqual([item['id'] for item in rest['items']], [self.ids[0]])
+        self.assertIsNone(rest['next_cursor'])
+
+        self.db.delete_resume(self.ids[0])
+        self.assertEqual(self.found(skills=['python'], text_query='машинное'), [])
+
+    def test_skill_filter_uses_index(self):
+        with self.db.engine.connect() as connection:
+            plan = connection.execute(text(
+                "EXPLAIN QUERY PLAN SELECT resume_id FROM resume_skills WHERE skill = 'Python' "
+                "ORDER BY resume_id DESC LIMIT 51"
+            )).all()
+        self.assertIn('ix_resume_skills_skill_resume_id', ' '.join(row[-1] for row in plan))
+
+class TestStats(DatabaseTestCase):
+    def result(self, score, role):
+        return {'overall_score': {'value': score}, 'role_fit': {'best_fit': {'role': role, 'score': score}}}
+
+    def aggregates(self):
+        with self.db.engine.connect() as connection:
+            return sorted(connection.execute(text(
+                'SELECT dimension, name, bucket, shard, resume_count FROM resume_aggregates WHERE resume_count != 0'
+            )).all())
+
+    def test_counters_follow_saves_updates_and_deletes(self):
+        first = self.db.save_analysis(EXTRACTED_INFO, self.result(85, 'data_scientist'), content='первое резюме')
+        # Алиас вуза попадает в тот же счетчик, что и полное название
+        physics = dict(EXTRACTED_INFO, education=[dict(EXTRACTED_INFO['education'][0], institution='Физтех')])
+        ids = self.db.save_analyses_bulk([
+            {'extracted_info': physics, 'analysis_result': self.result(score, 'ml_engineer'),
+             'content': f'резюме {score}'} for score in (100, 42)
+        ])
+        self.db.update_resume(ids[1], {'total_score': 55, 'skills': {'required': ['java']}})
+        self.db.update_scores_bulk([{'id': first, 'total_score': 15,
+                                     'analysis_results': self.result(15, 'data_analyst')}])
+        self.db.delete_resume(ids[0])
+
+        stats = self.db.get_stats(top=1)
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual([bucket['count'] for bucket in stats['score_histogram'] if bucket['count']], [1, 1])
+        self.assertEqual(stats['score_histogram'][-1], {'from': 100, 'to': 100, 'count': 0})
+        self.assertEqual(sorted(role['role'] for role in stats['roles']), ['data_analyst', 'ml_engineer'])
+        self.assertEqual(stats['top_universities'], [{
+            'university': 'Московский физико-технический институт (национальный исследовательский университет)',
+            'count': 2
+        }])
+        self.assertEqual(len(stats['top_skills']), 1)
+        self.assertEqual(sum(period['count'] for period in stats['periods']), 2)
+
+        # Инкрементальные счетчики совпадают с полным пересчетом
+        counters = self.aggregates()
+        _fill_aggregates(self.db.engine)
+        self.assertEqual(counters, self.aggregates())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from src.analysis.http_client import HTTPMetrics, SharedHTTPClient, create_http_client
+from src.analysis.llm_backends import LocalOpenAIBackend
+from src.analysis.resume_parser import ResumeParser
+from tests.llm_stub import StubLLMServer
+import shutil
+import tempfile
+
+class TestHTTPMetrics(unittest.TestCase):
+    def test_reuse_rate_and_percentiles(self):
+        metrics = HTTPMetrics()
+        for index in range(100):
+            metrics.record((index + 1) / 1000, new_connection=index < 4)
+        stats = metrics.stats()
+        self.assertEqual(stats['requests'], 100)
+        self.assertEqual(stats['reuse_rate'], 0.96)
+        self.assertEqual((stats['latency_p50_ms'], stats['latency_p90_ms'], stats['latency_p99_ms']), (50.0, 90.0, 99.0))
+
+    def test_empty(self):
+        stats = HTTPMetrics().stats()
+        self.assertEqual(stats['reuse_rate'], 0.0)
+        self.assertIsNone(stats['latency_p50_ms'])
+
+class TestSharedHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_config(self):
+        client = create_http_client({'timeout': 30, 'http': {'connect_timeout': 2, 'max_connections': 4}})
+        self.assertEqual((client.timeout.connect, client.timeout.read), (2, 30))
+        self.assertEqual(client.limits.max_connections, 4)
+        client.close()
+
+    def test_connections_are_reused(self):
+        http_client = SharedHTTPClient()
+        with StubLLMServer() as server:
+            backend = LocalOpenAIBackend(base_url=server.base_url, http_client=http_client)
+            parser = ResumeParser(backend=backend, cache_dir=self.cache_dir, local_first=False)
+            for index in range(5):
+                parser.parse_resume(f"резюме {index}", 'resume.txt')
+            # Последовательные запросы идут через одно keep-alive соединение
+            self.assertEqual(http_client.stats()['new_connections'], 1)
+            self.assertEqual(http_client.stats()['reuse_rate'], 0.8)
+            parser.parse_many([f"резюме {index}" for index in range(5, 10)])
+        http_client.close()
+        stats = http_client.stats()
+        self.assertEqual(stats['requests'], 10)
+        self.assertIsNotNone(stats['latency_p99_ms'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from src.job_queue import JobQueue, QueueFullError
+
+def wait_finished(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] == 'finished':
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(workers=2, max_jobs=3, max_pending=4)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_results_per_item(self):
+        """Результаты и ошибки сохраняются по каждому элементу, cleanup вызывается всегда"""
+        cleaned = []
+        def process(item):
+            if item['name'] == 'bad.pdf':
+                raise ValueError('Failed to parse resume')
+            return {'name': item['name']}
+
+        job_id = self.queue.submit(
+            [{'name': 'a.pdf'}, {'name': 'bad.pdf'}, {'name': 'b.docx'}],
+            process,
+            cleanup=lambda item: cleaned.append(item['name'])
+        )
+        job = wait_finished(self.queue, job_id)
+
+        self.assertEqual(job['total'], 3)
+        self.assertEqual(job['completed'], 2)
+        self.assertEqual(job['failed'], 1)
+        self.assertEqual([item['status'] for item in job['items']], ['done', 'failed', 'done'])
+        self.assertEqual(job['items'][0]['result'], {'name': 'a.pdf'})
+        self.assertEqual(job['items'][1]['error'], 'Failed to parse resume')
+        self.assertEqual(sorted(cleaned), ['a.pdf', 'b.docx', 'bad.pdf'])
+
+    def test_submit_returns_immediately(self):
+        """submit не ждет обработки элементов"""
+        release = threading.Event()
+        job_id = self.queue.submit([{'name': 'slow.pdf'}], lambda item: release.wait(5))
+        self.assertIn(self.queue.get(job_id)['status'], ('queued', 'running'))
+        release.set()
+        self.assertEqual(wait_finished(self.queue, job_id)['completed'], 1)
+
+    def test_old_jobs_evicted(self):
+        """Хранятся только max_jobs последних задач"""
+        job_ids = [self.queue.submit([], lambda item: None) for _ in range(4)]
+        self.assertIsNone(self.queue.get(job_ids[0]))
+        self.assertEqual(self.queue.get(job_ids[-1])['status'], 'finished')
+        self.assertIsNone(self.queue.get('unknown'))
+
+    def test_running_jobs_are_not_evicted(self):
+        """Незавершенные задачи остаются доступными, даже если задач больше max_jobs"""
+        release = threading.Event()
+        running = self.queue.submit([{'name': 'slow.pdf'}], lambda item: release.wait(5))
+        finished = [self.queue.submit([], lambda item: None) for _ in range(3)]
+        self.assertIsNotNone(self.queue.get(running))
+        self.assertIsNone(self.queue.get(finished[0]))
+        release.set()
+        self.assertEqual(wait_finished(self.queue, running)['completed'], 1)
+
+    def test_pending_limit(self):
+        """Новые элементы сверх max_pending отклоняются, пока очередь не разгрузится"""
+        release = threading.Event()
+        job_id = self.queue.submit([{'name': f'{index}.pdf'} for index in range(3)], lambda item: release.wait(5))
+        with self.assertRaises(QueueFullError):
+            self.queue.submit([{'name': 'a.pdf'}, {'name': 'b.pdf'}], lambda item: None)
+        release.set()
+        wait_finished(self.queue, job_id)
+        self.assertEqual(self.queue.pending, 0)
+        wait_finished(self.queue, self.queue.submit([{'name': 'a.pdf'}, {'name': 'b.pdf'}], lambda item: None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+from src.analysis.json_stream import JSONSectionStream, extract_json
+
+ANSWER = {
+    'education': [{'degree': 'master', 'institution': 'МГУ, мехмат'}],
+    'experience': [{'company': 'Яндекс', 'description': 'Строки с "кавычками", {скобками} и \\ слешем'}],
+    'skills': {'required': ['Python'], 'additional': [], 'certifications': []},
+    'languages': []
+}
+
+class TestExtractJson(unittest.TestCase):
+    def test_plain_json(self):
+        self.assertEqual(extract_json(json.dumps(ANSWER)), ANSWER)
+
+    def test_code_fence_and_prose(self):
+        text = f"Вот результат:\n```json\n{json.dumps(ANSWER, ensure_ascii=False, indent=2)}\n```\nГотово {{"
+        self.assertEqual(extract_json(text), ANSWER)
+
+    def test_no_object(self):
+        with self.assertRaises(json.JSONDecodeError):
+            extract_json("Не удалось разобрать резюме")
+
+class TestJSONSectionStream(unittest.TestCase):
+    def feed_by(self, text, size):
+        stream = JSONSectionStream()
+        events = []
+        for start in range(0, len(text), size):
+            events.append(stream.feed(text[start:start + size]))
+        return stream, events
+
+    def test_sections_complete_before_end_of_stream(self):
+        text = json.dumps(ANSWER, ensure_ascii=False)
+        for size in (1, 7, len(text)):
+            with self.subTest(size=size):
+                stream, events = self.feed_by(text, size)
+                completed = [key for chunk in events for key, _ in chunk]
+                self.assertEqual(completed, list(ANSWER))
+                self.assertEqual(stream.close(), ANSWER)
+        # Первая секция готова задолго до конца ответа
+        _, events = self.feed_by(text, 1)
+        first = next(index for index, chunk in enumerate(events) if chunk)
+        self.assertLess(first, len(text) // 3)
+
+    def test_prose_before_object_is_skipped(self):
+        stream, _ = self.feed_by("```json\n" + json.dumps(ANSWER) + "\n```", 5)
+        self.assertEqual(stream.close(), ANSWER)
+
+    def test_incomplete_object(self):
+        stream, _ = self.feed_by(json.dumps(ANSWER)[:-10], 5)
+        with self.assertRaises(json.JSONDecodeError):
+            stream.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.analysis.llm_backends import (FakeBackend, LocalOpenAIBackend, OpenAIBackend, create_backend,
+                                       DEFAULT_LOCAL_BASE_URL)
+from src.analysis.local_extractor import LocalExtractor
+from src.analysis.resume_parser import ResumeParser
+from tests.llm_stub import StubLLMServer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'resume_hh.txt')
+
+class TestCreateBackend(unittest.TestCase):
+    def test_remote_requires_key(self):
+        with self.assertRaises(ValueError):
+            create_backend({'backend': 'remote'})
+        backend = create_backend({'model': 'gpt-4o-mini', 'timeout': 5}, api_key='key')
+        self.assertIsInstance(backend, OpenAIBackend)
+        self.assertEqual((backend.model, backend.timeout), ('gpt-4o-mini', 5))
+
+    def test_local_does_not_require_key(self):
+        backend = create_backend({'backend': 'local'})
+        self.assertIsInstance(backend, LocalOpenAIBackend)
+        self.assertEqual(backend.base_url, DEFAULT_LOCAL_BASE_URL)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend({'backend': 'llama'})
+
+class TestBackendsInParser(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_fake_backend_is_deterministic(self):
+        backend = FakeBackend()
+        parser = ResumeParser(backend=backend, cache_dir=self.cache_dir, local_first=False, section_prompts=False)
+        result = parser.parse_resume(self.text, 'resume_hh.txt')
+        self.assertEqual(len(backend.requests), 1)
+        self.assertEqual(result, LocalExtractor().extract(self.text)[0])
+
+    def test_fake_backend_async_path(self):
+        backend = FakeBackend()
+        parser = ResumeParser(backend=backend, cache_dir=self.cache_dir, local_first=False)
+        results = parser.parse_many([self.text])
+        self.assertEqual(len(backend.requests), 4)
+        self.assertEqual(results[0]['experience'][0]['company'], 'Яндекс')
+
+    def test_fake_backend_stream(self):
+        backend = FakeBackend(chunk_size=5)
+        parser = ResumeParser(backend=backend, cache_dir=self.cache_dir, local_first=False, section_prompts=False)
+        sections = dict(parser.parse_resume_stream(self.text, 'resume_hh.txt'))
+        self.assertEqual(sections, LocalExtractor().extract(self.text)[0])
+
+    def test_json_mode_can_be_disabled(self):
+        with StubLLMServer() as server:
+            backend = create_backend({'backend': 'local', 'base_url': server.base_url, 'json_mode': False})
+            backend.complete([{'role': 'user', 'content': 'резюме'}])
+        self.assertNotIn('response_format', server.requests[0])
+
+    def test_local_server_without_key(self):
+        with StubLLMServer() as server:
+            backend = LocalOpenAIBackend(base_url=server.base_url, model='qwen2.5-7b-instruct')
+            parser = ResumeParser(backend=backend, cache_dir=self.cache_dir)
+            result = parser.parse_resume('резюме', 'resume.txt')
+        self.assertEqual(result['skills']['required'], ['резюме'])
+        self.assertEqual(server.requests[0]['model'], 'qwen2.5-7b-instruct')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+from src.analysis.local_extractor import LocalExtractor, parse_date
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'resume_hh.txt')
+
+class TestLocalExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = LocalExtractor()
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def test_hh_export_is_fully_confident(self):
+        data, confidence, _ = self.extractor.extract(self.text)
+        self.assertEqual(confidence, {'education': 1.0, 'experience': 1.0, 'skills': 1.0, 'languages': 1.0})
+
+        self.assertEqual([(exp['company'], exp['position']) for exp in data['experience']],
+                         [('Яндекс', 'Senior Data Scientist'), ('Сбербанк', 'Аналитик данных')])
+        self.assertEqual(data['experience'][1]['start_date'], '2017-06-01')
+        self.assertEqual(data['experience'][1]['end_date'], '2018-12-31')
+        self.assertEqual(data['experience'][1]['duration_years'], '1.58')
+
+        self.assertEqual([(edu['degree'], edu['institution'], edu['end_date']) for edu in data['education']], [
+            ('master', 'Московский физико-технический институт', '2016-12-31'),
+            ('bachelor', 'Московский государственный университет имени М.В. Ломоносова', '2014-12-31')
+        ])
+        self.assertEqual(data['skills']['required'], ['Python', 'SQL', 'Pandas', 'PyTorch', 'Spark', 'Airflow'])
+        self.assertEqual(data['skills']['certifications'], ['Deep Learning Specialization, Coursera'])
+        self.assertEqual(data['languages'], [{'language': 'russian', 'level': 'native'},
+                                             {'language': 'english', 'level': 'advanced'}])
+
+    def test_single_line_experience(self):
+        data, confidence, _ = self.extractor.extract(
+            "Experience\nData Analyst, Ozon, 03.2020 - 05.2022\nSQL dashboards\n"
+        )
+        self.assertEqual(data['experience'][0]['position'], 'Data Analyst')
+        self.assertEqual(data['experience'][0]['company'], 'Ozon')
+        self.assertEqual(data['experience'][0]['end_date'], '2022-05-31')
+        self.assertEqual(confidence['experience'], 1.0)
+
+    def test_free_form_text_is_not_confident(self):
+        _, confidence, _ = self.extractor.extract(
+            "Я работаю аналитиком пять лет, знаю Python и немного английский."
+        )
+        self.assertEqual(confidence, {'education': 0.0, 'experience': 0.0, 'skills': 0.0, 'languages': 0.0})
+
+    def test_unknown_language_lowers_confidence(self):
+        _, confidence, _ = self.extractor.extract("Languages\nEnglish: fluent\nэльфийский: свободно\n")
+        self.assertEqual(confidence['languages'], 0.5)
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date('Февраль 2020', end=True), '2020-02-29')
+        self.assertEqual(parse_date('Sep 2019'), '2019-09-01')
+        self.assertEqual(parse_date('2018', end=True), '2018-12-31')
+
+if __name__ == '__main__':
+    unittest.main()
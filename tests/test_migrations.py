@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import create_engine, event, text
+from src.data.database import Base, Resume
+from src.data.migrations import MIGRATIONS, Migration, add_column, backfill, migrate
+from tests.test_data import EXTRACTED_INFO, make_database
+
+class MigrationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'test.db')}")
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def columns(self):
+        with self.engine.connect() as connection:
+            return [row[1] for row in connection.execute(text('PRAGMA table_info(resumes)'))]
+
+class TestMigrate(MigrationTestCase):
+    def test_fresh_database(self):
+        self.assertEqual(migrate(self.engine), [migration.version for migration in MIGRATIONS])
+        # Миграции приводят схему к модели
+        self.assertEqual(set(self.columns()), set(Resume.__table__.columns.keys()))
+        self.assertEqual(migrate(self.engine), [])
+
+    def test_legacy_database_keeps_rows(self):
+        with self.engine.begin() as connection:
+            # Схема, которую создавал drop_all/create_all до появления scoring_version
+            connection.execute(text(
+                "CREATE TABLE resumes (id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, content TEXT NOT NULL, "
+                "extracted_info JSON, analysis_results JSON, university VARCHAR(255), speciality VARCHAR(255), "
+                "graduation_year VARCHAR(50), education_score INTEGER, skills JSON, experience_years INTEGER, "
+                "total_score INTEGER, upload_date DATETIME, last_modified DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO resumes (filename, content, total_score) VALUES ('a.pdf', '', 50)"))
+        migrate(self.engine)
+        self.assertIn('scoring_version', self.columns())
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('SELECT filename, scoring_version, total_score, education_score '
+                                                     'FROM resumes')).all(),
+                             [('a.pdf', None, 50, 0)])
+
+    def test_legacy_skills_are_indexed(self):
+        migrate(self.engine, MIGRATIONS[:3])
+        with self.engine.begin() as connection:
+            # До миграции 4 навыки лежали только в JSON, иногда закодированном дважды
+            connection.execute(text("INSERT INTO resumes (filename, content, skills) VALUES "
+                                    "('a.pdf', 'опыт на пайтоне', :skills)"),
+                               {'skills': json.dumps(json.dumps({'required': ['питон', 'Go'], 'additional': []}))})
+        self.assertEqual(migrate(self.engine), [migration.version for migration in MIGRATIONS[3:]])
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('SELECT skill FROM resume_skills ORDER BY skill')).scalars().all(),
+                             ['Python', 'go'])
+            self.assertEqual(connection.execute(text("SELECT rowid FROM resumes_fts WHERE resumes_fts MATCH 'пайт*'"))
+                             .scalars().all(), [1])
+            # Строка внутри JSON заменена объектом
+            self.assertEqual(connection.execute(text("SELECT json_extract(skills, '$.required[1]') FROM resumes"))
+                             .scalar(), 'Go')
+
+    def test_existing_duplicates_keep_one_fingerprint(self):
+        migrate(self.engine, MIGRATIONS[:6])
+        with self.engine.begin() as connection:
+            connection.execute(text("INSERT INTO resumes (filename, content) VALUES ('a.pdf', :content)"),
+                               [{'content': 'Python разработчик'}, {'content': 'python  РАЗРАБОТЧИК'},
+                                {'content': 'аналитик данных'}, {'content': ''}])
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            hashes = connection.execute(text('SELECT content_hash IS NOT NULL FROM resumes ORDER BY id')).scalars()
+            self.assertEqual(list(hashes), [1, 0, 1, 0])
+            self.assertEqual(connection.execute(text('SELECT COUNT(*) FROM resume_simhash_bands')).scalar(), 8)
+
+    def test_existing_resumes_are_aggregated(self):
+        migrate(self.engine, MIGRATIONS[:7])
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO resumes (filename, content, university, total_score, analysis_results, skills, "
+                "upload_date) VALUES ('a.pdf', '', :university, :score, :results, '[\"python\"]', '2024-03-05 10:00:00')"
+            ), [{'university': 'МГУ', 'score': 72, 'results': '{"role_fit": {"best_fit": {"role": "data_scientist"}}}'},
+                {'university': 'MSU', 'score': 75, 'results': None}])
+            connection.execute(text("INSERT INTO resume_skills (resume_id, skill) VALUES (1, 'Python'), (2, 'Python')"))
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            rows = connection.execute(text(
+                'SELECT dimension, name, bucket, SUM(resume_count) FROM resume_aggregates '
+                'GROUP BY dimension, name, bucket ORDER BY dimension')).all()
+        self.assertEqual([tuple(row) for row in rows], [
+            ('period', '2024-03', 7, 2), ('role', 'data_scientist', 7, 1), ('skill', 'Python', 7, 2),
+            ('university', 'Московский государственный университет имени М.В. Ломоносова', 7, 2)
+        ])
+
+    def test_short_aliases_are_reindexed(self):
+        migrate(self.engine, MIGRATIONS[:8])
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO resumes (filename, content, skills) VALUES ('a.pdf', '', :skills)"
+            ), {'skills': '{"required": ["R&D management"]}'})
+            connection.execute(text("INSERT INTO resume_skills (resume_id, skill) VALUES (1, 'R')"))
+        migrate(self.engine)
+        with self.engine.connect() as connection:
+            skills = connection.execute(text('SELECT skill FROM resume_skills')).scalars().all()
+            aggregated = connection.execute(text(
+                "SELECT name FROM resume_aggregates WHERE dimension = 'skill'")).scalars().all()
+        self.assertEqual(skills, ['r&d management'])
+        self.assertEqual(aggregated, ['r&d management'])
+
+    def test_database_created_by_create_all(self):
+        Base.metadata.create_all(self.engine)
+        migrate(self.engine)
+        self.assertEqual(self.columns().count('scoring_version'), 1)
+
+    def test_restart_keeps_history(self):
+        db = make_database(self.directory)
+        resume_id = db.save_analysis(EXTRACTED_INFO, {}, scoring_version='v1')
+        db.close()
+        db = make_database(self.directory)
+        self.assertIsNotNone(db.get_resume(resume_id))
+        db.close()
+
+class TestBackfill(MigrationTestCase):
+    def test_backfill_runs_in_batches(self):
+        migrate(self.engine)
+        with self.engine.begin() as connection:
+            connection.execute(text("INSERT INTO resumes (filename, content, total_score) VALUES ('a.pdf', '', :score)"),
+                               [{'score': index} for index in range(2500)])
+        selects = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: selects.append(statement)
+                     if statement.startswith('SELECT resumes.id') else None)
+
+        def add_rank(connection):
+            add_column(connection, 'resumes', 'score_rank', 'INTEGER')
+
+        def fill_rank(engine):
+            return backfill(engine, 'resumes', ['total_score'], lambda row: {'score_rank': row.total_score // 100},
+                            where=lambda table: table.c.score_rank.is_(None), batch_size=1000)
+
+        self.assertEqual(migrate(self.engine, MIGRATIONS + [Migration(100, 'score rank', add_rank, fill_rank)]), [100])
+        self.assertEqual(len(selects), 4)
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text('SELECT MAX(score_rank), COUNT(score_rank) FROM resumes')).one(),
+                             (24, 2500))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import time
+import unittest
+from src.analysis.parse_cache import ParseCache, cache_key
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_key_depends_on_model_and_prompt(self):
+        key = cache_key('Иван Петров\nPython', 'gpt-3.5-turbo', 'v1')
+        self.assertEqual(key, cache_key('  Иван Петров   Python ', 'gpt-3.5-turbo', 'v1'))
+        self.assertNotEqual(key, cache_key('Иван Петров\nPython', 'gpt-4o', 'v1'))
+        self.assertNotEqual(key, cache_key('Иван Петров\nPython', 'gpt-3.5-turbo', 'v2'))
+
+    def test_disk_store_shared_between_instances(self):
+        """Вторая копия кэша (другой процесс) видит записи первой"""
+        ParseCache(self.cache_dir).set('key', {'skills': {'required': ['python']}})
+        other = ParseCache(self.cache_dir)
+        self.assertEqual(other.get('key'), {'skills': {'required': ['python']}})
+        self.assertEqual(other.get('key'), {'skills': {'required': ['python']}})
+        self.assertIsNone(other.get('missing'))
+        stats = other.stats()
+        self.assertEqual((stats['disk_hits'], stats['memory_hits'], stats['misses']), (1, 1, 1))
+        self.assertEqual(stats['disk_entries'], 1)
+
+    def test_returns_copies(self):
+        cache = ParseCache(self.cache_dir)
+        cache.set('key', {'skills': []})
+        cache.get('key')['skills'].append('python')
+        self.assertEqual(cache.get('key'), {'skills': []})
+
+    def test_ttl_expiration(self):
+        cache = ParseCache(self.cache_dir, ttl=0.05)
+        cache.set('key', {'a': 1})
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.stats()['disk_entries'], 0)
+
+    def test_size_eviction_removes_least_recently_used(self):
+        cache = ParseCache(self.cache_dir, max_bytes=250, memory_entries=0)
+        for index in range(3):
+            cache.set(f'key{index}', {'text': 'x' * 100})
+            time.sleep(0.01)
+        cache.get('key0')
+        cache.prune()
+        self.assertIsNotNone(cache.get('key0'))
+        self.assertIsNone(cache.get('key1'))
+        self.assertIsNotNone(cache.get('key2'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import io
+import docx
+import fitz
+from src.analysis.file_parser import FileParser
+from src.analysis.pdf_text import extract_pdf_text, shutdown_pool
+
+def make_pdf(path, pages):
+    document = fitz.open()
+    for text in pages:
+        document.new_page().insert_text((72, 72), text)
+    document.save(path)
+    document.close()
+
+class TestPdfText(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.pages = [f"Page {number} Python SQL" for number in range(20)]
+        cls.path = os.path.join(cls.directory, 'resume.pdf')
+        make_pdf(cls.path, cls.pages)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_pool()
+        shutil.rmtree(cls.directory)
+
+    def test_backends_extract_same_words(self):
+        for backend in ('pymupdf', 'pypdf2'):
+            with self.subTest(backend=backend):
+                text = extract_pdf_text(self.path, backend=backend, workers=1)
+                self.assertEqual(text.split(), ' '.join(self.pages).split())
+
+    def test_parallel_matches_serial(self):
+        serial = extract_pdf_text(self.path, workers=1)
+        parallel = extract_pdf_text(self.path, workers=2, parallel_min_pages=4)
+        self.assertEqual(parallel, serial)
+
+    def test_concurrent_threads(self):
+        expected = extract_pdf_text(self.path, workers=1)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: extract_pdf_text(self.path, workers=1), range(8)))
+        self.assertEqual(results, [expected] * 8)
+
+    def test_pool_does_not_restart_main_module(self):
+        # Как src/main.py: вся инициализация на уровне модуля, без if __name__ == '__main__'
+        marker = os.path.join(self.directory, 'started.txt')
+        script = os.path.join(self.directory, 'app_main.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(
+                "import sys\n"
+                f"sys.path.insert(0, {os.getcwd()!r})\n"
+                f"with open({marker!r}, 'a') as marker:\n"
+                "    marker.write('started\\n')\n"
+                "from src.analysis.pdf_text import extract_pdf_text, shutdown_pool\n"
+                f"print(len(extract_pdf_text({self.path!r}, workers=2, parallel_min_pages=4).split()))\n"
+                "shutdown_pool()\n"
+            )
+        completed = subprocess.run([sys.executable, script], capture_output=True, text=True, timeout=60)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), str(len(' '.join(self.pages).split())))
+        with open(marker) as f:
+            self.assertEqual(f.read().splitlines(), ['started'])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            extract_pdf_text(self.path, backend='pdfminer')
+
+    def test_in_memory_sources(self):
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        expected = extract_pdf_text(self.path, workers=1)
+        for source in (content, memoryview(content), io.BytesIO(content)):
+            with self.subTest(source=type(source).__name__):
+                self.assertEqual(extract_pdf_text(source, workers=1), expected)
+        self.assertEqual(extract_pdf_text(memoryview(content), workers=2, parallel_min_pages=4), expected)
+
+class EchoParser:
+    def parse_resume(self, text, filename):
+        return {'text': text, 'filename': filename}
+
+class TestFileParserBuffers(unittest.TestCase):
+    def setUp(self):
+        self.file_parser = FileParser(parser=EchoParser())
+
+    def test_pdf_stream(self):
+        document = fitz.open()
+        document.new_page().insert_text((72, 72), 'Python SQL')
+        stream = io.BytesIO(document.tobytes())
+        document.close()
+        result = self.file_parser.parse_file(stream, 'resume.pdf')
+        self.assertEqual(result, {'text': 'Python SQL', 'filename': 'resume.pdf'})
+
+    def test_docx_bytes(self):
+        document = docx.Document()
+        document.add_paragraph('Опыт работы')
+        document.add_paragraph('Python')
+        buffer = io.BytesIO()
+        document.save(buffer)
+        result = self.file_parser.parse_file(buffer.getvalue(), 'resume.docx')
+        self.assertEqual(result['text'], 'Опыт работы\nPython')
+
+    def test_buffer_requires_filename(self):
+        result = self.file_parser.parse_file(b'%PDF-1.4')
+        self.assertEqual(result['skills']['required'], [])
+
+if __name__ == '__main__':
+    unittest.main()
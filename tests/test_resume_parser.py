@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.analysis.resume_parser import ResumeParser, SECTION_PROMPTS, REPAIR_PROMPT
+from tests.llm_stub import StubLLMServer, RESUME_MARKER, default_answer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'resume_hh.txt')
+
+class ResumeParserTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def make_parser(self, server, **kwargs):
+        return ResumeParser(api_key='test', base_url=server.base_url, cache_dir=self.cache_dir,
+                            retry_base_delay=0.01, **kwargs)
+
+class TestParseMany(ResumeParserTestCase):
+    def test_results_keep_input_order(self):
+        texts = [f"резюме {index}" for index in range(12)]
+        with StubLLMServer(delay=0.05) as server:
+            results = self.make_parser(server, max_concurrency=4).parse_many(texts)
+        self.assertEqual([result['skills']['required'][0] for result in results], texts)
+        self.assertLessEqual(server.max_active, 4)
+        self.assertGreater(server.max_active, 1)
+
+    def test_rate_limited_requests_are_retried(self):
+        with StubLLMServer(failures=3, failure_status=429) as server:
+            results = self.make_parser(server, max_concurrency=1, max_retries=4).parse_many(['резюме'])
+        self.assertEqual(results[0]['skills']['required'], ['резюме'])
+        self.assertEqual(len(server.requests), 4)
+
+    def test_server_errors_exhaust_retries(self):
+        with StubLLMServer(failures=10, failure_status=503) as server:
+            results = self.make_parser(server, max_retries=2).parse_many(['резюме'])
+        self.assertEqual(results, [{}])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        with StubLLMServer(failures=10, failure_status=400) as server:
+            results = self.make_parser(server).parse_many(['резюме'])
+        self.assertEqual(results, [{}])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_cached_texts_skip_requests(self):
+        with StubLLMServer() as server:
+            parser = self.make_parser(server)
+            parser.parse_many(['резюме'])
+            parser.parse_many(['резюме'])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_prompt_change_invalidates_cache(self):
+        with StubLLMServer() as server:
+            self.make_parser(server).parse_many(['резюме'])
+            parser = self.make_parser(server)
+            parser.prompt_version = 'changed'
+            parser.parse_many(['резюме'])
+        self.assertEqual(len(server.requests), 2)
+
+class TestLocalFastPath(ResumeParserTestCase):
+    def setUp(self):
+        super().setUp()
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def test_templated_resume_skips_llm(self):
+        with StubLLMServer() as server:
+            parser = self.make_parser(server)
+            result = parser.parse_resume(self.text, 'resume_hh.txt')
+        self.assertEqual(server.requests, [])
+        self.assertEqual(result['experience'][0]['company'], 'Яндекс')
+        self.assertEqual(parser.extraction_stats, {'local': 1, 'partial': 0, 'llm': 0, 'repairs': 0})
+
+    def test_only_uncertain_sections_are_sent(self):
+        text = self.text.replace('Английский — C1 — Продвинутый', 'Эльфийский со словарем')
+        with StubLLMServer() as server:
+            parser = self.make_parser(server)
+            result = parser.parse_resume(text, 'resume_hh.txt')
+        self.assertEqual(len(server.requests), 1)
+        prompt = server.requests[0]['messages'][-1]['content']
+        self.assertTrue(prompt.startswith(SECTION_PROMPTS['languages']))
+        self.assertEqual(prompt.split(RESUME_MARKER, 1)[-1], 'Русский — Родной\nЭльфийский со словарем')
+        # Уверенные секции берутся из локального разбора, остальные - из ответа LLM
+        self.assertEqual(result['experience'][0]['company'], 'Яндекс')
+        self.assertEqual(result['languages'], [])
+        self.assertEqual(parser.extraction_stats['partial'], 1)
+
+    def test_extraction_settings_change_cache_key(self):
+        """Локальный результат из кэша не отдается парсеру с другими настройками извлечения"""
+        with StubLLMServer() as server:
+            self.make_parser(server, section_prompts=False).parse_resume(self.text, 'resume_hh.txt')
+            self.assertEqual(server.requests, [])
+            self.make_parser(server, section_prompts=False, confidence_threshold=1.1).parse_resume(self.text, 'resume_hh.txt')
+            self.assertEqual(len(server.requests), 1)
+            self.make_parser(server, section_prompts=False, local_first=False).parse_resume(self.text, 'resume_hh.txt')
+            self.assertEqual(len(server.requests), 2)
+
+class TestSectionPrompts(ResumeParserTestCase):
+    def setUp(self):
+        super().setUp()
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def test_sections_are_requested_concurrently(self):
+        with StubLLMServer(delay=0.2, answer=section_answer) as server:
+            parser = self.make_parser(server, local_first=False)
+            started = time.monotonic()
+            result = parser.parse_resume(self.text, 'resume_hh.txt')
+            elapsed = time.monotonic() - started
+        self.assertEqual(len(server.requests), 4)
+        self.assertEqual(server.max_active, 4)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(result['education'], [{'text': '(Магистр)'}])
+        self.assertEqual(result['languages'][0]['text'], 'Русский — Родной')
+        self.assertEqual(result['skills']['required'], ['Python  SQL  Pandas  PyTorch  Spark  Airflow'])
+
+    def test_async_path_uses_section_prompts(self):
+        with StubLLMServer(answer=section_answer) as server:
+            results = self.make_parser(server, local_first=False).parse_many([self.text])
+        self.assertEqual(len(server.requests), 4)
+        self.assertEqual(results[0]['experience'][0]['text'], '7 лет 2 месяца')
+
+    def test_single_prompt_when_disabled(self):
+        with StubLLMServer() as server:
+            self.make_parser(server, local_first=False, section_prompts=False).parse_many([self.text])
+        self.assertEqual(len(server.requests), 1)
+
+    def test_long_text_without_sections_is_chunked(self):
+        text = ' '.join(f"слово{index}" for index in range(300))
+        with StubLLMServer() as server:
+            result = self.make_parser(server, max_prompt_chars=1000).parse_resume(text, 'long.txt')
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(' '.join(result['skills']['required']), text)
+
+class TestResponseFormat(ResumeParserTestCase):
+    def test_json_mode_is_requested(self):
+        with StubLLMServer() as server:
+            self.make_parser(server).parse_resume('резюме', 'resume.txt')
+        self.assertEqual(server.requests[0]['response_format'], {'type': 'json_object'})
+
+    def test_fenced_answer_is_parsed_without_repair(self):
+        answer = lambda prompt: f"Результат:\n```json\n{default_answer(prompt)}\n```"
+        with StubLLMServer(answer=answer) as server:
+            parser = self.make_parser(server)
+            result = parser.parse_resume('резюме', 'resume.txt')
+        self.assertEqual(result['skills']['required'], ['резюме'])
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(parser.extraction_stats['repairs'], 0)
+
+    def test_invalid_answer_is_repaired_once(self):
+        answer = lambda prompt: default_answer('резюме') if prompt == REPAIR_PROMPT else 'Не могу ответить'
+        with StubLLMServer(answer=answer) as server:
+            parser = self.make_parser(server)
+            result = parser.parse_resume('резюме', 'resume.txt')
+        self.assertEqual(result['skills']['required'], ['резюме'])
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(server.requests[1]['messages'][-2], {'role': 'assistant', 'content': 'Не могу ответить'})
+        self.assertEqual(parser.extraction_stats['repairs'], 1)
+
+class TestParseResumeStream(ResumeParserTestCase):
+    def setUp(self):
+        super().setUp()
+        with open(FIXTURE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def test_single_prompt_is_streamed(self):
+        with StubLLMServer() as server:
+            parser = self.make_parser(server, local_first=False, section_prompts=False)
+            sections = list(parser.parse_resume_stream(self.text, 'resume_hh.txt'))
+            cached = parser.parse_resume(self.text, 'resume_hh.txt')
+        self.assertTrue(server.requests[0]['stream'])
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([section for section, _ in sections], ['education', 'experience', 'skills', 'languages'])
+        self.assertEqual(dict(sections), cached)
+
+    def test_confident_sections_come_first(self):
+        text = self.text.replace('Английский — C1 — Продвинутый', 'Эльфийский со словарем')
+        with StubLLMServer(answer=section_answer) as server:
+            sections = list(self.make_parser(server).parse_resume_stream(text, 'resume_hh.txt'))
+        self.assertEqual([section for section, _ in sections], ['education', 'experience', 'skills', 'languages'])
+        self.assertEqual(sections[-1][1], [{'text': 'Русский — Родной'}])
+
+    def test_section_prompts_are_streamed_as_completed(self):
+        with StubLLMServer(answer=section_answer) as server:
+            sections = dict(self.make_parser(server, local_first=False).parse_resume_stream(self.text, 'resume_hh.txt'))
+        self.assertEqual(len(server.requests), 4)
+        self.assertEqual(sections['education'], [{'text': '(Магистр)'}])
+
+def section_answer(prompt):
+    """Отвечает только секцией, о которой спрашивает промпт, с первой строкой ее текста"""
+    text = prompt.split(RESUME_MARKER, 1)[-1]
+    section = next(name for name, section_prompt in SECTION_PROMPTS.items() if prompt.startswith(section_prompt))
+    first_line = text.split('\n', 1)[0]
+    if section == 'skills':
+        value = {'required': [text.split('\n')[-1]], 'additional': [], 'certifications': []}
+    else:
+        value = [{'text': first_line}]
+    return json.dumps({section: value}, ensure_ascii=False)
+
+if __name__ == '__main__':
+    unittest.main()
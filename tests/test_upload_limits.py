@@ -0,0 +1,62 @@
+import io
+import unittest
+import zipfile
+from flask import Flask, jsonify, request
+from src.upload_limits import BatchLimitError, UploadLimits
+
+MB = 1024 * 1024
+
+def allowed_file(filename):
+    return filename.lower().endswith('.pdf')
+
+class TestUploadLimits(unittest.TestCase):
+    def setUp(self):
+        self.limits = UploadLimits({'max_files': 5, 'max_file_mb': 16, 'max_batch_mb': 128})
+        app = Flask(__name__)
+        self.limits.configure(app)
+
+        @app.route('/batch', methods=['POST'])
+        def batch():
+            try:
+                items = self.limits.collect_batch_items(request.files.getlist('resumes'), allowed_file)
+            except BatchLimitError as e:
+                return jsonify({'error': str(e)}), e.status
+            return jsonify({'total': len(items), 'bytes': sum(len(item['content']) for item in items)})
+
+        @app.route('/single', methods=['POST'])
+        def single():
+            self.limits.limit_single_file(request)
+            return jsonify({'bytes': len(request.files['resume'].read())})
+
+        self.client = app.test_client()
+
+    def post_files(self, url, field, sizes):
+        files = [(io.BytesIO(b'x' * size), f'resume{i}.pdf') for i, size in enumerate(sizes)]
+        return self.client.post(url, data={field: files}, content_type='multipart/form-data')
+
+    def test_batch_between_file_and_batch_limits(self):
+        """Пакет больше max_file_mb, но меньше max_batch_mb, доходит до обработчика"""
+        response = self.post_files('/batch', 'resumes', [10 * MB, 10 * MB, 4 * MB])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'total': 3, 'bytes': 24 * MB})
+
+    def test_single_file_keeps_file_limit(self):
+        """Загрузка одного файла по-прежнему ограничена max_file_mb"""
+        self.assertEqual(self.post_files('/single', 'resume', [MB]).status_code, 200)
+        self.assertEqual(self.post_files('/single', 'resume', [20 * MB]).status_code, 413)
+
+    def test_batch_limits(self):
+        """Лишние файлы и слишком большие файлы архива отклоняются до распаковки"""
+        response = self.post_files('/batch', 'resumes', [10] * 6)
+        self.assertEqual(response.status_code, 400)
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('big.pdf', b'\0' * (17 * MB))
+        archive.seek(0)
+        response = self.client.post('/batch', data={'resumes': [(archive, 'batch.zip')]},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 413)
+
+if __name__ == '__main__':
+    unittest.main()